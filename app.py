@@ -1,9 +1,67 @@
 
+import os
+import sys
 import streamlit as st
 from supabase import create_client, Client
 import pandas as pd
 
+# Share the DAOs and services with the CLI
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
+from dao.patient_dao import PatientDAO
+from dao.doctor_dao import DoctorDAO
+from dao.appointment_dao import AppointmentDAO
+from dao.single_flight import single_flight
+from config import USE_CHANGE_FEED
+from service.name_search import NameIndex
+from service.change_feed import ChangeFeed
+
+# Cached table reads expire after this many seconds even without a write from
+# this app, so changes made elsewhere (CLI, other services) still show up
+TABLE_CACHE_TTL = 300
+
+PAGE_SIZES = [25, 50, 100, 250]
+
+ID_COLUMNS = {
+    "patients1": "patient_id",
+    "doctors1": "doctor_id",
+    "availabilityofdoctors1": "availability_id",
+    "appointments1": "appointment_id",
+    "payments1": "payment_id",
+    "medical_records1": "record_id"
+}
+
+# Columns offered for sorting in the table view
+SORT_COLUMNS = {
+    "patients1": ["patient_id", "full_name", "email", "age"],
+    "doctors1": ["doctor_id", "full_name", "specialization", "experience_years"],
+    "availabilityofdoctors1": ["availability_id", "doctor_id", "available_date", "start_time"],
+    "appointments1": ["appointment_id", "patient_id", "doctor_id", "appointment_date", "appointment_time", "status"],
+    "payments1": ["payment_id", "appointment_id", "patient_id", "amount", "payment_status"],
+    "medical_records1": ["record_id", "patient_id", "doctor_id", "appointment_id"]
+}
+
+# Tables searched by full name through an in-process trigram index
+NAME_SEARCH_DAOS = {"patients1": PatientDAO, "doctors1": DoctorDAO}
+
+# Tables with a live view fed by their change feed (sql/appointments_change_feed.sql)
+CHANGE_FEED_DAOS = {"appointments1": AppointmentDAO} if USE_CHANGE_FEED else {}
+LIVE_REFRESH_SECONDS = 5
+LIVE_RECENT_CHANGES = 50
+
+# Foreign key column -> table whose name index holds the valid IDs
+REFERENCES = {"patient_id": "patients1", "doctor_id": "doctors1"}
+
+# Rows inserted outside this dashboard (e.g. from the CLI) reach the pickers
+# and name columns within this many seconds
+PICKER_REFRESH_SECONDS = 30
+APPOINTMENT_PICKER_LIMIT = 50
+
+# Tables that grow without bound get the planner's row estimate instead of
+# an exact count(*); PostgREST still counts exactly while the table is small
+ESTIMATED_COUNT_TABLES = {"appointments1", "availabilityofdoctors1"}
+
 # ---------- Connect to Supabase ----------
+@st.cache_resource
 def init_connection():
     try:
         url = st.secrets["supabase"]["url"]
@@ -15,11 +73,55 @@ def init_connection():
 
 supabase: Client = init_connection()
 
+def execute(query):
+    """
+    Send a query through the client's single-flight layer: sessions missing
+    the cache at the same moment share one request instead of each sending it.
+    Writes go through it too, so no read started before a write is shared after it.
+    """
+    return single_flight(supabase).execute(query)
+
+# ---------- Table Versions ----------
+@st.cache_resource
+def table_versions():
+    """Per-table write counters shared by all sessions; part of every cached read's key."""
+    return {}
+
+def table_version(table_name):
+    return table_versions().get(table_name, 0)
+
+def bump_table_version(table_name):
+    versions = table_versions()
+    versions[table_name] = versions.get(table_name, 0) + 1
+
+# ---------- Name Search Index ----------
+@st.cache_resource
+def name_index(table_name):
+    """Trigram index over a table's names, shared by all sessions; insert_data/delete_record keep it current."""
+    return NameIndex(NAME_SEARCH_DAOS[table_name](supabase))
+
+@st.cache_resource
+def change_feed(table_name):
+    """Local snapshot of a table shared by all sessions; each poll fetches only the rows changed since the last."""
+    return ChangeFeed(CHANGE_FEED_DAOS[table_name](supabase))
+
 # ---------- Insert Data ----------
+def unknown_references(data):
+    """Foreign keys of a row that the local ID sets do not know, as "column id" strings."""
+    return [f"{column} {data[column]}" for column, table in REFERENCES.items()
+            if column in data and data[column] not in name_index(table)]
+
 def insert_data(table_name, data):
+    missing = unknown_references(data)
+    if missing:
+        st.error(f"❌ Unknown {', '.join(missing)}; nothing was sent.")
+        return
     try:
-        response = supabase.table(table_name).insert(data).execute()
+        response = execute(supabase.table(table_name).insert(data))
         if response.data:
+            bump_table_version(table_name)
+            if table_name in NAME_SEARCH_DAOS:
+                name_index(table_name).add(response.data[0])
             st.success("✅ Record inserted successfully!")
         else:
             st.error("❌ Insert failed.")
@@ -29,8 +131,11 @@ def insert_data(table_name, data):
 # ---------- Delete Record ----------
 def delete_record(table_name, record_id, id_column):
     try:
-        response = supabase.table(table_name).delete().eq(id_column, record_id).execute()
+        response = execute(supabase.table(table_name).delete().eq(id_column, record_id))
         if response.data:
+            bump_table_version(table_name)
+            if table_name in NAME_SEARCH_DAOS:
+                name_index(table_name).remove(record_id)
             st.success("✅ Record deleted successfully!")
         else:
             st.warning("⚠️ ID not found.")
@@ -55,6 +160,10 @@ def search_records(table_name):
     search_field = st.selectbox("Search by:", search_fields.get(table_name, []))
     search_value = st.text_input("Enter search value")
 
+    if table_name in NAME_SEARCH_DAOS and search_field == "full_name":
+        show_name_matches(table_name, search_value)
+        return
+
     if st.button("Search"):
         if not search_value.strip():
             st.warning("⚠️ Please enter a search value.")
@@ -81,18 +190,114 @@ def search_records(table_name):
             st.error(f"❌ Search failed: {str(e)}")
 
 
+@st.cache_data(ttl=TABLE_CACHE_TTL, max_entries=256, show_spinner=False)
+def fetch_rows(table_name, version, record_ids):
+    """{id: row} of the given rows in one batched request; `version` only keys the cache."""
+    return NAME_SEARCH_DAOS[table_name](supabase).get_many(record_ids)
+
+def show_name_matches(table_name, search_value):
+    """Ranked, typo-tolerant name matches, refreshed as the search value changes."""
+    if not search_value.strip():
+        return
+    try:
+        matches = name_index(table_name).search(search_value, limit=20)
+        if not matches:
+            st.info("ℹ️ No matching records found.")
+            return
+        by_id = fetch_rows(table_name, table_version(table_name), tuple(sorted(m[0] for m in matches)))
+        df = pd.DataFrame([dict(by_id[record_id], match=score) for record_id, _, score in matches if record_id in by_id])
+        st.dataframe(df, use_container_width=True, hide_index=True)
+    except Exception as e:
+        st.error(f"❌ Search failed: {str(e)}")
+
+
 # ---------- Show Table ----------
+@st.cache_data(ttl=TABLE_CACHE_TTL, max_entries=64, show_spinner=False)
+def fetch_page(table_name, version, page, page_size, sort_column, descending):
+    """
+    One page of a table plus the table's row count, in a single request.
+    `version` only keys the cache so that a write forces a fresh read.
+    """
+    count = "estimated" if table_name in ESTIMATED_COUNT_TABLES else "exact"
+    query = supabase.table(table_name).select("*", count=count).order(sort_column, desc=descending)
+    id_column = ID_COLUMNS[table_name]
+    if sort_column != id_column:
+        # Tie-break on the primary key so that rows do not move between pages
+        query = query.order(id_column, desc=descending)
+    start = (page - 1) * page_size
+    response = execute(query.range(start, start + page_size - 1))
+    return response.data, response.count
+
+@st.cache_data(ttl=PICKER_REFRESH_SECONDS, max_entries=256, show_spinner=False)
+def fetch_names(table_name, version, record_ids):
+    """{id: full_name} of the given rows in one batched request; `version` only keys the cache."""
+    rows = NAME_SEARCH_DAOS[table_name](supabase).get_many(record_ids, "full_name")
+    return {record_id: row["full_name"] for record_id, row in rows.items()}
+
+def with_names(table_name, df):
+    """Add a name column after every patient_id/doctor_id column, fetching the names of this page's IDs only."""
+    for column, referenced in REFERENCES.items():
+        if column in df.columns and referenced != table_name:
+            ids = tuple(sorted({int(i) for i in df[column].dropna()}))
+            names = fetch_names(referenced, table_version(referenced), ids)
+            df.insert(df.columns.get_loc(column) + 1, column.replace("_id", "_name"), df[column].map(names))
+    return df
+
+def reset_page(page_key):
+    st.session_state[page_key] = 1
+
 def show_table(table_name):
+    page_key = f"page_{table_name}"
+    col1, col2, col3 = st.columns(3)
+    sort_column = col1.selectbox("Sort by", SORT_COLUMNS[table_name], key=f"sort_{table_name}",
+                                 on_change=reset_page, args=(page_key,))
+    descending = col2.radio("Order", ["Ascending", "Descending"], horizontal=True, key=f"order_{table_name}",
+                            on_change=reset_page, args=(page_key,)) == "Descending"
+    page_size = col3.selectbox("Rows per page", PAGE_SIZES, key=f"page_size_{table_name}",
+                               on_change=reset_page, args=(page_key,))
+
+    page = st.session_state.get(page_key, 1)
     try:
-        response = supabase.table(table_name).select("*").execute()
-        df = pd.DataFrame(response.data)
+        rows, total = fetch_page(table_name, table_version(table_name), page, page_size, sort_column, descending)
+        pages = max(1, -(-(total or 0) // page_size))
+        if page > pages:
+            # The table shrank or the page size grew; show the last page instead
+            st.session_state[page_key] = page = pages
+            rows, total = fetch_page(table_name, table_version(table_name), page, page_size, sort_column, descending)
+        df = pd.DataFrame(rows)
         if not df.empty:
-            st.dataframe(df, use_container_width=True)
+            st.dataframe(with_names(table_name, df), use_container_width=True, hide_index=True)
         else:
             st.info("ℹ️ No records found.")
+        approx = "about " if table_name in ESTIMATED_COUNT_TABLES else ""
+        st.caption(f"Page {page} of {pages} · {approx}{total or 0} records")
+        st.number_input("Page", min_value=1, max_value=pages, step=1, key=page_key)
     except Exception as e:
         st.error(f"❌ Failed to load table: {str(e)}")
 
+# ---------- Live View ----------
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def live_view(table_name):
+    """Re-runs on its own every few seconds, applying only the changes since the previous poll."""
+    try:
+        feed = change_feed(table_name)
+        changes = feed.poll(min_interval=LIVE_REFRESH_SECONDS)
+        if changes["upserted"] or changes["deleted"]:
+            # Someone else wrote to the table; cached pages are stale
+            bump_table_version(table_name)
+        col1, col2 = st.columns(2)
+        col1.metric("Records", len(feed))
+        col2.metric("Changes in last poll", len(changes["upserted"]) + len(changes["deleted"]))
+        recent = feed.recent(LIVE_RECENT_CHANGES)
+        if recent:
+            df = pd.DataFrame([dict(row, change=op) for op, row in recent])
+            st.dataframe(df, use_container_width=True, hide_index=True)
+        else:
+            st.info("ℹ️ No changes since the view was opened.")
+        st.caption(f"Refreshing every {LIVE_REFRESH_SECONDS} seconds · latest changes first")
+    except Exception as e:
+        st.error(f"❌ Live view failed: {str(e)}")
+
 # ---------- Home Page ----------
 def home_page():
     st.markdown("<h1 style='text-align:center;color:#0078ff;'>🩺 Real-Time Doctor Appointment System</h1>", unsafe_allow_html=True)
@@ -160,7 +365,10 @@ def dashboard_page():
     selected_table = [tbl for tbl, lbl in tables_with_emojis.items() if lbl == selected_label][0]
 
     st.markdown("---")
-    action = st.radio("Choose an Action:", ["View Table", "Insert New Record", "Delete a Record", "Search Records"], horizontal=True)
+    actions = ["View Table", "Insert New Record", "Delete a Record", "Search Records"]
+    if selected_table in CHANGE_FEED_DAOS:
+        actions.append("Live View")
+    action = st.radio("Choose an Action:", actions, horizontal=True)
 
     if action == "View Table":
         show_table(selected_table)
@@ -170,6 +378,8 @@ def dashboard_page():
         delete_form(selected_table)
     elif action == "Search Records":
         search_records(selected_table)
+    elif action == "Live View":
+        live_view(selected_table)
 
     st.markdown("---")
     if st.button("🚪 Logout", use_container_width=True):
@@ -177,6 +387,55 @@ def dashboard_page():
         st.session_state.user = None
         st.rerun()
 
+# ----------------------------------------------------------
+# 🔎 Pickers
+# ----------------------------------------------------------
+def entity_picker(table_name, label, key):
+    """
+    Typeahead picker: type part of a name (or an ID) and choose among the
+    best matches of the table's name index. Returns the chosen ID, or None.
+    """
+    index = name_index(table_name)
+    index.refresh(min_interval=PICKER_REFRESH_SECONDS)
+    query = st.text_input(f"{label} (type a name or ID)", key=f"{key}_query").strip()
+    if not query:
+        return None
+    if query.isdigit():
+        name = index.name_of(int(query))
+        options = [(int(query), name)] if name is not None else []
+    else:
+        options = [(record_id, name) for record_id, name, _ in index.search(query, limit=20)]
+    if not options:
+        st.caption(f"No match for '{query}'.")
+        return None
+    choice = st.selectbox(label, options, format_func=lambda o: f"{o[1]} (#{o[0]})", key=f"{key}_choice")
+    return choice[0]
+
+@st.cache_data(ttl=TABLE_CACHE_TTL, show_spinner=False)
+def fetch_patient_appointments(patient_id, version):
+    """A patient's latest appointments; `version` only keys the cache."""
+    return execute(supabase.table("appointments1")
+                   .select("appointment_id,doctor_id,appointment_date,appointment_time,status")
+                   .eq("patient_id", patient_id).order("appointment_date", desc=True)
+                   .limit(APPOINTMENT_PICKER_LIMIT)).data
+
+def appointment_picker(patient_id, key):
+    """Choose one of a patient's appointments, newest first. Returns the appointment row, or None."""
+    if patient_id is None:
+        st.caption("Pick the patient first to choose one of their appointments.")
+        return None
+    appointments = fetch_patient_appointments(patient_id, table_version("appointments1"))
+    if not appointments:
+        st.caption("This patient has no appointments.")
+        return None
+    doctors = name_index("doctors1")
+
+    def label(a):
+        doctor = doctors.name_of(a["doctor_id"]) or f"doctor #{a['doctor_id']}"
+        return f"#{a['appointment_id']} · {a['appointment_date']} {str(a['appointment_time'])[:5]} with {doctor} ({a['status']})"
+
+    return st.selectbox("⏰ Appointment", appointments, format_func=label, key=key)
+
 # ----------------------------------------------------------
 # ➕ Insert Forms with Validation
 # ----------------------------------------------------------
@@ -215,47 +474,48 @@ def insert_form(table_name):
                 st.warning("⚠️ Please fill all fields correctly.")
 
     elif table_name == "availabilityofdoctors1":
-        doctor_id = st.number_input("🩺 Doctor ID", 0)
+        doctor_id = entity_picker("doctors1", "🩺 Doctor", "availability_doctor")
         available_date = st.date_input("📅 Available Date")
         start_time = st.time_input("🕓 Start Time")
         end_time = st.time_input("🕒 End Time")
         is_available = st.checkbox("✅ Available", value=True)
 
         if st.button("💾 Insert Availability"):
-            if doctor_id > 0:
+            if doctor_id:
                 insert_data("availabilityofdoctors1", {
                     "doctor_id": doctor_id, "available_date": str(available_date),
                     "start_time": str(start_time), "end_time": str(end_time),
                     "is_available": is_available
                 })
             else:
-                st.warning("⚠️ Doctor ID is required.")
+                st.warning("⚠️ Please pick a doctor.")
 
     elif table_name == "appointments1":
-        patient_id = st.number_input("🧍‍♂️ Patient ID", 0)
-        doctor_id = st.number_input("🩺 Doctor ID", 0)
+        patient_id = entity_picker("patients1", "🧍‍♂️ Patient", "appointment_patient")
+        doctor_id = entity_picker("doctors1", "🩺 Doctor", "appointment_doctor")
         appointment_date = st.date_input("📆 Appointment Date")
         appointment_time = st.time_input("⏰ Appointment Time")
         status = st.text_input("📌 Status", "Scheduled")
 
         if st.button("💾 Insert Appointment"):
-            if patient_id > 0 and doctor_id > 0:
+            if patient_id and doctor_id:
                 insert_data("appointments1", {"patient_id": patient_id, "doctor_id": doctor_id,
                                               "appointment_date": str(appointment_date),
                                               "appointment_time": str(appointment_time),
                                               "status": status})
             else:
-                st.warning("⚠️ Please enter valid Patient and Doctor IDs.")
+                st.warning("⚠️ Please pick a patient and a doctor.")
 
     elif table_name == "payments1":
-        appointment_id = st.number_input("⏱️ Appointment ID", 0)
-        patient_id = st.number_input("🧍‍♂️ Patient ID", 0)
+        patient_id = entity_picker("patients1", "🧍‍♂️ Patient", "payment_patient")
+        appointment = appointment_picker(patient_id, "payment_appointment")
+        appointment_id = appointment["appointment_id"] if appointment else None
         amount = st.number_input("💰 Amount", 0.0)
         transaction_id = st.text_input("💳 Transaction ID")
         payment_status = st.text_input("📊 Payment Status", "Pending")
 
         if st.button("💾 Insert Payment"):
-            if appointment_id > 0 and patient_id > 0 and amount > 0 and transaction_id.strip():
+            if appointment_id and patient_id and amount > 0 and transaction_id.strip():
                 insert_data("payments1", {"appointment_id": appointment_id, "patient_id": patient_id,
                                           "amount": amount, "transaction_id": transaction_id,
                                           "payment_status": payment_status})
@@ -263,14 +523,16 @@ def insert_form(table_name):
                 st.warning("⚠️ Please fill all fields correctly.")
 
     elif table_name == "medical_records1":
-        patient_id = st.number_input("🧍‍♂️ Patient ID", 0)
-        doctor_id = st.number_input("🩺 Doctor ID", 0)
-        appointment_id = st.number_input("⏰ Appointment ID", 0)
+        patient_id = entity_picker("patients1", "🧍‍♂️ Patient", "record_patient")
+        appointment = appointment_picker(patient_id, "record_appointment")
+        # The record belongs to the doctor of the chosen appointment
+        doctor_id = appointment["doctor_id"] if appointment else None
+        appointment_id = appointment["appointment_id"] if appointment else None
         diagnosis = st.text_area("🧾 Diagnosis")
         prescription = st.text_area("💊 Prescription")
 
         if st.button("💾 Insert Medical Record"):
-            if all([patient_id > 0, doctor_id > 0, appointment_id > 0, diagnosis.strip(), prescription.strip()]):
+            if all([patient_id, doctor_id, appointment_id, diagnosis.strip(), prescription.strip()]):
                 insert_data("medical_records1", {"patient_id": patient_id, "doctor_id": doctor_id,
                                                  "appointment_id": appointment_id, "diagnosis": diagnosis,
                                                  "prescription": prescription})
@@ -366,17 +628,9 @@ def search_form(table_name):
 def delete_form(table_name):
     st.markdown("<h3 style='color:#ff4b4b;'>❌ Delete Record</h3>", unsafe_allow_html=True)
     record_id = st.number_input("Enter Record ID", 0)
-    id_map = {
-        "patients1": "patient_id",
-        "doctors1": "doctor_id",
-        "availabilityofdoctors1": "availability_id",
-        "appointments1": "appointment_id",
-        "payments1": "payment_id",
-        "medical_records1": "record_id"
-    }
     if st.button("🗑️ Delete Record"):
         if record_id > 0:
-            delete_record(table_name, record_id, id_map.get(table_name))
+            delete_record(table_name, record_id, ID_COLUMNS.get(table_name))
         else:
             st.warning("⚠️ Please enter a valid ID.")
 
@@ -0,0 +1,78 @@
+"""
+1,000 concurrent bookings (find slot, claim it, insert the appointment) on
+the sync path -- sequentially and on a thread pool the size of the HTTP pool --
+and on the async path with every booking gathered on one event loop.
+"""
+import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from fake_backend import AsyncLatentClient, LatentClient, timed
+
+import config
+from dao.appointment_dao import AppointmentDAO, AsyncAppointmentDAO
+from dao.availability_dao import AvailabilityDAO, AsyncAvailabilityDAO
+from service.appointment_service import AppointmentService, AsyncAppointmentService
+
+DOCTORS = 10
+SLOTS_PER_DAY = 20
+
+
+def bookings(count):
+    """(patient_id, doctor_id, date, time) for `count` bookings, one per free 15-minute slot."""
+    out = []
+    for n in range(count):
+        doctor, rest = n % DOCTORS + 1, n // DOCTORS
+        day, slot = rest // SLOTS_PER_DAY, rest % SLOTS_PER_DAY
+        out.append((n + 1, doctor, f"2026-11-{day + 1:02d}", f"{8 + slot // 4:02d}:{slot % 4 * 15:02d}"))
+    return out
+
+
+def seed(client, wanted):
+    client.seed("availabilityofdoctors1", [
+        {"doctor_id": doctor, "available_date": date, "start_time": f"{at}:00",
+         "end_time": f"{int(at[:2]) + (int(at[3:]) + 15) // 60:02d}:{(int(at[3:]) + 15) % 60:02d}:00",
+         "is_available": True}
+        for _, doctor, date, at in wanted
+    ])
+    return client
+
+
+def run_sync(client, wanted, threads):
+    service = AppointmentService(AppointmentDAO(client), AvailabilityDAO(client))
+    with ThreadPoolExecutor(threads) as pool:
+        return list(pool.map(lambda booking: service.add_appointment(*booking), wanted))
+
+
+def run_async(client, wanted):
+    service = AsyncAppointmentService(AsyncAppointmentDAO(client), AsyncAvailabilityDAO(client))
+
+    async def book_all():
+        return await asyncio.gather(*(service.add_appointment(*booking) for booking in wanted))
+
+    return asyncio.run(book_all())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bookings", type=int, default=1000)
+    parser.add_argument("--latency", type=float, default=0.005, help="seconds per request (default 0.005)")
+    args = parser.parse_args()
+    if args.bookings > DOCTORS * SLOTS_PER_DAY * 28:
+        parser.error(f"at most {DOCTORS * SLOTS_PER_DAY * 28} bookings")
+    wanted = bookings(args.bookings)
+    pool = config.SUPABASE_MAX_CONNECTIONS
+    print(f"{args.bookings} bookings, {args.latency * 1000:g} ms per request, pool of {pool}")
+
+    for label, client, run in [
+        ("sync, sequential", LatentClient(args.latency), lambda c: run_sync(c, wanted, 1)),
+        (f"sync, {pool} threads", LatentClient(args.latency), lambda c: run_sync(c, wanted, pool)),
+        ("async, gathered", AsyncLatentClient(args.latency), lambda c: run_async(c, wanted)),
+    ]:
+        booked = timed(label, run, seed(client, wanted))
+        assert len(booked) == len(client.rows("appointments1")) == args.bookings
+        assert not any(row["is_available"] for row in client.rows("availabilityofdoctors1"))
+
+
+if __name__ == "__main__":
+    main()
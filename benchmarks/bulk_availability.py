@@ -0,0 +1,72 @@
+"""
+Loading and then closing 10k availability rows: one add_availability /
+update_availability call per row versus AvailabilityService.add_many /
+update_many. The per-row path is timed on a sample of the rows.
+"""
+import argparse
+import time
+
+from fake_backend import LatentClient
+
+from dao.availability_dao import AvailabilityDAO
+from service.availability_service import AvailabilityService
+
+DAYS = 10
+SLOTS_PER_DAY = 20
+
+
+def slots(count):
+    out = []
+    for n in range(count):
+        doctor, rest = divmod(n, DAYS * SLOTS_PER_DAY)
+        day, slot = divmod(rest, SLOTS_PER_DAY)
+        start = 8 * 60 + slot * 30
+        out.append({"doctor_id": doctor + 1, "available_date": f"2026-11-{day + 1:02d}",
+                    "start_time": f"{start // 60:02d}:{start % 60:02d}",
+                    "end_time": f"{(start + 30) // 60:02d}:{(start + 30) % 60:02d}"})
+    return out
+
+
+def measure(label, client, fn, rows):
+    requests = client.requests
+    started = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<34} {rows:6d} rows {client.requests - requests:6d} reqs {elapsed:8.3f} s "
+          f"{elapsed / rows * 1000:8.3f} ms/row")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--sample", type=int, default=1000, help="rows written one call at a time (default 1000)")
+    parser.add_argument("--latency", type=float, default=0.005, help="seconds per request (default 0.005)")
+    parser.add_argument("--chunk-size", type=int, default=500)
+    args = parser.parse_args()
+    rows = slots(args.rows)
+    print(f"{args.rows} availability rows, {args.latency * 1000:g} ms per request")
+
+    client = LatentClient(args.latency)
+    service = AvailabilityService(AvailabilityDAO(client))
+    sample = rows[:args.sample]
+    measure("add_availability per row", client,
+            lambda: [service.add_availability(r["doctor_id"], r["available_date"], r["start_time"], r["end_time"])
+                     for r in sample], len(sample))
+    ids = [row["availability_id"] for row in client.rows("availabilityofdoctors1")]
+    measure("update_availability per row", client,
+            lambda: [service.update_availability(i, is_available=False) for i in ids], len(ids))
+
+    client = LatentClient(args.latency)
+    service = AvailabilityService(AvailabilityDAO(client))
+    added = []
+    measure("add_many", client, lambda: added.append(service.add_many(rows, args.chunk_size)), len(rows))
+    assert not added[0]["failed"] and len(client.rows("availabilityofdoctors1")) == args.rows
+    updates = [{"availability_id": row["availability_id"], "is_available": False} for row in added[0]["succeeded"]]
+    updated = []
+    measure("update_many", client, lambda: updated.append(service.update_many(updates, args.chunk_size)), len(rows))
+    assert not updated[0]["failed"]
+    assert not any(row["is_available"] for row in client.rows("availabilityofdoctors1"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+The in-memory client from tests/conftest.py with a simulated round trip, so
+the scripts in this directory run without a database:
+
+    python benchmarks/<script>.py --help
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path[:0] = [os.path.join(ROOT, "src"), os.path.join(ROOT, "tests")]
+
+from conftest import MAX_ROWS, AsyncFakeQuery, FakeClient  # noqa: E402
+
+
+class LatentClient(FakeClient):
+    """FakeClient whose requests each take `latency` seconds; counts requests and response JSON bytes."""
+
+    def __init__(self, latency=0.0, max_rows=MAX_ROWS):
+        super().__init__(max_rows)
+        self.latency = latency
+        self.bytes = 0
+
+    def run(self, query):
+        if self.latency:
+            time.sleep(self.latency)
+        return self.respond(query)
+
+    def respond(self, query):
+        response = super().run(query)
+        self.bytes += len(json.dumps(response.data, default=str))
+        return response
+
+
+class _AsyncLatentQuery(AsyncFakeQuery):
+    async def execute(self):
+        if self.client.latency:
+            await asyncio.sleep(self.client.latency)
+        return self.client.respond(self)
+
+
+class AsyncLatentClient(LatentClient):
+    """LatentClient for the async DAOs: the round trip is an asyncio.sleep."""
+
+    def table(self, name):
+        return _AsyncLatentQuery(self, name)
+
+
+def timed(label, fn, *args):
+    """Run fn(*args), print how long it took and return its result."""
+    started = time.perf_counter()
+    result = fn(*args)
+    print(f"{label:<32} {time.perf_counter() - started:8.3f} s")
+    return result
@@ -0,0 +1,79 @@
+"""
+The schedule audit's sort-and-sweep passes on a million rows per table, built
+in memory (fetching is left out: it is one keyset page per 1,000 rows). A
+smaller random sample is first checked against a pairwise brute force.
+"""
+import argparse
+import time
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+import fake_backend  # noqa: F401  (puts src/ on the path)
+from service.schedule_audit import find_double_bookings, find_overlaps
+
+CLOCK = np.array([f"{m // 60:02d}:{m % 60:02d}:00" for m in range(1441)])
+DATES = pd.date_range("2026-01-01", periods=365).strftime("%Y-%m-%d").to_numpy()
+
+
+def tables(rows, doctors, rng):
+    start = rng.integers(0, 1440 - 60, rows)
+    slots = pd.DataFrame({
+        "availability_id": np.arange(1, rows + 1),
+        "doctor_id": rng.integers(1, doctors + 1, rows),
+        "available_date": DATES[rng.integers(0, len(DATES), rows)],
+        "start_time": CLOCK[start],
+        "end_time": CLOCK[start + rng.integers(15, 61, rows)],
+    })
+    appointments = pd.DataFrame({
+        "appointment_id": np.arange(1, rows + 1),
+        "patient_id": rng.integers(1, 100000, rows),
+        "doctor_id": rng.integers(1, doctors + 1, rows),
+        "appointment_date": DATES[rng.integers(0, len(DATES), rows)],
+        "appointment_time": CLOCK[rng.integers(0, 96, rows) * 15],
+        "status": np.where(rng.random(rows) < 0.1, "Cancelled", "Scheduled"),
+    })
+    return slots, appointments
+
+
+def brute_force(slots, appointments):
+    """Windows overlapping another window, and clashing appointment ID sets, by comparing every pair."""
+    overlapping = set()
+    for a, b in combinations(slots.itertuples(), 2):
+        if (a.doctor_id == b.doctor_id and a.available_date == b.available_date
+                and a.start_time < b.end_time and b.start_time < a.end_time):
+            # find_overlaps reports the window that starts later (ties: ends later)
+            overlapping.add(max((a.start_time, a.end_time, a.availability_id),
+                                (b.start_time, b.end_time, b.availability_id))[2])
+    active = appointments[appointments["status"] != "Cancelled"]
+    groups = active.groupby(["doctor_id", "appointment_date", "appointment_time"])["appointment_id"]
+    clashes = {tuple(sorted(ids)) for _, ids in groups if len(ids) > 1}
+    return overlapping, clashes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000, help="rows per table (default 1000000)")
+    parser.add_argument("--doctors", type=int, default=2000)
+    parser.add_argument("--check", type=int, default=1500, help="rows in the brute-force check (default 1500)")
+    args = parser.parse_args()
+    rng = np.random.default_rng(13)
+
+    slots, appointments = tables(args.check, 5, rng)
+    overlapping, clashes = brute_force(slots, appointments)
+    assert set(find_overlaps(slots)["availability_id"]) == overlapping
+    assert {tuple(ids) for ids in find_double_bookings(appointments)["appointment_ids"]} == clashes
+    print(f"brute-force check on {args.check} rows: {len(overlapping)} overlaps, {len(clashes)} double bookings agree")
+
+    slots, appointments = tables(args.rows, args.doctors, rng)
+    print(f"{args.rows} availability rows and {args.rows} appointments, {args.doctors} doctors")
+    for label, fn, frame in [("find_overlaps", find_overlaps, slots),
+                             ("find_double_bookings", find_double_bookings, appointments)]:
+        started = time.perf_counter()
+        found = fn(frame)
+        print(f"{label:<22} {len(found):8d} found {time.perf_counter() - started:8.3f} s")
+
+
+if __name__ == "__main__":
+    main()
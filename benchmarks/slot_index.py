@@ -0,0 +1,90 @@
+"""
+"Which open slot covers time t" for one doctor with 50k availability windows:
+the per-slot parse-and-compare loop add_appointment used to run against the
+doctor's rows, versus SlotIndex.find, plus the index's build and update costs.
+"""
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+
+from fake_backend import LatentClient
+
+from dao.availability_dao import AvailabilityDAO
+from service.slot_index import SlotIndex
+
+SLOTS_PER_DAY = 1439  # one-minute windows, 00:00 to 23:59
+FIRST_DAY = date(2026, 1, 1)
+
+
+def rows(count):
+    out = []
+    for n in range(count):
+        day, minute = divmod(n, SLOTS_PER_DAY)
+        out.append({"doctor_id": 1, "available_date": (FIRST_DAY + timedelta(days=day)).isoformat(),
+                    "start_time": f"{minute // 60:02d}:{minute % 60:02d}:00",
+                    "end_time": f"{(minute + 1) // 60:02d}:{(minute + 1) % 60:02d}:00",
+                    "is_available": n % 3 != 0})
+    return out
+
+
+def parse_time_str(time_str):
+    try:
+        return datetime.strptime(time_str, "%H:%M").time()
+    except ValueError:
+        return datetime.strptime(time_str, "%H:%M:%S").time()
+
+
+def scan(slots, doctor_id, day, at_time):
+    """The loop add_appointment ran before the index (without its prints)."""
+    appointment_dt = datetime.combine(datetime.strptime(day, "%Y-%m-%d").date(), parse_time_str(at_time))
+    for slot in slots:
+        slot_date = datetime.strptime(slot["available_date"], "%Y-%m-%d").date()
+        slot_start_dt = datetime.combine(slot_date, parse_time_str(slot["start_time"]))
+        slot_end_dt = datetime.combine(slot_date, parse_time_str(slot["end_time"]))
+        if (slot["doctor_id"] == doctor_id and slot["is_available"]
+                and slot_start_dt <= appointment_dt < slot_end_dt):
+            return slot["availability_id"]
+    return None
+
+
+def per_call(label, fn, queries):
+    started = time.perf_counter()
+    found = [fn(*query) for query in queries]
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {len(queries):6d} calls {elapsed / len(queries) * 1e6:12.1f} us/call")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--slots", type=int, default=50000)
+    parser.add_argument("--lookups", type=int, default=20000)
+    parser.add_argument("--scans", type=int, default=20, help="lookups timed with the old loop (default 20)")
+    args = parser.parse_args()
+
+    client = LatentClient()
+    slots = client.seed("availabilityofdoctors1", rows(args.slots))
+    days = (args.slots - 1) // SLOTS_PER_DAY + 1
+    pick = random.Random(7)
+    queries = [(1, (FIRST_DAY + timedelta(days=pick.randrange(days))).isoformat(),
+                f"{pick.randrange(24):02d}:{pick.randrange(60):02d}") for _ in range(args.lookups)]
+    print(f"{args.slots} slots for one doctor over {days} days")
+
+    index = SlotIndex(AvailabilityDAO(client))
+    started = time.perf_counter()
+    index.find(1, FIRST_DAY, "00:00")
+    print(f"{'index load':<28} {client.requests:6d} reqs {time.perf_counter() - started:14.3f} s")
+
+    old = per_call("old loop", lambda *q: scan(slots, *q), queries[:args.scans])
+    new = per_call("SlotIndex.find", index.find, queries)
+    assert old == new[:args.scans]
+
+    added = [dict(row, availability_id=10 ** 9 + n) for n, row in enumerate(rows(args.lookups))]
+    per_call("SlotIndex.add", index.add, [(row,) for row in added])
+    per_call("SlotIndex.set_available", index.set_available, [(row["availability_id"], False) for row in added])
+    per_call("SlotIndex.remove", index.remove, [(row["availability_id"],) for row in added])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Requests, response bytes and time of the targeted DAO lookups against the
+full-table scans they replaced: finding one appointment (delete_appointment
+used to scan list_appointments) and one patient's appointments.
+"""
+import argparse
+import time
+
+from fake_backend import LatentClient
+
+from dao.appointment_dao import AppointmentDAO
+
+
+def measure(label, client, fn, repeat):
+    requests, size = client.requests, client.bytes
+    started = time.perf_counter()
+    for n in range(repeat):
+        fn(n)
+    elapsed = (time.perf_counter() - started) / repeat
+    print(f"{label:<40} {(client.requests - requests) / repeat:7.1f} req "
+          f"{(client.bytes - size) / repeat / 1024:10.1f} KiB {elapsed * 1000:9.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20000, help="appointments in the table (default 20000)")
+    parser.add_argument("--latency", type=float, default=0.005, help="seconds per request (default 0.005)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    client = LatentClient(args.latency)
+    client.seed("appointments1", [
+        {"patient_id": n % 2000 + 1, "doctor_id": n % 50 + 1, "appointment_date": f"2026-{n % 12 + 1:02d}-{n % 28 + 1:02d}",
+         "appointment_time": f"{8 + n % 10:02d}:00", "status": "Scheduled"}
+        for n in range(args.rows)
+    ])
+    dao = AppointmentDAO(client)
+    target = lambda n: args.rows * (n + 1) // (args.repeat + 1)
+    print(f"{args.rows} appointments, {args.latency * 1000:g} ms per request, per lookup:")
+
+    # Before: a single select("*") stops at max-rows, so a full scan has to page
+    measure("one appointment, scan", client,
+            lambda n: next(a for a in dao.iter_appointments() if a["appointment_id"] == target(n)), args.repeat)
+    measure("one appointment, get_by_id", client, lambda n: dao.get_by_id(target(n)), args.repeat)
+    measure("patient's appointments, scan", client,
+            lambda n: [a for a in dao.iter_appointments() if a["patient_id"] == n + 1], args.repeat)
+    measure("patient's appointments, list_by_patient", client, lambda n: dao.list_by_patient(n + 1), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+-- Change feed for appointments1: every insert and update stamps updated_at,
+-- every delete leaves a tombstone, so readers can ask for "what changed since
+-- T" instead of re-reading the table.
+alter table appointments1
+    add column if not exists updated_at timestamptz not null default clock_timestamp();
+
+create index if not exists appointments1_updated_at_idx
+    on appointments1 (updated_at, appointment_id);
+
+create table if not exists appointments1_deleted (
+    appointment_id bigint primary key,
+    deleted_at     timestamptz not null default clock_timestamp()
+);
+
+create index if not exists appointments1_deleted_at_idx
+    on appointments1_deleted (deleted_at);
+
+create or replace function appointments1_touch() returns trigger
+language plpgsql as $$
+begin
+    new.updated_at := clock_timestamp();
+    return new;
+end $$;
+
+create or replace function appointments1_tombstone() returns trigger
+language plpgsql as $$
+begin
+    insert into appointments1_deleted (appointment_id) values (old.appointment_id)
+        on conflict (appointment_id) do update set deleted_at = excluded.deleted_at;
+    return old;
+end $$;
+
+drop trigger if exists appointments1_touch on appointments1;
+create trigger appointments1_touch
+    before insert or update on appointments1
+    for each row execute function appointments1_touch();
+
+drop trigger if exists appointments1_tombstone on appointments1;
+create trigger appointments1_tombstone
+    after delete on appointments1
+    for each row execute function appointments1_tombstone();
+
+-- Tombstones are only needed until every reader has polled past them
+-- delete from appointments1_deleted where deleted_at < now() - interval '7 days';
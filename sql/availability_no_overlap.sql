@@ -0,0 +1,15 @@
+-- Reject overlapping availability windows of the same doctor in the database
+-- itself, including writes that bypass AvailabilityService (e.g. the
+-- dashboard). Existing overlaps make this fail: find and fix them first with
+-- the Schedule Audit in the CLI.
+create extension if not exists btree_gist;
+
+-- Re-running this file replaces the constraint instead of failing on it
+alter table availabilityofdoctors1
+    drop constraint if exists availabilityofdoctors1_no_overlap;
+alter table availabilityofdoctors1
+    add constraint availabilityofdoctors1_no_overlap
+    exclude using gist (
+        doctor_id with =,
+        tsrange(available_date + start_time, available_date + end_time) with &&
+    );
@@ -0,0 +1,21 @@
+-- Weekly availability patterns, expanded into concrete slots on demand.
+create table if not exists availability_templates1 (
+    template_id    bigint generated always as identity primary key,
+    doctor_id      bigint not null references doctors1 (doctor_id) on delete cascade,
+    weekday        smallint not null check (weekday between 0 and 6),  -- 0 = Monday
+    start_time     time not null,
+    end_time       time not null,
+    effective_from date not null,
+    effective_to   date,                                               -- exclusive, null = open ended
+    exceptions     date[] not null default '{}',                       -- dates the pattern is skipped
+    check (start_time < end_time),
+    check (effective_to is null or effective_from < effective_to)
+);
+
+create index if not exists availability_templates1_doctor_idx
+    on availability_templates1 (doctor_id);
+
+-- Materializing a template day is an insert of that day's windows; this makes
+-- concurrent materializations of the same day collide instead of duplicating.
+create unique index if not exists availabilityofdoctors1_doctor_day_start_key
+    on availabilityofdoctors1 (doctor_id, available_date, start_time);
@@ -1,4 +1,5 @@
 import json
+import logging
 import sys
 import os
 from datetime import datetime
@@ -6,27 +7,67 @@ import time  # Added for real-time-like delay
 
 # Adjust the path to go up to src and then access dao and service
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-from dao.patient_dao import PatientDAO
-from dao.doctor_dao import DoctorDAO
+from config import USE_AVAILABILITY_TEMPLATES, USE_CHANGE_FEED, REFERENCE_CACHE_TTL, configure_logging
+from dao.instrumentation import METRICS
+from dao.patient_dao import PatientDAO, CachedPatientDAO
+from dao.doctor_dao import DoctorDAO, CachedDoctorDAO
 from dao.availability_dao import AvailabilityDAO
 from dao.appointment_dao import AppointmentDAO
 from dao.payment_dao import PaymentDAO
 from dao.medical_record_dao import MedicalRecordDAO
+from dao.availability_template_dao import AvailabilityTemplateDAO
 from service.patient_service import PatientService, PatientError
 from service.doctor_service import DoctorService, DoctorError
 from service.availability_service import AvailabilityService, AvailabilityError
 from service.appointment_service import AppointmentService, AppointmentError
 from service.payment_service import PaymentService, PaymentError
 from service.medical_record_service import MedicalRecordService, MedicalRecordError
+from service.slot_index import SlotIndex
+from service.slot_bitmap import SlotBitmap
+from service.specialization_index import SpecializationIndex
+from service.waitlist import Waitlist
+from service.availability_templates import AvailabilityTemplates
+from service.schedule_audit import ScheduleAudit, format_report
+from service.name_search import NameIndex
+from service.change_feed import ChangeFeed
+
+logger = logging.getLogger(__name__)
 
 class PatientCLI:
-    def __init__(self):
-        self.patient_service = PatientService(PatientDAO())
-        self.doctor_service = DoctorService(DoctorDAO())
-        self.availability_service = AvailabilityService(AvailabilityDAO())
-        self.appointment_service = AppointmentService(AppointmentDAO(), AvailabilityDAO())
-        self.payment_service = PaymentService(PaymentDAO())
-        self.medical_record_service = MedicalRecordService(MedicalRecordDAO())
+    def __init__(self, client=None):
+        # All DAOs share one supabase client; it is created on the first query
+        availability_dao = AvailabilityDAO(client)
+        appointment_dao = AppointmentDAO(client)
+        templates = (
+            AvailabilityTemplates(AvailabilityTemplateDAO(client), availability_dao)
+            if USE_AVAILABILITY_TEMPLATES else None
+        )
+        # In-memory slot views shared by the services that read and write availability
+        slot_index = SlotIndex(availability_dao)
+        slot_bitmap = SlotBitmap(availability_dao, appointment_dao, templates=templates)
+        # Doctors and patients rarely change: reads by ID and lists come from memory
+        cached = REFERENCE_CACHE_TTL > 0
+        doctor_dao = CachedDoctorDAO(client) if cached else DoctorDAO(client)
+        specialization_index = SpecializationIndex(doctor_dao)
+        patient_dao = CachedPatientDAO(client) if cached else PatientDAO(client)
+        payment_dao = PaymentDAO(client)
+        medical_record_dao = MedicalRecordDAO(client)
+        self.patient_service = PatientService(
+            patient_dao, NameIndex(patient_dao), appointment_dao, medical_record_dao, payment_dao
+        )
+        self.doctor_service = DoctorService(doctor_dao, specialization_index, NameIndex(doctor_dao))
+        self.availability_service = AvailabilityService(availability_dao, slot_index, slot_bitmap, templates)
+        self.appointment_service = AppointmentService(
+            appointment_dao, availability_dao, slot_index, slot_bitmap, specialization_index, Waitlist(), templates,
+            patient_dao, doctor_dao
+        )
+        self.payment_service = PaymentService(payment_dao, appointment_dao, patient_dao, doctor_dao)
+        self.medical_record_service = MedicalRecordService(
+            medical_record_dao, appointment_dao, patient_dao, doctor_dao
+        )
+        self.schedule_audit = ScheduleAudit(availability_dao, appointment_dao)
+        # Local copy of appointments1 that the live view refreshes with deltas only
+        self.appointment_feed = ChangeFeed(appointment_dao) if USE_CHANGE_FEED else None
 
     # -------- Patient operations --------
     def add_patient(self):
@@ -58,6 +99,32 @@ class PatientCLI:
         patients = self.patient_service.list_patients(limit=100)
         print(json.dumps(patients, indent=2, default=str))
 
+    def search_patients(self):
+        try:
+            query = input("Patient name (partial or misspelled is fine): ")
+            matches = self.patient_service.search_patients(query)
+            print(json.dumps(matches, indent=2, default=str) if matches else "No matching patients.")
+        except PatientError as e:
+            print(f"Patient error: {e}")
+        except Exception as e:
+            print(f"Unexpected error: {e}")
+
+    def patient_timeline(self):
+        try:
+            patient_id = int(input("Patient ID: "))
+            entries = self.patient_service.timeline(patient_id)
+            if not entries:
+                print("No appointments, medical records or payments for this patient.")
+            for entry in entries:
+                when = f"{entry['date']} {str(entry['time'])[:5]}" if entry["date"] else "(no appointment)"
+                print(f"{when}  {entry['kind']:<14} {json.dumps(entry['row'], default=str)}")
+        except PatientError as e:
+            print(f"Patient error: {e}")
+        except ValueError as e:
+            print(f"Invalid input error: {e}")
+        except Exception as e:
+            print(f"Unexpected error: {e}")
+
     def update_patient(self):
         try:
             patient_id = int(input("Patient ID to update: "))
@@ -121,6 +188,16 @@ class PatientCLI:
         doctors = self.doctor_service.list_doctors(limit=100)
         print(json.dumps(doctors, indent=2, default=str))
 
+    def search_doctors(self):
+        try:
+            query = input("Doctor name (partial or misspelled is fine): ")
+            matches = self.doctor_service.search_doctors(query)
+            print(json.dumps(matches, indent=2, default=str) if matches else "No matching doctors.")
+        except DoctorError as e:
+            print(f"Doctor error: {e}")
+        except Exception as e:
+            print(f"Unexpected error: {e}")
+
     def update_doctor(self):
         try:
             doctor_id = int(input("Doctor ID to update: "))
@@ -237,16 +314,14 @@ class PatientCLI:
             doctor_id = int(input("Doctor ID: "))
             appointment_date = input("Appointment Date (YYYY-MM-DD): ")
             appointment_time = input("Appointment Time (HH:MM): ")
-            # Debug: Print raw input
-            print(f"Raw appointment_time: {appointment_time}")
+            logger.debug("Raw appointment_time: %s", appointment_time)
             # Ensure strict HH:MM format and handle potential extra data
             try:
                 datetime.strptime(appointment_date, "%Y-%m-%d")
                 # Parse time and strip any seconds if present
                 time_obj = datetime.strptime(appointment_time, "%H:%M")
                 appointment_time = time_obj.strftime("%H:%M")  # Normalize to HH:MM
-                # Debug: Print normalized time
-                print(f"Normalized appointment_time: {appointment_time}")
+                logger.debug("Normalized appointment_time: %s", appointment_time)
             except ValueError as e:
                 raise ValueError(f"Invalid date/time format. Use YYYY-MM-DD for date and HH:MM for time. Error: {e}")
             # Explicitly pass the normalized value
@@ -266,14 +341,37 @@ class PatientCLI:
             print(f"Unexpected error: {e}")
 
     def list_appointments(self):
-        while True:
-            appointments = self.appointment_service.list_appointments()
-            print("\n--- Current Appointments (Refreshing every 5 seconds) ---")
-            print(json.dumps(appointments, indent=2, default=str))
-            time.sleep(5)  # Refresh every 5 seconds
-            print("\nPress 'q' to quit viewing, or any other key to continue...")
-            if input().lower() == 'q':
-                break
+        feed = self.appointment_feed
+        if feed is None:
+            # Without the change feed, re-read the whole table on every refresh
+            while True:
+                appointments = self.appointment_service.list_appointments()
+                print("\n--- Current Appointments (Refreshing every 5 seconds) ---")
+                print(json.dumps(appointments, indent=2, default=str))
+                time.sleep(5)  # Refresh every 5 seconds
+                print("\nPress 'q' to quit viewing, or any other key to continue...")
+                if input().lower() == 'q':
+                    break
+            return
+        try:
+            feed.poll()
+            print(f"\n--- Current Appointments ({len(feed)}) ---")
+            print(json.dumps(feed.rows(), indent=2, default=str))
+            while True:
+                time.sleep(5)  # Refresh every 5 seconds
+                changes = feed.poll()
+                print(f"\n--- Changes since the last refresh ({len(feed)} appointments) ---")
+                for row in changes["upserted"]:
+                    print(json.dumps(row, indent=2, default=str))
+                for appointment_id in changes["deleted"]:
+                    print(f"Deleted appointment {appointment_id}")
+                if not changes["upserted"] and not changes["deleted"]:
+                    print("No changes.")
+                print("\nPress 'q' to quit viewing, or any other key to continue...")
+                if input().lower() == 'q':
+                    break
+        except Exception as e:
+            print(f"Unexpected error: {e}")
     def update_appointment(self):
         try:
             appointment_id = int(input("Appointment ID to update: "))
@@ -332,7 +430,7 @@ class PatientCLI:
             print(f"Unexpected error: {e}")
 
     def list_payments(self):
-        payments = self.payment_service.list_payments()
+        payments = self.payment_service.list_payments_detailed()
         print(json.dumps(payments, indent=2, default=str))
 
     def update_payment(self):
@@ -390,7 +488,7 @@ class PatientCLI:
             print(f"Unexpected error: {e}")
 
     def list_medical_records(self):
-        medical_records = self.medical_record_service.list_medical_records()
+        medical_records = self.medical_record_service.list_medical_records_detailed()
         print(json.dumps(medical_records, indent=2, default=str))
 
     def update_medical_record(self):
@@ -427,6 +525,23 @@ class PatientCLI:
         except Exception as e:
             print(f"Unexpected error: {e}")
 
+    # -------- Audit --------
+    def audit_schedule(self):
+        try:
+            print("Auditing availability and appointments...")
+            print(format_report(self.schedule_audit.run()))
+        except Exception as e:
+            print(f"Unexpected error: {e}")
+
+    # -------- Metrics --------
+    def show_metrics(self):
+        """Per table and DAO method: calls, errors, latency histogram, rows and bytes since start."""
+        fmt = input("Format (1. Prometheus text, 2. JSON): ")
+        if fmt == "2":
+            print(METRICS.to_json(indent=2))
+        else:
+            print(METRICS.to_prometheus())
+
     # -------- Menu runner --------
     def run(self):
         while True:
@@ -437,7 +552,9 @@ class PatientCLI:
             print("4. Appointment Operations")
             print("5. Payment Operations")
             print("6. Medical Record Operations")
-            print("7. Exit")
+            print("7. Schedule Audit")
+            print("8. Supabase Call Metrics")
+            print("9. Exit")
             choice = input("Select an option: ")
 
             if choice == "1":
@@ -447,7 +564,9 @@ class PatientCLI:
                     print("2. List Patients")
                     print("3. Update Patient")
                     print("4. Delete Patient")
-                    print("5. Back to Main Menu")
+                    print("5. Search Patients by Name")
+                    print("6. Patient Timeline")
+                    print("7. Back to Main Menu")
                     sub_choice = input("Select an option: ")
                     if sub_choice == "1":
                         self.add_patient()
@@ -458,6 +577,10 @@ class PatientCLI:
                     elif sub_choice == "4":
                         self.delete_patient()
                     elif sub_choice == "5":
+                        self.search_patients()
+                    elif sub_choice == "6":
+                        self.patient_timeline()
+                    elif sub_choice == "7":
                         break
                     else:
                         print("Invalid option. Please try again.")
@@ -468,7 +591,8 @@ class PatientCLI:
                     print("2. List Doctors")
                     print("3. Update Doctor")
                     print("4. Delete Doctor")
-                    print("5. Back to Main Menu")
+                    print("5. Search Doctors by Name")
+                    print("6. Back to Main Menu")
                     sub_choice = input("Select an option: ")
                     if sub_choice == "1":
                         self.add_doctor()
@@ -479,6 +603,8 @@ class PatientCLI:
                     elif sub_choice == "4":
                         self.delete_doctor()
                     elif sub_choice == "5":
+                        self.search_doctors()
+                    elif sub_choice == "6":
                         break
                     else:
                         print("Invalid option. Please try again.")
@@ -567,11 +693,16 @@ class PatientCLI:
                     else:
                         print("Invalid option. Please try again.")
             elif choice == "7":
+                self.audit_schedule()
+            elif choice == "8":
+                self.show_metrics()
+            elif choice == "9":
                 print("Exiting...")
                 break
             else:
                 print("Invalid option. Please try again.")
 
 if __name__ == "__main__":
+    configure_logging()
     cli = PatientCLI()
     cli.run()
\ No newline at end of file
@@ -1,16 +1,140 @@
+import logging
 import os
+import random
+import threading
 from dotenv import load_dotenv
-from supabase import create_client, Client
 
 load_dotenv()  # loads .env from project root
 
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
-def get_supabase() -> Client:
+# HTTP connection pool shared by every DAO
+SUPABASE_MAX_CONNECTIONS = int(os.getenv("SUPABASE_MAX_CONNECTIONS", "10"))
+SUPABASE_MAX_KEEPALIVE = int(os.getenv("SUPABASE_MAX_KEEPALIVE", "5"))
+SUPABASE_KEEPALIVE_EXPIRY = float(os.getenv("SUPABASE_KEEPALIVE_EXPIRY", "30"))
+SUPABASE_TIMEOUT = float(os.getenv("SUPABASE_TIMEOUT", "10"))
+
+# Identical reads in flight at the same time share one request (dao/single_flight.py)
+SUPABASE_COALESCE_READS = os.getenv("SUPABASE_COALESCE_READS", "true").lower() in ("1", "true", "yes")
+
+# In-process cache of doctors and patients (dao/cached_dao.py): rows kept and
+# seconds each stays fresh; a TTL of 0 turns the cache off
+REFERENCE_CACHE_SIZE = int(os.getenv("REFERENCE_CACHE_SIZE", "5000"))
+REFERENCE_CACHE_TTL = float(os.getenv("REFERENCE_CACHE_TTL", "300"))
+
+# Per-call DAO metrics (dao/instrumentation.py)
+DAO_METRICS = os.getenv("DAO_METRICS", "true").lower() in ("1", "true", "yes")
+
+# Log level for the CLI and dashboard, and the share of DEBUG/INFO records
+# that is kept; WARNING and above are never dropped
+LOG_LEVEL = os.getenv("LOG_LEVEL", "WARNING").upper()
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1"))
+
+# Weekly availability templates need the table in sql/availability_templates1.sql
+USE_AVAILABILITY_TEMPLATES = os.getenv("USE_AVAILABILITY_TEMPLATES", "false").lower() in ("1", "true", "yes")
+
+# Live appointment views fed by the change feed need sql/appointments_change_feed.sql
+USE_CHANGE_FEED = os.getenv("USE_CHANGE_FEED", "false").lower() in ("1", "true", "yes")
+
+_client = None
+_client_lock = threading.Lock()
+
+
+class _Sampled(logging.Filter):
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno >= logging.WARNING or random.random() < self.rate
+
+
+def configure_logging():
+    """
+    Send log records to stderr at LOG_LEVEL, keeping LOG_SAMPLE_RATE of those
+    below WARNING. Records under the level cost only the logger's level check.
+    """
+    logging.basicConfig(format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    root = logging.getLogger()
+    root.setLevel(LOG_LEVEL)
+    for handler in root.handlers:
+        if not any(isinstance(f, _Sampled) for f in handler.filters):
+            handler.addFilter(_Sampled(LOG_SAMPLE_RATE))
+
+
+def _create_client():
+    """Build a supabase client whose HTTP traffic goes through one bounded keep-alive pool."""
+    # Imported here so that importing the DAOs/CLI does not pay for the supabase import
+    import httpx
+    from supabase import create_client, ClientOptions
+    from dao.instrumentation import count_response_bytes
+
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        raise RuntimeError("SUPABASE_URL and SUPABASE_KEY must be set in environment (.env)")
+
+    http_client = httpx.Client(
+        limits=httpx.Limits(
+            max_connections=SUPABASE_MAX_CONNECTIONS,
+            max_keepalive_connections=SUPABASE_MAX_KEEPALIVE,
+            keepalive_expiry=SUPABASE_KEEPALIVE_EXPIRY,
+        ),
+        timeout=SUPABASE_TIMEOUT,
+        event_hooks={"response": [count_response_bytes]},
+    )
+    try:
+        options = ClientOptions(httpx_client=http_client, postgrest_client_timeout=SUPABASE_TIMEOUT)
+    except TypeError:
+        # Older supabase releases cannot take an injected httpx client
+        http_client.close()
+        options = ClientOptions(postgrest_client_timeout=SUPABASE_TIMEOUT)
+    return create_client(SUPABASE_URL, SUPABASE_KEY, options=options)
+
+
+def get_supabase():
     """
-    Return a supabase client. Raises RuntimeError if config missing.
+    Return the shared supabase client, creating it on first use.
+    Raises RuntimeError if config missing.
     """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = _create_client()
+    return _client
+
+
+async def create_async_supabase():
+    """
+    Build an async supabase client for the running event loop, with the same
+    pool limits as the sync one. The caller owns it; one per loop is enough.
+    """
+    import httpx
+    from supabase import acreate_client, AsyncClientOptions
+    from dao.instrumentation import count_response_bytes_async
+
     if not SUPABASE_URL or not SUPABASE_KEY:
         raise RuntimeError("SUPABASE_URL and SUPABASE_KEY must be set in environment (.env)")
-    return create_client(SUPABASE_URL, SUPABASE_KEY)
\ No newline at end of file
+
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=SUPABASE_MAX_CONNECTIONS,
+            max_keepalive_connections=SUPABASE_MAX_KEEPALIVE,
+            keepalive_expiry=SUPABASE_KEEPALIVE_EXPIRY,
+        ),
+        timeout=SUPABASE_TIMEOUT,
+        event_hooks={"response": [count_response_bytes_async]},
+    )
+    try:
+        options = AsyncClientOptions(httpx_client=http_client, postgrest_client_timeout=SUPABASE_TIMEOUT)
+    except TypeError:
+        await http_client.aclose()
+        options = AsyncClientOptions(postgrest_client_timeout=SUPABASE_TIMEOUT)
+    return await acreate_client(SUPABASE_URL, SUPABASE_KEY, options=options)
+
+
+def set_supabase(client):
+    """Replace the shared client (e.g. with a local stand-in backend). Pass None to reset."""
+    global _client
+    with _client_lock:
+        _client = client
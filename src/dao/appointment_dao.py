@@ -1,16 +1,19 @@
-from supabase import create_client, Client
-import os
-from dotenv import load_dotenv
+from dao.async_base_dao import AsyncBaseDAO
+from dao.base_dao import BaseDAO, DEFAULT_PAGE_SIZE
+from dao.models import Appointment
 
-# Load environment variables
-load_dotenv()
 
-# Initialize Supabase client
-supabase_url = os.getenv("SUPABASE_URL")
-supabase_key = os.getenv("SUPABASE_KEY")
-supabase: Client = create_client(supabase_url, supabase_key)
+class AppointmentDAO(BaseDAO):
+    table_name = "appointments1"
+    id_column = "appointment_id"
+    date_column = "appointment_date"
+    insert_columns = ("patient_id", "doctor_id", "appointment_date", "appointment_time")
+    insert_defaults = {"status": "Scheduled"}
+    update_columns = ("status",)
+    model = Appointment
+    updated_column = "updated_at"
+    tombstone_table = "appointments1_deleted"
 
-class AppointmentDAO:
     def add_appointment(self, patient_id, doctor_id, appointment_date, appointment_time):
         """Add a new appointment to the database."""
         data = {
@@ -20,22 +23,42 @@ class AppointmentDAO:
             "appointment_time": appointment_time,
             "status": "Scheduled"
         }
-        response = supabase.table("appointments1").insert(data).execute()
-        return response.data[0] if response.data else None
+        return self._fetch_one(self.table().insert(data))
 
     def delete_appointment(self, appointment_id):
         """Delete an appointment from the database."""
-        supabase.table("appointments1").delete().eq("appointment_id", appointment_id).execute()
+        return self._execute(self.table().delete().eq("appointment_id", appointment_id))
 
-    def list_appointments(self):
-        """Retrieve all appointments from the database."""
-        response = supabase.table("appointments1").select("*").execute()
-        return response.data
+    def list_appointments(self, limit=None):
+        """Retrieve all appointments (or the first `limit` by ID) from the database."""
+        query = self.table().select("*")
+        if limit is not None:
+            query = query.order(self.id_column).limit(limit)
+        return self._fetch_all(query)
+
+    def iter_appointments(self, page_size=DEFAULT_PAGE_SIZE, columns="*", limit=None):
+        """Stream appointments page by page in ID order without loading the whole table."""
+        return self.iter_rows(columns=columns, page_size=page_size, limit=limit)
 
     def update_appointment(self, appointment_id, status=None):
         """Update an appointment's status."""
         updates = {}
         if status is not None:
             updates["status"] = status
-        response = supabase.table("appointments1").update(updates).eq("appointment_id", appointment_id).execute()
-        return response.data[0] if response.data else None
\ No newline at end of file
+        return self._fetch_one(self.table().update(updates).eq("appointment_id", appointment_id))
+
+    def list_by_patient(self, patient_id, date_from=None, date_to=None):
+        """Retrieve a patient's appointments, optionally within a date range."""
+        return self.list_where({"patient_id": patient_id}, date_from, date_to)
+
+    def list_by_doctor(self, doctor_id, date_from=None, date_to=None):
+        """Retrieve a doctor's appointments, optionally within a date range."""
+        return self.list_where({"doctor_id": doctor_id}, date_from, date_to)
+
+    def list_between(self, date_from=None, date_to=None):
+        """Retrieve rows with date_from <= appointment_date < date_to."""
+        return self.list_where(date_from=date_from, date_to=date_to)
+
+
+class AsyncAppointmentDAO(AsyncBaseDAO, AppointmentDAO):
+    """AppointmentDAO on the async supabase client: the same methods, awaited."""
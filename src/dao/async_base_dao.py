@@ -0,0 +1,78 @@
+import asyncio
+import weakref
+
+import config
+from dao.base_dao import DEFAULT_PAGE_SIZE
+from dao.instrumentation import count_response
+from dao.plans import drive_async, stream_async
+from dao.single_flight import async_single_flight
+
+# One in-flight limit per client, shared by every DAO on it
+_limits = weakref.WeakKeyDictionary()
+
+
+def _limit(client):
+    """
+    The semaphore bounding a client's in-flight requests to its pool size.
+    httpx's async pool rescans every waiting request whenever a connection
+    frees up, so a few thousand gathered requests queued in the pool cost
+    quadratic CPU; queued on a semaphore they cost nothing.
+    """
+    limit = _limits.get(client)
+    if limit is None:
+        limit = _limits[client] = asyncio.Semaphore(config.SUPABASE_MAX_CONNECTIONS)
+    return limit
+
+
+class AsyncBaseDAO:
+    """
+    Mixin that turns a table DAO into its asyncio twin on the async supabase client.
+
+    Mixed in ahead of the sync DAO (class AsyncPatientDAO(AsyncBaseDAO,
+    PatientDAO)), it replaces the three execute hooks with coroutines, so
+    every single-request method of the DAO returns an awaitable and keeps
+    its query building. The methods that send several requests run the sync
+    DAO's plans through the async drivers; iter_* return async iterators.
+    """
+
+    def __init__(self, client):
+        # The async client has to be created inside the event loop that uses
+        # it (config.create_async_supabase()), so it is always passed in
+        self._client = client
+
+    @property
+    def client(self):
+        return self._client
+
+    async def _send(self, query):
+        response = await async_single_flight(self.client).execute(query, self._request)
+        count_response(response.data)
+        return response
+
+    async def _request(self, query):
+        async with _limit(self.client):
+            return await query.execute()
+
+    async def _execute(self, query):
+        await self._send(query)
+
+    async def _fetch_all(self, query):
+        return (await self._send(query)).data
+
+    async def _fetch_one(self, query):
+        data = (await self._send(query)).data
+        return data[0] if data else None
+
+    # The plans of the multi-request methods (get_many, iter_rows, add_many,
+    # ...) are BaseDAO's; only the drivers differ
+    _drive = staticmethod(drive_async)
+    _stream = staticmethod(stream_async)
+
+    async def list_models(self, filters=None, date_from=None, date_to=None, columns="*"):
+        from_row = self.model.from_row
+        return [from_row(row) for row in await self.list_where(filters, date_from, date_to, columns)]
+
+    async def iter_models(self, filters=None, columns="*", page_size=DEFAULT_PAGE_SIZE, limit=None,
+                          date_from=None, date_to=None):
+        async for row in self.iter_rows(filters, columns, page_size, limit, date_from, date_to):
+            yield self.model.from_row(row)
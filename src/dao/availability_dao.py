@@ -1,16 +1,17 @@
-from supabase import create_client, Client
-import os
-from dotenv import load_dotenv
+from dao.async_base_dao import AsyncBaseDAO
+from dao.base_dao import BaseDAO, DEFAULT_PAGE_SIZE
+from dao.models import Availability
 
-# Load environment variables
-load_dotenv()
 
-# Initialize Supabase client
-supabase_url = os.getenv("SUPABASE_URL")
-supabase_key = os.getenv("SUPABASE_KEY")
-supabase: Client = create_client(supabase_url, supabase_key)
+class AvailabilityDAO(BaseDAO):
+    table_name = "availabilityofdoctors1"
+    id_column = "availability_id"
+    date_column = "available_date"
+    insert_columns = ("doctor_id", "available_date", "start_time", "end_time")
+    insert_defaults = {"is_available": True}
+    update_columns = ("is_available", "start_time", "end_time", "available_date")
+    model = Availability
 
-class AvailabilityDAO:
     def add_availability(self, doctor_id, available_date, start_time, end_time):
         """Add a new availability slot for a doctor."""
         data = {
@@ -20,22 +21,80 @@ class AvailabilityDAO:
             "end_time": end_time,
             "is_available": True
         }
-        response = supabase.table("availabilityofdoctors1").insert(data).execute()
-        return response.data[0] if response.data else None
+        return self._fetch_one(self.table().insert(data))
 
     def delete_availability(self, availability_id):
         """Delete an availability slot."""
-        supabase.table("availabilityofdoctors1").delete().eq("availability_id", availability_id).execute()
+        return self._execute(self.table().delete().eq("availability_id", availability_id))
 
-    def list_availability(self, doctor_id=None):
+    def list_availability(self, doctor_id=None, limit=None):
         """Retrieve all availability slots or those for a specific doctor."""
-        query = supabase.table("availabilityofdoctors1").select("*")
+        query = self.table().select("*")
         if doctor_id:
             query = query.eq("doctor_id", doctor_id)
-        response = query.execute()
-        return response.data
+        if limit is not None:
+            query = query.order(self.id_column).limit(limit)
+        return self._fetch_all(query)
 
-    def update_availability(self, availability_id, is_available=None, start_time=None, end_time=None, appointment_date=None):
+    def iter_availability(self, doctor_id=None, page_size=DEFAULT_PAGE_SIZE, columns="*", limit=None):
+        """Stream availability slots (optionally of one doctor) page by page in ID order."""
+        filters = {"doctor_id": doctor_id} if doctor_id else None
+        return self.iter_rows(filters, columns=columns, page_size=page_size, limit=limit)
+
+    def find_open_slot(self, doctor_id, available_date, at_time):
+        """
+        Return one open slot of the doctor on available_date that covers at_time
+        (start_time <= at_time < end_time), or None. Filtered server side.
+        """
+        return self._fetch_one(
+            self.table()
+            .select("*")
+            .eq("doctor_id", doctor_id)
+            .eq("available_date", str(available_date))
+            .eq("is_available", True)
+            .lte("start_time", str(at_time))
+            .gt("end_time", str(at_time))
+            .limit(1)
+        )
+
+    def claim_slot(self, availability_id):
+        """
+        Atomically flip an open slot to unavailable.
+
+        The update only matches while is_available is still true, so when two
+        callers race for the same slot exactly one gets the row back; the
+        other gets None.
+        """
+        return self._fetch_one(
+            self.table()
+            .update({"is_available": False})
+            .eq("availability_id", availability_id)
+            .eq("is_available", True)
+        )
+
+    def release_slot(self, availability_id):
+        """Mark a slot as available again."""
+        return self._fetch_one(self.table().update({"is_available": True}).eq("availability_id", availability_id))
+
+    def find_overlapping(self, doctor_id, available_date, start_time, end_time, exclude_id=None):
+        """
+        Return the doctor's slots on available_date that overlap [start_time,
+        end_time) (start_time < end and end_time > start), optionally leaving
+        out one slot. Filtered server side.
+        """
+        query = (
+            self.table()
+            .select("*")
+            .eq("doctor_id", doctor_id)
+            .eq("available_date", str(available_date))
+            .lt("start_time", str(end_time))
+            .gt("end_time", str(start_time))
+        )
+        if exclude_id is not None:
+            query = query.neq("availability_id", exclude_id)
+        return self._fetch_all(query.order("start_time"))
+
+    def update_availability(self, availability_id, is_available=None, start_time=None, end_time=None, available_date=None):
         updates = {}
         if is_available is not None:
             updates["is_available"] = is_available
@@ -43,7 +102,18 @@ class AvailabilityDAO:
             updates["start_time"] = start_time
         if end_time is not None:
             updates["end_time"] = end_time
-        if appointment_date is not None:
-            updates["appointment_date"] = appointment_date  # Add this line
-        response = supabase.table("availabilityofdoctors1").update(updates).eq("availability_id", availability_id).execute()
-        return response.data[0] if response.data else None
+        if available_date is not None:
+            updates["available_date"] = available_date
+        return self._fetch_one(self.table().update(updates).eq("availability_id", availability_id))
+
+    def list_by_doctor(self, doctor_id, date_from=None, date_to=None):
+        """Retrieve a doctor's availability slots, optionally within a date range."""
+        return self.list_where({"doctor_id": doctor_id}, date_from, date_to)
+
+    def list_between(self, date_from=None, date_to=None):
+        """Retrieve rows with date_from <= available_date < date_to."""
+        return self.list_where(date_from=date_from, date_to=date_to)
+
+
+class AsyncAvailabilityDAO(AsyncBaseDAO, AvailabilityDAO):
+    """AvailabilityDAO on the async supabase client: the same methods, awaited."""
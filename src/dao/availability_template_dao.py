@@ -0,0 +1,44 @@
+from dao.base_dao import BaseDAO
+
+
+class AvailabilityTemplateDAO(BaseDAO):
+    """Weekly availability patterns (see sql/availability_templates1.sql)."""
+    table_name = "availability_templates1"
+    id_column = "template_id"
+    insert_columns = ("doctor_id", "weekday", "start_time", "end_time", "effective_from", "effective_to")
+    update_columns = ("start_time", "end_time", "effective_to", "exceptions")
+
+    def add_template(self, doctor_id, weekday, start_time, end_time, effective_from, effective_to=None):
+        """Add a weekly availability pattern for a doctor."""
+        data = {
+            "doctor_id": doctor_id,
+            "weekday": weekday,
+            "start_time": start_time,
+            "end_time": end_time,
+            "effective_from": effective_from,
+            "effective_to": effective_to
+        }
+        return self._fetch_one(self.table().insert(data))
+
+    def delete_template(self, template_id):
+        """Delete an availability pattern."""
+        return self._execute(self.table().delete().eq("template_id", template_id))
+
+    def list_templates(self, doctor_id=None):
+        """Retrieve all patterns, or those of one doctor (a list of IDs is allowed), page by page."""
+        return list(self.iter_rows({"doctor_id": doctor_id} if doctor_id else None))
+
+    def update_template(self, template_id, start_time=None, end_time=None, effective_to=None, exceptions=None):
+        """Update a pattern's time window, end date or list of skipped dates."""
+        updates = {}
+        if start_time is not None:
+            updates["start_time"] = start_time
+        if end_time is not None:
+            updates["end_time"] = end_time
+        if effective_to is not None:
+            updates["effective_to"] = effective_to
+        if exceptions is not None:
+            updates["exceptions"] = exceptions
+        if not updates:
+            return None
+        return self._fetch_one(self.table().update(updates).eq("template_id", template_id))
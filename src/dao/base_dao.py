@@ -0,0 +1,324 @@
+from datetime import datetime
+
+from config import get_supabase
+from dao.instrumentation import count_response, instrument
+from dao.plans import collect, drive, stream
+from dao.single_flight import single_flight
+
+DEFAULT_PAGE_SIZE = 1000
+DEFAULT_CHUNK_SIZE = 500
+
+
+class BaseDAO:
+    """Common plumbing for the table DAOs: one shared, lazily created supabase client."""
+    table_name = None
+    id_column = None
+    date_column = None
+    # Columns written by add_many (with insert_defaults applied on top) and
+    # columns that update_many is allowed to change
+    insert_columns = ()
+    insert_defaults = {}
+    update_columns = ()
+    # Typed row class from dao.models that list_models/iter_models decode into
+    model = None
+    # Change feed: a timestamp column stamped on every insert/update and a
+    # table of (id, deleted_at) tombstones, both maintained by triggers
+    updated_column = None
+    tombstone_table = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Every public method of every DAO records its calls in instrumentation.METRICS
+        instrument(cls)
+
+    def __init__(self, client=None):
+        self._client = client
+
+    @property
+    def client(self):
+        """The injected client, or the shared one from config.get_supabase()."""
+        if self._client is None:
+            self._client = get_supabase()
+        return self._client
+
+    def table(self):
+        """Start a query against this DAO's table."""
+        return self.client.table(self.table_name)
+
+    # Every request ends in one of these three. AsyncBaseDAO turns them into
+    # coroutines, so the same single-request methods serve the async DAOs.
+    def _send(self, query):
+        """Send a query; an identical read already in flight on this client is shared instead."""
+        response = single_flight(self.client).execute(query)
+        count_response(response.data)
+        return response
+
+    def _execute(self, query):
+        """Send a query whose result is not needed."""
+        self._send(query)
+
+    def _fetch_all(self, query):
+        """Send a query and return its rows."""
+        return self._send(query).data
+
+    def _fetch_one(self, query):
+        """Send a query and return its first row, or None."""
+        data = self._send(query).data
+        return data[0] if data else None
+
+    # Methods that send several requests are written as plans (dao/plans.py)
+    # and run by these two, which AsyncBaseDAO replaces with the async drivers
+    _drive = staticmethod(drive)
+    _stream = staticmethod(stream)
+
+    def get_by_id(self, record_id, columns="*"):
+        """Fetch a single row by primary key, or None if it does not exist."""
+        return self._fetch_one(self.table().select(columns).eq(self.id_column, record_id).limit(1))
+
+    def _with_id(self, columns):
+        """A column list that is sure to include the primary key."""
+        if columns != "*" and self.id_column not in [c.strip() for c in columns.split(",")]:
+            columns = f"{self.id_column},{columns}"
+        return columns
+
+    def get_many(self, record_ids, columns="*", chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Fetch rows by primary key with one `in` request per chunk of distinct
+        IDs. Returns {id: row}; IDs that do not exist (and None) are left out.
+        """
+        return self._drive(self._get_many(record_ids, columns, chunk_size))
+
+    def _get_many(self, record_ids, columns, chunk_size):
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        columns = self._with_id(columns)
+        ids = list(dict.fromkeys(i for i in record_ids if i is not None))
+        found = {}
+        for start in range(0, len(ids), chunk_size):
+            rows = yield self._fetch_all(self.table().select(columns).in_(self.id_column, ids[start:start + chunk_size]))
+            found.update((row[self.id_column], row) for row in rows)
+        return found
+
+    def _filtered(self, query, filters=None, date_from=None, date_to=None):
+        """
+        Apply filters and an optional [date_from, date_to) range to a query.
+        A list, tuple or set value becomes an `in` filter, anything else `eq`.
+        """
+        for column, value in (filters or {}).items():
+            if isinstance(value, (list, tuple, set)):
+                query = query.in_(column, list(value))
+            else:
+                query = query.eq(column, value)
+        if date_from is not None or date_to is not None:
+            if self.date_column is None:
+                raise ValueError(f"{self.table_name} has no date column to filter on")
+            if date_from is not None:
+                query = query.gte(self.date_column, str(date_from))
+            if date_to is not None:
+                query = query.lt(self.date_column, str(date_to))
+        return query
+
+    def list_where(self, filters=None, date_from=None, date_to=None, columns="*"):
+        """
+        Retrieve rows matching equality filters, optionally restricted to
+        date_from <= date_column < date_to. All filtering happens server side.
+        """
+        return self._fetch_all(self._filtered(self.table().select(columns), filters, date_from, date_to))
+
+    def iter_rows(self, filters=None, columns="*", page_size=DEFAULT_PAGE_SIZE, limit=None,
+                  date_from=None, date_to=None, after=None):
+        """
+        Yield rows in primary key order, one page at a time.
+
+        Pages are fetched with keyset pagination (id > last seen id) rather than
+        offsets, so every page costs the same and at most page_size rows are held
+        in memory. `columns` may project a subset of columns; the primary key is
+        always included. `limit` caps the total number of rows yielded, and
+        `after` starts past that primary key instead of at the beginning.
+        """
+        return self._stream(self._pages(filters, columns, page_size, limit, date_from, date_to, after))
+
+    def _pages(self, filters, columns, page_size, limit, date_from, date_to, after):
+        if page_size <= 0:
+            raise ValueError("page_size must be positive")
+        columns = self._with_id(columns)
+        last_id = after
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = page_size if remaining is None else min(page_size, remaining)
+            query = self._filtered(self.table().select(columns), filters, date_from, date_to)
+            if last_id is not None:
+                query = query.gt(self.id_column, last_id)
+            rows = yield self._fetch_all(query.order(self.id_column).limit(size))
+            if len(rows) < size:
+                return
+            last_id = rows[-1][self.id_column]
+            if remaining is not None:
+                remaining -= len(rows)
+
+    def list_paged(self, filters=None, columns="*", page_size=DEFAULT_PAGE_SIZE, date_from=None, date_to=None):
+        """All rows iter_rows would yield, as one list (one awaitable on the async DAOs)."""
+        return self._drive(collect(self._pages(filters, columns, page_size, None, date_from, date_to, None)))
+
+    def list_models(self, filters=None, date_from=None, date_to=None, columns="*"):
+        """Like list_where, but decode each row once into this DAO's typed model."""
+        from_row = self.model.from_row
+        return [from_row(row) for row in self.list_where(filters, date_from, date_to, columns)]
+
+    def iter_models(self, filters=None, columns="*", page_size=DEFAULT_PAGE_SIZE, limit=None,
+                    date_from=None, date_to=None):
+        """Like iter_rows, but yield typed model instances."""
+        return map(self.model.from_row, self.iter_rows(filters, columns, page_size, limit, date_from, date_to))
+
+    def _require_feed(self):
+        if self.updated_column is None or self.tombstone_table is None:
+            raise ValueError(f"{self.table_name} has no change feed")
+
+    def latest_change(self):
+        """The newest updated_at or deleted_at in the table as a datetime, or None if both are empty."""
+        self._require_feed()
+        return self._drive(self._latest_change())
+
+    def _latest_change(self):
+        newest = None
+        for table, column in ((self.table_name, self.updated_column), (self.tombstone_table, "deleted_at")):
+            rows = yield self._fetch_all(self.client.table(table).select(column).order(column, desc=True).limit(1))
+            if rows:
+                stamp = datetime.fromisoformat(rows[0][column])
+                newest = stamp if newest is None else max(newest, stamp)
+        return newest
+
+    def _pages_since(self, table, column, since, columns, page_size):
+        """
+        Keyset scan of rows with column >= since in (column, id) order. After
+        a full page, the rest of the rows sharing its last timestamp are read
+        by ID before the later timestamps, so a run of equal timestamps longer
+        than a page is neither cut short nor re-read. A row updated mid-scan
+        moves ahead instead of shifting the pages under the reader.
+        """
+        columns = self._with_id(columns)
+
+        def select():
+            return self.client.table(table).select(columns)
+
+        rows = yield self._fetch_all(select().gte(column, since).order(column).order(self.id_column).limit(page_size))
+        while len(rows) == page_size:
+            last, last_id = rows[-1][column], rows[-1][self.id_column]
+            rows = yield self._fetch_all(
+                select().eq(column, last).gt(self.id_column, last_id).order(self.id_column).limit(page_size)
+            )
+            if len(rows) < page_size:
+                rows = yield self._fetch_all(select().gt(column, last).order(column).order(self.id_column).limit(page_size))
+
+    def iter_changed_since(self, since, columns="*", page_size=DEFAULT_PAGE_SIZE):
+        """Yield rows inserted or updated at or after `since`, oldest change first."""
+        self._require_feed()
+        return self._stream(self._pages_since(self.table_name, self.updated_column, since, columns, page_size))
+
+    def iter_deleted_since(self, since, page_size=DEFAULT_PAGE_SIZE):
+        """Yield {id_column, "deleted_at"} tombstones of rows deleted at or after `since`."""
+        self._require_feed()
+        return self._stream(self._pages_since(self.tombstone_table, "deleted_at", since,
+                                              f"{self.id_column},deleted_at", page_size))
+
+    def _insert_row(self, row):
+        """Shape a caller row into the payload add_* would send; every row gets the same keys."""
+        data = {column: row.get(column) for column in self.insert_columns}
+        data.update(self.insert_defaults)
+        return data
+
+    def add_many(self, rows, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Insert rows with one multi-row request per chunk.
+
+        A chunk that the server rejects is retried row by row so that one bad
+        row does not sink the others. Returns {"succeeded": [...], "failed":
+        [{"index", "row", "error"}, ...]} where index refers to `rows`.
+        """
+        return self._drive(self._add_many(rows, chunk_size))
+
+    def _add_many(self, rows, chunk_size):
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        rows = list(rows)
+        succeeded, failed = [], []
+        for start in range(0, len(rows), chunk_size):
+            chunk = [self._insert_row(row) for row in rows[start:start + chunk_size]]
+            try:
+                succeeded.extend((yield self._fetch_all(self.table().insert(chunk))))
+                continue
+            except Exception:
+                pass
+            for offset, data in enumerate(chunk):
+                try:
+                    succeeded.extend((yield self._fetch_all(self.table().insert(data))))
+                except Exception as e:
+                    failed.append({"index": start + offset, "row": rows[start + offset], "error": str(e)})
+        return {"succeeded": succeeded, "failed": failed}
+
+    def update_many(self, rows, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Apply updates given as rows holding the primary key plus changed columns.
+
+        Rows carrying identical changes are grouped and sent as one
+        `update ... where id in (...)` request per chunk. None values are
+        ignored, as in the single-row update_* methods. Returns the same shape
+        as add_many; rows whose ID matched nothing are reported as failed.
+        """
+        return self._drive(self._update_many(rows, chunk_size))
+
+    def _update_many(self, rows, chunk_size):
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive")
+        rows = list(rows)
+        succeeded = []
+        groups, failed = self._update_groups(rows)
+        for updates, chunk in self._update_chunks(groups, chunk_size):
+            ids = [rows[i][self.id_column] for i in chunk]
+            try:
+                data = yield self._fetch_all(self.table().update(updates).in_(self.id_column, ids))
+            except Exception:
+                data = None
+            errored = set()
+            if data is None:
+                data = []
+                for i in chunk:
+                    try:
+                        data.extend((yield self._fetch_all(
+                            self.table().update(updates).eq(self.id_column, rows[i][self.id_column])
+                        )))
+                    except Exception as e:
+                        errored.add(i)
+                        failed.append({"index": i, "row": rows[i], "error": str(e)})
+            succeeded.extend(data)
+            failed.extend(self._unmatched(rows, chunk, data, errored))
+        failed.sort(key=lambda f: f["index"])
+        return {"succeeded": succeeded, "failed": failed}
+
+    def _update_groups(self, rows):
+        """Group update rows by the changes they carry: ({changes: [indexes]}, failures)."""
+        groups, failed = {}, []
+        for index, row in enumerate(rows):
+            updates = {c: row[c] for c in self.update_columns if row.get(c) is not None}
+            if row.get(self.id_column) is None or not updates:
+                failed.append({"index": index, "row": row, "error": "ID and at least one field to update are required."})
+                continue
+            groups.setdefault(tuple(sorted(updates.items())), []).append(index)
+        return groups, failed
+
+    @staticmethod
+    def _update_chunks(groups, chunk_size):
+        for key, indexes in groups.items():
+            for start in range(0, len(indexes), chunk_size):
+                yield dict(key), indexes[start:start + chunk_size]
+
+    def _unmatched(self, rows, chunk, data, errored):
+        """Failures for the rows of a chunk that the update did not return."""
+        updated_ids = {r[self.id_column] for r in data}
+        return [
+            {"index": i, "row": rows[i], "error": f"{self.id_column} {rows[i][self.id_column]} not found."}
+            for i in chunk if i not in errored and rows[i][self.id_column] not in updated_ids
+        ]
+
+
+instrument(BaseDAO)
@@ -0,0 +1,218 @@
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import config
+from dao.base_dao import DEFAULT_CHUNK_SIZE
+
+
+def _row_bytes(row):
+    return sys.getsizeof(row) + sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in row.items())
+
+
+def _project(row, columns):
+    """The columns of a full row that a select of `columns` would have returned."""
+    if columns == "*":
+        return dict(row)
+    return {c: row.get(c) for c in (c.strip() for c in columns.split(","))}
+
+
+class RowCache:
+    """
+    Bounded LRU of full rows by primary key; each row expires `ttl` seconds
+    after it was stored. Once a whole table has been loaded and fits, the
+    cache also answers "all rows" until that load expires. Rows go in and
+    out as copies, so callers cannot change what the cache holds.
+
+    Writes (put, discard, invalidate) bump `version`; rows read from the
+    server are only stored by load() if no write landed while they were in
+    flight, so a slow read never overwrites a newer write.
+    """
+
+    def __init__(self, max_entries=None, ttl=None, clock=time.monotonic):
+        self.max_entries = config.REFERENCE_CACHE_SIZE if max_entries is None else max_entries
+        self.ttl = config.REFERENCE_CACHE_TTL if ttl is None else ttl
+        if self.max_entries <= 0:
+            raise ValueError("max_entries must be positive")
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # id -> (expires_at, row)
+        # Every row of the table is in _entries until this time
+        self._complete_until = 0.0
+        # The table was found larger than max_entries; do not try again until then
+        self._oversized_until = 0.0
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, record_id):
+        """A copy of the cached row, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(record_id)
+            if entry is not None and entry[0] > self._clock():
+                self._entries.move_to_end(record_id)
+                self.hits += 1
+                return dict(entry[1])
+            if entry is not None:
+                del self._entries[record_id]
+                self._complete_until = 0.0
+            self.misses += 1
+            return None
+
+    def all_rows(self):
+        """Copies of every row of the table in key order, or None unless a full load is still fresh."""
+        with self._lock:
+            if self._complete_until > self._clock():
+                self.hits += 1
+                return [dict(row) for _, (_, row) in sorted(self._entries.items())]
+            self.misses += 1
+            return None
+
+    def may_hold_all(self):
+        """False while the table is known not to fit."""
+        return self._oversized_until <= self._clock()
+
+    def put(self, record_id, row):
+        """Store a row the caller just wrote."""
+        with self._lock:
+            self.version += 1
+            self._put(record_id, row, self._clock() + self.ttl)
+
+    def _put(self, record_id, row, expires_at):
+        self._entries[record_id] = (expires_at, dict(row))
+        self._entries.move_to_end(record_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._complete_until = 0.0
+
+    def load(self, rows, id_column, version, whole_table=False):
+        """
+        Store rows read from the server when `version` was current, unless a
+        write has landed since. With whole_table, the rows are the entire
+        table: if they fit, the cache answers all_rows() until they expire,
+        otherwise it remembers not to try for a while.
+        """
+        with self._lock:
+            now = self._clock()
+            if whole_table and len(rows) > self.max_entries:
+                self._oversized_until = now + self.ttl
+                return
+            if version != self.version:
+                return
+            if whole_table:
+                self._entries.clear()
+            for row in rows:
+                self._put(row[id_column], row, now + self.ttl)
+            if whole_table:
+                self._complete_until = now + self.ttl
+
+    def discard(self, record_id):
+        """Forget one row; a full load stays valid, the row is gone from the table too."""
+        with self._lock:
+            self.version += 1
+            self._entries.pop(record_id, None)
+
+    def invalidate(self, record_id=None):
+        """Drop one row, or everything when no ID is given (e.g. after writes from another process)."""
+        with self._lock:
+            self.version += 1
+            if record_id is None:
+                self._entries.clear()
+                self._oversized_until = 0.0
+            else:
+                self._entries.pop(record_id, None)
+            self._complete_until = 0.0
+
+    def stats(self):
+        """Hits, misses, hit ratio, entry count and approximate memory use in bytes."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": sys.getsizeof(self._entries) + sum(_row_bytes(row) for _, row in self._entries.values()),
+            }
+
+
+class CachedDAO:
+    """
+    Mixin that puts a RowCache in front of a table DAO (class
+    CachedDoctorDAO(CachedDAO, DoctorDAO)). Reads by ID and full-table lists
+    are served from memory; the DAO's own writes update the cache in place.
+    Writes from anywhere else show up once the rows expire, or right away
+    after invalidate().
+    """
+
+    def __init__(self, client=None, cache: RowCache = None):
+        super().__init__(client)
+        self.cache = cache or RowCache()
+
+    def invalidate(self, record_id=None):
+        self.cache.invalidate(record_id)
+
+    def _wrote(self, row, record_id=None):
+        """Write-through for a single-row write that returned `row` (None: the row is gone or unknown)."""
+        if row:
+            self.cache.put(row[self.id_column], row)
+        elif record_id is not None:
+            self.cache.discard(record_id)
+        return row
+
+    def _cached_list(self, fetch, limit):
+        """
+        Serve a list_*(limit) call from a full-table load. The table is
+        loaded by keyset paging up to one row past the cache size, since a
+        single request stops at the server's max-rows; a table that does not
+        fit is not cached, and the call goes to `fetch` as before.
+        """
+        rows = self.cache.all_rows()
+        if rows is None and self.cache.may_hold_all():
+            version = self.cache.version
+            rows = list(self.iter_rows(limit=self.cache.max_entries + 1))
+            self.cache.load(rows, self.id_column, version, whole_table=True)
+            if len(rows) > self.cache.max_entries:
+                rows = None
+        if rows is None:
+            return fetch(limit)
+        return rows if limit is None else rows[:limit]
+
+    def get_by_id(self, record_id, columns="*"):
+        row = self.cache.get(record_id)
+        if row is None:
+            version = self.cache.version
+            row = super().get_by_id(record_id)
+            if row is not None:
+                self.cache.load([row], self.id_column, version)
+        return _project(row, columns) if row is not None else None
+
+    def get_many(self, record_ids, columns="*", chunk_size=DEFAULT_CHUNK_SIZE):
+        columns = self._with_id(columns)
+        found, missing = {}, []
+        for record_id in dict.fromkeys(i for i in record_ids if i is not None):
+            row = self.cache.get(record_id)
+            if row is None:
+                missing.append(record_id)
+            else:
+                found[record_id] = _project(row, columns)
+        if missing:
+            # Misses are fetched whole so that they can be cached
+            version = self.cache.version
+            fetched = super().get_many(missing, "*", chunk_size)
+            self.cache.load(fetched.values(), self.id_column, version)
+            found.update((record_id, _project(row, columns)) for record_id, row in fetched.items())
+        return found
+
+    def add_many(self, rows, chunk_size=DEFAULT_CHUNK_SIZE):
+        result = super().add_many(rows, chunk_size)
+        for row in result["succeeded"]:
+            self._wrote(row)
+        return result
+
+    def update_many(self, rows, chunk_size=DEFAULT_CHUNK_SIZE):
+        result = super().update_many(rows, chunk_size)
+        for row in result["succeeded"]:
+            self._wrote(row)
+        return result
@@ -1,16 +1,16 @@
-from supabase import create_client, Client
-import os
-from dotenv import load_dotenv
+from dao.async_base_dao import AsyncBaseDAO
+from dao.base_dao import BaseDAO, DEFAULT_PAGE_SIZE
+from dao.cached_dao import CachedDAO
+from dao.models import Doctor
 
-# Load environment variables
-load_dotenv()
 
-# Initialize Supabase client
-supabase_url = os.getenv("SUPABASE_URL")
-supabase_key = os.getenv("SUPABASE_KEY")
-supabase: Client = create_client(supabase_url, supabase_key)
+class DoctorDAO(BaseDAO):
+    table_name = "doctors1"
+    id_column = "doctor_id"
+    insert_columns = ("full_name", "specialization", "email", "phone", "experience_years")
+    update_columns = ("phone", "specialization")
+    model = Doctor
 
-class DoctorDAO:
     def add_doctor(self, full_name, specialization, email, phone, experience_years):
         """Add a new doctor to the database."""
         data = {
@@ -20,17 +20,22 @@ class DoctorDAO:
             "phone": phone,
             "experience_years": experience_years
         }
-        response = supabase.table("doctors1").insert(data).execute()
-        return response.data[0] if response.data else None
+        return self._fetch_one(self.table().insert(data))
 
     def delete_doctor(self, doctor_id):
         """Delete a doctor from the database."""
-        supabase.table("doctors1").delete().eq("doctor_id", doctor_id).execute()
+        return self._execute(self.table().delete().eq("doctor_id", doctor_id))
 
-    def list_doctors(self):
-        """Retrieve all doctors from the database."""
-        response = supabase.table("doctors1").select("*").execute()
-        return response.data
+    def list_doctors(self, limit=None):
+        """Retrieve all doctors (or the first `limit` by ID) from the database."""
+        query = self.table().select("*")
+        if limit is not None:
+            query = query.order(self.id_column).limit(limit)
+        return self._fetch_all(query)
+
+    def iter_doctors(self, page_size=DEFAULT_PAGE_SIZE, columns="*", limit=None):
+        """Stream doctors page by page in ID order without loading the whole table."""
+        return self.iter_rows(columns=columns, page_size=page_size, limit=limit)
 
     def update_doctor(self, doctor_id, phone=None, specialization=None):
         """Update a doctor's phone or specialization in the database."""
@@ -39,5 +44,27 @@ class DoctorDAO:
             updates["phone"] = phone
         if specialization is not None:
             updates["specialization"] = specialization
-        response = supabase.table("doctors1").update(updates).eq("doctor_id", doctor_id).execute()
-        return response.data[0] if response.data else None
\ No newline at end of file
+        return self._fetch_one(self.table().update(updates).eq("doctor_id", doctor_id))
+
+
+class AsyncDoctorDAO(AsyncBaseDAO, DoctorDAO):
+    """DoctorDAO on the async supabase client: the same methods, awaited."""
+
+
+class CachedDoctorDAO(CachedDAO, DoctorDAO):
+    """DoctorDAO behind an LRU+TTL row cache that its own writes keep current."""
+
+    def add_doctor(self, full_name, specialization, email, phone, experience_years):
+        return self._wrote(super().add_doctor(full_name, specialization, email, phone, experience_years))
+
+    def update_doctor(self, doctor_id, phone=None, specialization=None):
+        return self._wrote(super().update_doctor(doctor_id, phone, specialization), doctor_id)
+
+    def delete_doctor(self, doctor_id):
+        try:
+            return super().delete_doctor(doctor_id)
+        finally:
+            self.cache.discard(doctor_id)
+
+    def list_doctors(self, limit=None):
+        return self._cached_list(super().list_doctors, limit)
@@ -0,0 +1,276 @@
+import functools
+import inspect
+import json
+import threading
+from bisect import bisect_left
+from collections.abc import AsyncIterator, Iterator
+from contextvars import ContextVar
+from time import perf_counter
+
+import config
+
+# Upper bounds, in seconds, of the latency histogram buckets (plus +Inf)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Public DAO attributes that only build queries and are not worth a series
+UNINSTRUMENTED = frozenset({"table"})
+
+# The DAO call being measured in this thread/task; DAO calls made inside it
+# (list_by_patient -> list_where) are part of it rather than series of their own
+_current = ContextVar("dao_call", default=None)
+
+
+class _Call:
+    __slots__ = ("table", "operation", "seconds", "requests", "rows", "bytes")
+
+    def __init__(self, table, operation):
+        self.table = table
+        self.operation = operation
+        self.seconds = 0.0
+        self.requests = 0
+        self.rows = 0
+        self.bytes = 0
+
+
+class _Series:
+    __slots__ = ("calls", "errors", "requests", "rows", "bytes", "seconds", "buckets")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.requests = 0
+        self.rows = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+class DAOMetrics:
+    """
+    Call count, errors, latency histogram, requests, rows returned and
+    response bytes per (table, operation), where operation is the DAO method
+    that the caller invoked.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def record(self, call, failed=False):
+        with self._lock:
+            series = self._series.get((call.table, call.operation))
+            if series is None:
+                series = self._series[(call.table, call.operation)] = _Series()
+            series.calls += 1
+            series.errors += failed
+            series.requests += call.requests
+            series.rows += call.rows
+            series.bytes += call.bytes
+            series.seconds += call.seconds
+            series.buckets[bisect_left(LATENCY_BUCKETS, call.seconds)] += 1
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def snapshot(self):
+        """[{table, operation, calls, errors, requests, rows, bytes, seconds, buckets: {le: cumulative count}}]."""
+        with self._lock:
+            series = sorted(self._series.items())
+            out = []
+            for (table, operation), s in series:
+                cumulative, buckets = 0, {}
+                for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), s.buckets):
+                    cumulative += count
+                    buckets[str(bound)] = cumulative
+                out.append({
+                    "table": table, "operation": operation, "calls": s.calls, "errors": s.errors,
+                    "requests": s.requests, "rows": s.rows, "bytes": s.bytes,
+                    "seconds": s.seconds, "buckets": buckets,
+                })
+            return out
+
+    def to_json(self, indent=None):
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self):
+        """The metrics in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = []
+
+        def family(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(samples)
+
+        def labels(s, **extra):
+            pairs = {"table": s["table"], "operation": s["operation"], **extra}
+            return "{" + ",".join(f'{k}="{_label(v)}"' for k, v in pairs.items()) + "}"
+
+        family("dao_calls_total", "counter", "DAO method calls.",
+               [f"dao_calls_total{labels(s)} {s['calls']}" for s in snapshot])
+        family("dao_errors_total", "counter", "DAO method calls that raised.",
+               [f"dao_errors_total{labels(s)} {s['errors']}" for s in snapshot])
+        family("dao_requests_total", "counter", "Supabase requests sent by DAO calls.",
+               [f"dao_requests_total{labels(s)} {s['requests']}" for s in snapshot])
+        family("dao_rows_returned_total", "counter", "Rows returned by Supabase to DAO calls.",
+               [f"dao_rows_returned_total{labels(s)} {s['rows']}" for s in snapshot])
+        family("dao_payload_bytes_total", "counter", "Response body bytes received by DAO calls.",
+               [f"dao_payload_bytes_total{labels(s)} {s['bytes']}" for s in snapshot])
+        histogram = []
+        for s in snapshot:
+            histogram.extend(f"dao_call_duration_seconds_bucket{labels(s, le=le)} {count}"
+                             for le, count in s["buckets"].items())
+            histogram.append(f"dao_call_duration_seconds_sum{labels(s)} {s['seconds']}")
+            histogram.append(f"dao_call_duration_seconds_count{labels(s)} {s['calls']}")
+        family("dao_call_duration_seconds", "histogram", "DAO call latency.", histogram)
+        return "\n".join(lines) + "\n"
+
+
+# The registry every instrumented DAO records into
+METRICS = DAOMetrics()
+
+
+def count_response(data):
+    """Add one request and its rows to the DAO call being measured, if any."""
+    call = _current.get()
+    if call is not None:
+        call.requests += 1
+        call.rows += len(data) if isinstance(data, list) else int(data is not None)
+
+
+def count_response_bytes(response):
+    """httpx response hook for the sync client: add the body size to the DAO call being measured."""
+    call = _current.get()
+    if call is not None:
+        response.read()
+        call.bytes += len(response.content)
+
+
+async def count_response_bytes_async(response):
+    """count_response_bytes for the async client."""
+    call = _current.get()
+    if call is not None:
+        await response.aread()
+        call.bytes += len(response.content)
+
+
+def _finish(call, started, failed):
+    call.seconds += perf_counter() - started
+    METRICS.record(call, failed)
+
+
+def _iterate(call, iterator):
+    """Measure a lazy result: time spent inside next(), recorded when iteration ends or stops."""
+    failed = False
+    try:
+        while True:
+            token = _current.set(call)
+            started = perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            except Exception:
+                failed = True
+                raise
+            finally:
+                call.seconds += perf_counter() - started
+                _current.reset(token)
+            yield item
+    finally:
+        METRICS.record(call, failed)
+
+
+async def _aiterate(call, iterator):
+    failed = False
+    try:
+        while True:
+            token = _current.set(call)
+            started = perf_counter()
+            try:
+                item = await iterator.__anext__()
+            except StopAsyncIteration:
+                return
+            except Exception:
+                failed = True
+                raise
+            finally:
+                call.seconds += perf_counter() - started
+                _current.reset(token)
+            yield item
+    finally:
+        METRICS.record(call, failed)
+
+
+async def _await(call, awaitable):
+    token = _current.set(call)
+    started = perf_counter()
+    failed = True
+    try:
+        result = await awaitable
+        failed = False
+        return result
+    finally:
+        _current.reset(token)
+        _finish(call, started, failed)
+
+
+def instrumented(method):
+    """
+    Wrap a DAO method so that each outermost call is recorded in METRICS.
+    Results that are awaited or iterated later (async methods, iter_*)
+    are measured while they run.
+    """
+    if getattr(method, "_instrumented", False):
+        return method
+    operation = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not config.DAO_METRICS or _current.get() is not None:
+            return method(self, *args, **kwargs)
+        call = _Call(self.table_name, operation)
+        token = _current.set(call)
+        started = perf_counter()
+        try:
+            result = method(self, *args, **kwargs)
+        except Exception:
+            _finish(call, started, True)
+            raise
+        finally:
+            _current.reset(token)
+        call.seconds += perf_counter() - started
+        if inspect.isawaitable(result):
+            return _await(call, result)
+        if isinstance(result, Iterator):
+            return _iterate(call, result)
+        if isinstance(result, AsyncIterator):
+            return _aiterate(call, result)
+        METRICS.record(call)
+        return result
+
+    wrapper._instrumented = True
+    return wrapper
+
+
+def instrument(cls):
+    """
+    Wrap every public method that cls defines or inherits, including those of
+    mixins such as AsyncBaseDAO, unless it is wrapped already.
+    """
+    seen = set()
+    for klass in cls.__mro__:
+        for name, value in vars(klass).items():
+            if name in seen:
+                continue
+            seen.add(name)
+            if name.startswith("_") or name in UNINSTRUMENTED or not inspect.isfunction(value):
+                continue
+            if not getattr(value, "_instrumented", False):
+                setattr(cls, name, instrumented(value))
+    return cls
@@ -1,16 +1,15 @@
-from supabase import create_client, Client
-import os
-from dotenv import load_dotenv
+from dao.async_base_dao import AsyncBaseDAO
+from dao.base_dao import BaseDAO, DEFAULT_PAGE_SIZE
+from dao.models import MedicalRecord
 
-# Load environment variables
-load_dotenv()
 
-# Initialize Supabase client
-supabase_url = os.getenv("SUPABASE_URL")
-supabase_key = os.getenv("SUPABASE_KEY")
-supabase: Client = create_client(supabase_url, supabase_key)
+class MedicalRecordDAO(BaseDAO):
+    table_name = "medical_records1"
+    id_column = "record_id"
+    insert_columns = ("patient_id", "doctor_id", "appointment_id", "diagnosis", "prescription")
+    update_columns = ("diagnosis", "prescription")
+    model = MedicalRecord
 
-class MedicalRecordDAO:
     def add_medical_record(self, patient_id, doctor_id, appointment_id, diagnosis, prescription):
         """Add a new medical record to the database."""
         data = {
@@ -20,17 +19,22 @@ class MedicalRecordDAO:
             "diagnosis": diagnosis,
             "prescription": prescription
         }
-        response = supabase.table("medical_records1").insert(data).execute()
-        return response.data[0] if response.data else None
+        return self._fetch_one(self.table().insert(data))
 
     def delete_medical_record(self, record_id):
         """Delete a medical record from the database."""
-        supabase.table("medical_records1").delete().eq("record_id", record_id).execute()
+        return self._execute(self.table().delete().eq("record_id", record_id))
 
-    def list_medical_records(self):
-        """Retrieve all medical records from the database."""
-        response = supabase.table("medical_records1").select("*").execute()
-        return response.data
+    def list_medical_records(self, limit=None):
+        """Retrieve all medical records (or the first `limit` by ID) from the database."""
+        query = self.table().select("*")
+        if limit is not None:
+            query = query.order(self.id_column).limit(limit)
+        return self._fetch_all(query)
+
+    def iter_medical_records(self, page_size=DEFAULT_PAGE_SIZE, columns="*", limit=None):
+        """Stream medical records page by page in ID order without loading the whole table."""
+        return self.iter_rows(columns=columns, page_size=page_size, limit=limit)
 
     def update_medical_record(self, record_id, diagnosis=None, prescription=None):
         """Update a medical record's diagnosis or prescription."""
@@ -41,5 +45,25 @@ class MedicalRecordDAO:
             updates["prescription"] = prescription
         if not updates:
             return None
-        response = supabase.table("medical_records1").update(updates).eq("record_id", record_id).execute()
-        return response.data[0] if response.data else None
\ No newline at end of file
+        return self._fetch_one(self.table().update(updates).eq("record_id", record_id))
+
+    def list_by_patient(self, patient_id):
+        """Retrieve all medical records of a patient."""
+        return self.list_where({"patient_id": patient_id})
+
+    def list_by_doctor(self, doctor_id):
+        """Retrieve all medical records written by a doctor."""
+        return self.list_where({"doctor_id": doctor_id})
+
+    def list_by_appointment(self, appointment_id):
+        """Retrieve the medical records of an appointment."""
+        return self.list_where({"appointment_id": appointment_id})
+
+
+class AsyncMedicalRecordDAO(AsyncBaseDAO, MedicalRecordDAO):
+    """MedicalRecordDAO on the async supabase client: the same methods, awaited."""
+
+    async def update_medical_record(self, record_id, diagnosis=None, prescription=None):
+        if diagnosis is None and prescription is None:
+            return None
+        return await super().update_medical_record(record_id, diagnosis, prescription)
@@ -0,0 +1,79 @@
+from datetime import date, time
+from decimal import Decimal
+
+
+def _date(value):
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+def _time(value):
+    return value if isinstance(value, time) else time.fromisoformat(value)
+
+
+def _decimal(value):
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+class Row:
+    """
+    Base for the typed row models.
+
+    Each model lists its columns in __slots__ and the decoder of every
+    non-string column in `decoders`. from_row decodes a PostgREST dict once;
+    columns missing from the dict (e.g. a narrower projection) and NULLs stay
+    None, and columns the model does not know are dropped.
+    """
+    __slots__ = ()
+    decoders = {}
+
+    @classmethod
+    def from_row(cls, row):
+        obj = cls.__new__(cls)
+        decoders = cls.decoders
+        for name in cls.__slots__:
+            value = row.get(name)
+            if value is not None and name in decoders:
+                value = decoders[name](value)
+            setattr(obj, name, value)
+        return obj
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.as_dict() == other.as_dict()
+
+    # Rows compare by value but stay mutable, so a hash of the values could
+    # change while the row sits in a set or dict; key those by the ID instead
+    __hash__ = None
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class Patient(Row):
+    __slots__ = ("patient_id", "full_name", "email", "phone", "age", "gender", "address")
+
+
+class Doctor(Row):
+    __slots__ = ("doctor_id", "full_name", "specialization", "email", "phone", "experience_years")
+
+
+class Availability(Row):
+    __slots__ = ("availability_id", "doctor_id", "available_date", "start_time", "end_time", "is_available")
+    decoders = {"available_date": _date, "start_time": _time, "end_time": _time}
+
+
+class Appointment(Row):
+    __slots__ = ("appointment_id", "patient_id", "doctor_id", "appointment_date", "appointment_time", "status")
+    decoders = {"appointment_date": _date, "appointment_time": _time}
+
+
+class Payment(Row):
+    __slots__ = ("payment_id", "appointment_id", "patient_id", "amount", "payment_status", "transaction_id")
+    decoders = {"amount": _decimal}
+
+
+class MedicalRecord(Row):
+    __slots__ = ("record_id", "patient_id", "doctor_id", "appointment_id", "diagnosis", "prescription")
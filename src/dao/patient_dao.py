@@ -1,16 +1,16 @@
-from supabase import create_client, Client
-import os
-from dotenv import load_dotenv
+from dao.async_base_dao import AsyncBaseDAO
+from dao.base_dao import BaseDAO, DEFAULT_PAGE_SIZE
+from dao.cached_dao import CachedDAO
+from dao.models import Patient
 
-# Load environment variables
-load_dotenv()
 
-# Initialize Supabase client
-supabase_url = os.getenv("SUPABASE_URL")
-supabase_key = os.getenv("SUPABASE_KEY")
-supabase: Client = create_client(supabase_url, supabase_key)
+class PatientDAO(BaseDAO):
+    table_name = "patients1"
+    id_column = "patient_id"
+    insert_columns = ("full_name", "email", "phone", "age", "gender", "address")
+    update_columns = ("phone", "address")
+    model = Patient
 
-class PatientDAO:
     def add_patient(self, full_name, email, phone, age, gender, address):
         """Add a new patient to the database."""
         data = {
@@ -21,17 +21,22 @@ class PatientDAO:
             "gender": gender,
             "address": address
         }
-        response = supabase.table("patients1").insert(data).execute()
-        return response.data[0] if response.data else None
+        return self._fetch_one(self.table().insert(data))
 
     def delete_patient(self, patient_id):
         """Delete a patient from the database."""
-        supabase.table("patients1").delete().eq("patient_id", patient_id).execute()
+        return self._execute(self.table().delete().eq("patient_id", patient_id))
 
-    def list_patients(self):
-        """Retrieve all patients from the database."""
-        response = supabase.table("patients1").select("*").execute()
-        return response.data
+    def list_patients(self, limit=None):
+        """Retrieve all patients (or the first `limit` by ID) from the database."""
+        query = self.table().select("*")
+        if limit is not None:
+            query = query.order(self.id_column).limit(limit)
+        return self._fetch_all(query)
+
+    def iter_patients(self, page_size=DEFAULT_PAGE_SIZE, columns="*", limit=None):
+        """Stream patients page by page in ID order without loading the whole table."""
+        return self.iter_rows(columns=columns, page_size=page_size, limit=limit)
 
     def update_patient(self, patient_id, phone=None, address=None):
         """Update a patient's phone or address in the database."""
@@ -40,5 +45,27 @@ class PatientDAO:
             updates["phone"] = phone
         if address is not None:
             updates["address"] = address
-        response = supabase.table("patients1").update(updates).eq("patient_id", patient_id).execute()
-        return response.data[0] if response.data else None
\ No newline at end of file
+        return self._fetch_one(self.table().update(updates).eq("patient_id", patient_id))
+
+
+class AsyncPatientDAO(AsyncBaseDAO, PatientDAO):
+    """PatientDAO on the async supabase client: the same methods, awaited."""
+
+
+class CachedPatientDAO(CachedDAO, PatientDAO):
+    """PatientDAO behind an LRU+TTL row cache that its own writes keep current."""
+
+    def add_patient(self, full_name, email, phone, age, gender, address):
+        return self._wrote(super().add_patient(full_name, email, phone, age, gender, address))
+
+    def update_patient(self, patient_id, phone=None, address=None):
+        return self._wrote(super().update_patient(patient_id, phone, address), patient_id)
+
+    def delete_patient(self, patient_id):
+        try:
+            return super().delete_patient(patient_id)
+        finally:
+            self.cache.discard(patient_id)
+
+    def list_patients(self, limit=None):
+        return self._cached_list(super().list_patients, limit)
@@ -1,16 +1,16 @@
-from supabase import create_client, Client
-import os
-from dotenv import load_dotenv
+from dao.async_base_dao import AsyncBaseDAO
+from dao.base_dao import BaseDAO, DEFAULT_PAGE_SIZE
+from dao.models import Payment
 
-# Load environment variables
-load_dotenv()
 
-# Initialize Supabase client
-supabase_url = os.getenv("SUPABASE_URL")
-supabase_key = os.getenv("SUPABASE_KEY")
-supabase: Client = create_client(supabase_url, supabase_key)
+class PaymentDAO(BaseDAO):
+    table_name = "payments1"
+    id_column = "payment_id"
+    insert_columns = ("appointment_id", "patient_id", "amount", "transaction_id")
+    insert_defaults = {"payment_status": "Pending"}
+    update_columns = ("payment_status",)
+    model = Payment
 
-class PaymentDAO:
     def add_payment(self, appointment_id, patient_id, amount, transaction_id=None):
         """Add a new payment to the database."""
         data = {
@@ -20,22 +20,43 @@ class PaymentDAO:
             "transaction_id": transaction_id,
             "payment_status": "Pending"
         }
-        response = supabase.table("payments1").insert(data).execute()
-        return response.data[0] if response.data else None
+        return self._fetch_one(self.table().insert(data))
+
+    def _insert_row(self, row):
+        data = super()._insert_row(row)
+        data["amount"] = float(data["amount"])  # Ensure amount is a float
+        return data
 
     def delete_payment(self, payment_id):
         """Delete a payment from the database."""
-        supabase.table("payments1").delete().eq("payment_id", payment_id).execute()
+        return self._execute(self.table().delete().eq("payment_id", payment_id))
+
+    def list_payments(self, limit=None):
+        """Retrieve all payments (or the first `limit` by ID) from the database."""
+        query = self.table().select("*")
+        if limit is not None:
+            query = query.order(self.id_column).limit(limit)
+        return self._fetch_all(query)
 
-    def list_payments(self):
-        """Retrieve all payments from the database."""
-        response = supabase.table("payments1").select("*").execute()
-        return response.data
+    def iter_payments(self, page_size=DEFAULT_PAGE_SIZE, columns="*", limit=None):
+        """Stream payments page by page in ID order without loading the whole table."""
+        return self.iter_rows(columns=columns, page_size=page_size, limit=limit)
 
     def update_payment(self, payment_id, payment_status=None):
         """Update a payment's status."""
         updates = {}
         if payment_status and payment_status in ["Pending", "Completed", "Failed"]:
             updates["payment_status"] = payment_status
-        response = supabase.table("payments1").update(updates).eq("payment_id", payment_id).execute()
-        return response.data[0] if response.data else None
\ No newline at end of file
+        return self._fetch_one(self.table().update(updates).eq("payment_id", payment_id))
+
+    def list_by_patient(self, patient_id):
+        """Retrieve all payments made by a patient."""
+        return self.list_where({"patient_id": patient_id})
+
+    def list_by_appointment(self, appointment_id):
+        """Retrieve all payments for an appointment."""
+        return self.list_where({"appointment_id": appointment_id})
+
+
+class AsyncPaymentDAO(AsyncBaseDAO, PaymentDAO):
+    """PaymentDAO on the async supabase client: the same methods, awaited."""
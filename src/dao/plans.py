@@ -0,0 +1,75 @@
+"""
+Request plans: the logic of a call that sends several requests, written
+once for the sync and the async DAOs and services.
+
+A plan is a generator that yields each request as it is made -- e.g.
+`rows = yield self._fetch_all(query)` -- and gets its result back. On the
+sync side the yielded value already is the result, and the driver only hands
+it back. On the async side it is an awaitable: the driver awaits it and sends
+back the result, or throws the error into the plan at the `yield`, so the
+plan's own try/except sees it either way. A yielded tuple of requests runs
+concurrently on the async side (sequentially on the sync side) and comes back
+as a tuple of results. Plans combine with `yield from`.
+"""
+import asyncio
+
+
+def drive(plan):
+    """Run a plan whose requests are made synchronously; returns the plan's result."""
+    result = None
+    while True:
+        try:
+            result = plan.send(result)
+        except StopIteration as stop:
+            return stop.value
+
+
+async def drive_async(plan):
+    """Run a plan whose requests are awaitables; returns the plan's result."""
+    result, error = None, None
+    while True:
+        try:
+            step = plan.throw(error) if error is not None else plan.send(result)
+        except StopIteration as stop:
+            return stop.value
+        try:
+            result = tuple(await asyncio.gather(*step)) if isinstance(step, tuple) else await step
+            error = None
+        except Exception as e:
+            result, error = None, e
+
+
+def stream(plan):
+    """Yield the rows of every page a synchronous paging plan fetches, one page at a time."""
+    rows = None
+    while True:
+        try:
+            rows = plan.send(rows)
+        except StopIteration:
+            return
+        yield from rows
+
+
+async def stream_async(plan):
+    """stream() for a plan whose page requests are awaitables."""
+    rows = None
+    while True:
+        try:
+            step = plan.send(rows)
+        except StopIteration:
+            return
+        rows = await step
+        for row in rows:
+            yield row
+
+
+def collect(pages):
+    """A plan that runs a paging plan to the end and returns all of its rows in one list."""
+    collected, rows = [], None
+    while True:
+        try:
+            request = pages.send(rows)
+        except StopIteration:
+            return collected
+        rows = yield request
+        collected.extend(rows)
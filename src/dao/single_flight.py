@@ -0,0 +1,183 @@
+import asyncio
+import threading
+import weakref
+from collections import OrderedDict
+
+import config
+
+# Requests that only read, so identical concurrent ones can share a response
+READ_METHODS = ("GET", "HEAD")
+
+# Counters are kept for this many distinct queries, least recently used dropped
+MAX_TRACKED_KEYS = 500
+
+_groups = weakref.WeakKeyDictionary()
+_groups_lock = threading.Lock()
+
+
+def _request_key(request):
+    """Everything that can change a read's result: method, table, query string and headers (auth, count, range)."""
+    return request.http_method, str(request.path), str(request.params), tuple(sorted(request.headers.items()))
+
+
+def _label(key):
+    _, path, params, _ = key
+    return f"{path.rsplit('/', 1)[-1]}?{params}"
+
+
+def _copied(response):
+    """A response whose rows the caller may modify without touching the leader's."""
+    data = response.data
+    if isinstance(data, list):
+        data = [dict(row) if isinstance(row, dict) else row for row in data]
+    elif isinstance(data, dict):
+        data = dict(data)
+    return response.model_copy(update={"data": data})
+
+
+class _Counters:
+    def __init__(self, max_keys=MAX_TRACKED_KEYS):
+        self.max_keys = max_keys
+        self._stats = OrderedDict()
+
+    def _count(self, key, merged):
+        label = _label(key)
+        counts = self._stats.pop(label, None) or {"requests": 0, "merged": 0}
+        counts["merged" if merged else "requests"] += 1
+        self._stats[label] = counts
+        if len(self._stats) > self.max_keys:
+            self._stats.popitem(last=False)
+
+    def stats(self):
+        """{"table?query": {"requests": sent to the backend, "merged": served by another caller's request}}."""
+        return {label: dict(counts) for label, counts in self._stats.items()}
+
+    def reset_stats(self):
+        self._stats.clear()
+
+
+class _Flight:
+    __slots__ = ("generation", "done", "response", "error")
+
+    def __init__(self, generation):
+        self.generation = generation
+        self.done = threading.Event()
+        self.response = None
+        self.error = None
+
+
+class SingleFlight(_Counters):
+    """
+    Merges concurrent identical reads on one client into a single request.
+
+    The first caller of a read sends it; callers arriving with the same
+    request while it is in flight wait for it and get a copy of its response
+    (or its error). Nothing is kept once the request lands, so this never
+    serves a result older than one round trip. Every write through the client
+    starts a new generation: a read issued after a write completed never joins
+    a flight that began before it.
+    """
+
+    def __init__(self, max_keys=MAX_TRACKED_KEYS):
+        super().__init__(max_keys)
+        self._lock = threading.Lock()
+        self._flights = {}
+        self._generation = 0
+
+    def execute(self, query):
+        """query.execute(), shared with identical reads already in flight."""
+        request = getattr(query, "request", None)
+        if request is None:
+            return query.execute()
+        if request.http_method not in READ_METHODS:
+            try:
+                return query.execute()
+            finally:
+                with self._lock:
+                    self._generation += 1
+        if not config.SUPABASE_COALESCE_READS:
+            return query.execute()
+        key = _request_key(request)
+        with self._lock:
+            flight = self._flights.get(key)
+            merged = flight is not None and flight.generation == self._generation
+            if not merged:
+                flight = self._flights[key] = _Flight(self._generation)
+            self._count(key, merged)
+        if merged:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return _copied(flight.response)
+        try:
+            flight.response = query.execute()
+            return flight.response
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            flight.done.set()
+
+    def stats(self):
+        with self._lock:
+            return super().stats()
+
+    def reset_stats(self):
+        with self._lock:
+            super().reset_stats()
+
+
+class AsyncSingleFlight(_Counters):
+    """SingleFlight for one event loop: a caller that is cancelled leaves the shared request to the others."""
+
+    def __init__(self, max_keys=MAX_TRACKED_KEYS):
+        super().__init__(max_keys)
+        self._flights = {}
+        self._generation = 0
+
+    async def execute(self, query, send):
+        """await send(query), shared with identical reads already in flight."""
+        request = getattr(query, "request", None)
+        if request is None:
+            return await send(query)
+        if request.http_method not in READ_METHODS:
+            try:
+                return await send(query)
+            finally:
+                self._generation += 1
+        if not config.SUPABASE_COALESCE_READS:
+            return await send(query)
+        key = _request_key(request)
+        flight = self._flights.get(key)
+        merged = flight is not None and flight[0] == self._generation
+        if not merged:
+            flight = self._flights[key] = (self._generation, asyncio.ensure_future(send(query)))
+            flight[1].add_done_callback(lambda _, key=key, flight=flight: self._landed(key, flight))
+        self._count(key, merged)
+        response = await asyncio.shield(flight[1])
+        return _copied(response) if merged else response
+
+    def _landed(self, key, flight):
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+
+def _group(client, group_type):
+    with _groups_lock:
+        group = _groups.get(client)
+        if group is None:
+            group = _groups[client] = group_type()
+        return group
+
+
+def single_flight(client):
+    """The SingleFlight shared by every DAO (and the dashboard) on a sync client."""
+    return _group(client, SingleFlight)
+
+
+def async_single_flight(client):
+    """The AsyncSingleFlight shared by every async DAO on an async client."""
+    return _group(client, AsyncSingleFlight)
@@ -1,108 +1,493 @@
 from dao.appointment_dao import AppointmentDAO
+from dao.base_dao import DEFAULT_PAGE_SIZE, DEFAULT_CHUNK_SIZE
 from dao.availability_dao import AvailabilityDAO
-from datetime import datetime
+from dao.doctor_dao import DoctorDAO, AsyncDoctorDAO
+from dao.patient_dao import PatientDAO, AsyncPatientDAO
+from dao.plans import drive, drive_async
+from datetime import date, datetime, time, timedelta
+from heapq import merge
+from itertools import islice
+import logging
+from service.availability_templates import AvailabilityTemplates
+from service.bulk import bulk
+from service.joins import hash_join
+from service.slot_bitmap import SlotBitmap, SLOT_MINUTES
+from service.slot_index import SlotIndex
+from service.specialization_index import SpecializationIndex
+from service.waitlist import Waitlist, WaitlistError
+
+
+BOOKING_RETRIES = 3
+
+logger = logging.getLogger(__name__)
 
 
 class AppointmentError(Exception):
     pass
 
 
+def join_names(appointments, patients, doctors):
+    """Hash-join fetched {id: row} maps of patients and doctors onto appointment rows."""
+    appointments = hash_join(appointments, "patient_id", patients, {"patient_name": "full_name"})
+    return hash_join(appointments, "doctor_id", doctors,
+                     {"doctor_name": "full_name", "specialization": "specialization"})
+
+
 def parse_time_str(time_str: str):
     """Parse time in HH:MM or HH:MM:SS format into a datetime.time object."""
+    if isinstance(time_str, time):
+        return time_str
     try:
-        return datetime.strptime(time_str, "%H:%M").time()
+        return time.fromisoformat(time_str)
     except ValueError:
-        return datetime.strptime(time_str, "%H:%M:%S").time()
+        # strptime also takes unpadded input such as "9:30"
+        try:
+            return datetime.strptime(time_str, "%H:%M").time()
+        except ValueError:
+            return datetime.strptime(time_str, "%H:%M:%S").time()
 
 
 class AppointmentService:
-    def __init__(self, appointment_dao: AppointmentDAO, availability_dao: AvailabilityDAO):
+    # Calls that make several requests are plans (dao/plans.py) run by _run;
+    # AsyncAppointmentService runs the same plans with the async driver
+    _run = staticmethod(drive)
+
+    def __init__(self, appointment_dao: AppointmentDAO, availability_dao: AvailabilityDAO,
+                 slot_index: SlotIndex = None, slot_bitmap: SlotBitmap = None,
+                 specialization_index: SpecializationIndex = None, waitlist: Waitlist = None,
+                 templates: AvailabilityTemplates = None, patient_dao: PatientDAO = None,
+                 doctor_dao: DoctorDAO = None):
         self.appointment_dao = appointment_dao
         self.availability_dao = availability_dao
+        # Used only to resolve names; by default they share the appointment DAO's client
+        self.patient_dao = patient_dao or PatientDAO(appointment_dao._client)
+        self.doctor_dao = doctor_dao or DoctorDAO(appointment_dao._client)
+        self.slot_index = slot_index
+        self.slot_bitmap = slot_bitmap
+        self.specialization_index = specialization_index
+        self.waitlist = waitlist
+        self.templates = templates
+        # In-memory views of availability that must follow every write
+        self._slot_views = [view for view in (slot_index, slot_bitmap) if view is not None]
 
-    def add_appointment(self, patient_id, doctor_id, appointment_date, appointment_time):
-        """Add a new appointment with validation and availability check."""
+    def _notify(self, method, *args):
+        for view in self._slot_views:
+            getattr(view, method)(*args)
+
+    @staticmethod
+    def _validate_new(patient_id, doctor_id, appointment_date, appointment_time):
+        """Check a new appointment's fields; returns its date and time parsed."""
         if not patient_id or not doctor_id or not appointment_date or not appointment_time:
             raise AppointmentError("All fields (patient_id, doctor_id, appointment_date, appointment_time) are required.")
-        
-        print(f"Service received appointment_time: {appointment_time}")
         try:
-            # Validate date
-            appt_date = datetime.strptime(appointment_date, "%Y-%m-%d").date()
-            # Normalize time
-            appt_time = parse_time_str(appointment_time)
-            print(f"Service normalized appointment_time: {appt_time.strftime('%H:%M')}")
+            return datetime.strptime(appointment_date, "%Y-%m-%d").date(), parse_time_str(appointment_time)
         except ValueError as e:
             raise AppointmentError(f"Invalid date or time format. Use YYYY-MM-DD for date and HH:MM for time. Error: {e}")
-        
-        appointment_dt = datetime.combine(appt_date, appt_time)
-
-        # Check availability in AvailabilityOfDoctors1
-        availability = self.availability_dao.list_availability(doctor_id)
-        is_available_slot = False
-        for slot in availability:
-            print(f"Slot available_date: {slot['available_date']}, start_time: {slot['start_time']}, end_time: {slot['end_time']}, is_available: {slot['is_available']}")
-            slot_date = datetime.strptime(slot['available_date'], "%Y-%m-%d").date()
-            slot_start = parse_time_str(slot['start_time'])
-            slot_end = parse_time_str(slot['end_time'])
-            slot_start_dt = datetime.combine(slot_date, slot_start)
-            slot_end_dt = datetime.combine(slot_date, slot_end)
-
-            if (
-                slot['doctor_id'] == doctor_id and
-                slot['is_available'] and
-                appointment_dt >= slot_start_dt and
-                appointment_dt < slot_end_dt
-            ):
-                is_available_slot = True
-                break
-
-        if not is_available_slot:
-            raise AppointmentError(f"No available slot for doctor_id {doctor_id} at {appointment_date} {appointment_time}.")
-        
-        # Pass time in HH:MM format
-        return self.appointment_dao.add_appointment(patient_id, doctor_id, appointment_date, appt_time.strftime("%H:%M"))
+
+    @staticmethod
+    def _validate_update(appointment_id, status):
+        if not appointment_id:
+            raise AppointmentError("Appointment ID is required.")
+        if status and status not in ["Scheduled", "Completed", "Cancelled"]:
+            raise AppointmentError("Status must be 'Scheduled', 'Completed', or 'Cancelled'.")
+
+    @staticmethod
+    def _no_slot(doctor_id, appointment_date, appointment_time):
+        return AppointmentError(f"No available slot for doctor_id {doctor_id} at {appointment_date} {appointment_time}.")
+
+    @staticmethod
+    def _covering(day, appt_time):
+        """The slot model among a doctor's slots of one day that contains the time, open or not."""
+        return next((slot for slot in day if slot.start_time <= appt_time < slot.end_time), None)
+
+    @staticmethod
+    def _open_windows(day):
+        """(start, end, availability_id) of the open slots among a doctor's slots of one day."""
+        return [(slot.start_time, slot.end_time, slot.availability_id) for slot in day if slot.is_available]
+
+    @staticmethod
+    def _take_window(windows, appt_time):
+        """Remove and return the availability_id of the first window containing the time, or None."""
+        for window in windows:
+            if window[0] <= appt_time < window[1]:
+                windows.remove(window)
+                return window[2]
+        return None
+
+    @staticmethod
+    def _bulk_validator(claimed):
+        """Validation for add_many: a row is valid if its fields are and a slot was claimed for it."""
+        def validate(row):
+            doctor_id, appointment_date, appointment_time = (
+                row.get("doctor_id"), row.get("appointment_date"), row.get("appointment_time")
+            )
+            AppointmentService._validate_new(row.get("patient_id"), doctor_id, appointment_date, appointment_time)
+            if id(row) not in claimed:
+                raise AppointmentService._no_slot(doctor_id, appointment_date, appointment_time)
+
+        return validate
+
+    @staticmethod
+    def _parse_rows(appointments):
+        """{id(row): (doctor_id, date, time)} of the rows with valid fields; the others fail validation later."""
+        parsed = {}
+        for row in appointments:
+            try:
+                appt_date, appt_time = AppointmentService._validate_new(
+                    row.get("patient_id"), row.get("doctor_id"), row.get("appointment_date"), row.get("appointment_time")
+                )
+            except AppointmentError:
+                continue
+            parsed[id(row)] = (row["doctor_id"], appt_date, appt_time)
+        return parsed
+
+    def add_appointment(self, patient_id, doctor_id, appointment_date, appointment_time):
+        """Add a new appointment with validation and availability check."""
+        return self._run(self._add_appointment(patient_id, doctor_id, appointment_date, appointment_time))
+
+    def _add_appointment(self, patient_id, doctor_id, appointment_date, appointment_time):
+        logger.debug("Service received appointment_time: %s", appointment_time)
+        appt_date, appt_time = self._validate_new(patient_id, doctor_id, appointment_date, appointment_time)
+        logger.debug("Service normalized appointment_time: %02d:%02d", appt_time.hour, appt_time.minute)
+
+        availability_id = yield from self._reserve_slot(doctor_id, appt_date, appt_time)
+        try:
+            # Pass time in HH:MM format
+            appointment = yield self.appointment_dao.add_appointment(patient_id, doctor_id, appointment_date, appt_time.strftime("%H:%M"))
+        except Exception:
+            # Give the slot back if the appointment could not be written
+            yield from self._release_slot(availability_id)
+            raise
+        if self.slot_bitmap:
+            self.slot_bitmap.book(doctor_id, appt_date, appt_time)
+        return appointment
+
+    def _reserve_slot(self, doctor_id, appt_date, appt_time):
+        """
+        Find an open slot covering the time and claim it with a conditional
+        update, returning its availability_id. If another booking claims it
+        first, look again (up to BOOKING_RETRIES times) in case a different
+        slot still covers the time.
+
+        With a slot index the candidate comes from memory; the server is only
+        asked when the index has no open slot, e.g. because another process
+        added it. If the day only exists as availability templates, its
+        windows are materialized first.
+        """
+        materialized = self.templates is None
+        for _ in range(BOOKING_RETRIES):
+            availability_id = self.slot_index.find(doctor_id, appt_date, appt_time) if self.slot_index else None
+            if availability_id is None:
+                # Check availability in AvailabilityOfDoctors1: a single-row, server-side lookup
+                slot = yield self.availability_dao.find_open_slot(doctor_id, appt_date.isoformat(), appt_time.strftime("%H:%M:%S"))
+                if not slot and not materialized:
+                    materialized = True
+                    for row in self.templates.materialize(doctor_id, appt_date):
+                        self._notify("add", row)
+                    slot = yield self.availability_dao.find_open_slot(doctor_id, appt_date.isoformat(), appt_time.strftime("%H:%M:%S"))
+                if not slot:
+                    raise self._no_slot(doctor_id, appt_date, appt_time.strftime('%H:%M'))
+                availability_id = slot['availability_id']
+                self._notify("add", slot)
+            claimed = yield self.availability_dao.claim_slot(availability_id)
+            # Either we took it or someone else already had
+            self._notify("set_available", availability_id, False)
+            if claimed:
+                return availability_id
+        raise AppointmentError(f"The slot for doctor_id {doctor_id} at {appt_date} {appt_time.strftime('%H:%M')} was just taken. Please try again.")
+
+    def find_earliest(self, specialization, after, duration=SLOT_MINUTES, n=1):
+        """
+        Return the n earliest free times at or after `after`, across all doctors
+        of a specialization, that fit `duration` minutes.
+
+        Each doctor's free times come from the slot bitmap as a time-ordered
+        stream; the streams are k-way merged on a heap and consumed only until
+        n candidates are found. Returns [{"doctor_id", "start"}, ...].
+        """
+        if not specialization:
+            raise AppointmentError("Specialization is required.")
+        if not isinstance(duration, int) or duration <= 0:
+            raise AppointmentError("Duration must be a positive number of minutes.")
+        if self.slot_bitmap is None or self.specialization_index is None:
+            raise AppointmentError("Earliest-slot search needs a slot bitmap and a specialization index.")
+
+        doctor_ids = self.specialization_index.doctor_ids(specialization)
+        self.slot_bitmap.preload(doctor_ids)
+        units = -(-duration // self.slot_bitmap.unit_minutes)
+
+        def stream(doctor_id):
+            for start in self.slot_bitmap.iter_free(doctor_id, after, units):
+                yield start, doctor_id
+
+        return [
+            {"doctor_id": doctor_id, "start": start}
+            for start, doctor_id in islice(merge(*(stream(d) for d in doctor_ids)), n)
+        ]
 
     def delete_appointment(self, appointment_id):
-        """Delete an appointment and update availability to True."""
+        """
+        Delete an appointment, free its slot and offer the slot to the
+        waitlist. Returns the backfilled appointment, if any.
+        """
+        return self._run(self._delete_appointment(appointment_id))
+
+    def _delete_appointment(self, appointment_id):
         if not appointment_id:
             raise AppointmentError("Appointment ID is required.")
         
-        response = self.appointment_dao.list_appointments()
-        appointment = next((a for a in response if a['appointment_id'] == appointment_id), None)
+        appointment = yield self.appointment_dao.get_by_id(appointment_id)
         if not appointment:
             raise AppointmentError(f"Appointment ID {appointment_id} not found.")
         
-        appointment_dt = datetime.strptime(
-            f"{appointment['appointment_date']} {appointment['appointment_time']}", "%Y-%m-%d %H:%M"
+        def delete():
+            yield self.appointment_dao.delete_appointment(appointment_id)
+
+        if appointment.get('status') == "Cancelled":
+            yield from delete()
+            return None
+        _, backfilled = yield from self._vacate(appointment, delete)
+        return backfilled
+
+    def _vacate(self, appointment, remove):
+        """
+        Free the slot of an appointment, then run the plan `remove()` (its
+        delete or cancellation), then offer the slot to the waitlist. The slot is
+        released first, as before, so a failed release leaves the appointment
+        in place; if `remove` fails, the slot is taken again. Returns the
+        result of `remove` and the backfilled appointment, if any.
+        """
+        doctor_id = appointment['doctor_id']
+        appt_date = date.fromisoformat(appointment['appointment_date'])
+        appt_time = parse_time_str(appointment['appointment_time'])
+
+        availability_id = yield from self._covering_slot(doctor_id, appt_date, appt_time)
+        if availability_id is not None:
+            yield from self._release_slot(availability_id)
+        if self.slot_bitmap:
+            self.slot_bitmap.cancel(doctor_id, appt_date, appt_time)
+        try:
+            result = yield from remove()
+        except Exception:
+            if availability_id is not None:
+                yield self.availability_dao.claim_slot(availability_id)
+                self._notify("set_available", availability_id, False)
+            if self.slot_bitmap:
+                self.slot_bitmap.book(doctor_id, appt_date, appt_time)
+            raise
+        return result, (yield from self._backfill(doctor_id, appt_date, appt_time))
+
+    def _backfill(self, doctor_id, appt_date, appt_time):
+        if self.waitlist is None:
+            return None
+        specialization = self.specialization_index.specialization_of(doctor_id) if self.specialization_index else None
+        entry = self.waitlist.pop_match(doctor_id, specialization, datetime.combine(appt_date, appt_time))
+        if entry is None:
+            return None
+        try:
+            appointment = yield from self._add_appointment(
+                entry['patient_id'], doctor_id, appt_date.isoformat(), appt_time.strftime("%H:%M")
+            )
+        except AppointmentError:
+            # Someone else got the slot first; the patient keeps their place
+            self.waitlist.restore(entry['entry_id'])
+            return None
+        except Exception:
+            # The booking itself failed (network, insert rejected): keep the place and report it
+            self.waitlist.restore(entry['entry_id'])
+            raise
+        self.waitlist.done(entry['entry_id'])
+        return appointment
+
+    def join_waitlist(self, patient_id, window_start, window_end, doctor_id=None, specialization=None):
+        """Wait for a slot with a doctor (or any doctor of a specialization) within a time window."""
+        if self.waitlist is None:
+            raise AppointmentError("No waitlist is configured.")
+        try:
+            return self.waitlist.add(patient_id, window_start, window_end, doctor_id, specialization)
+        except WaitlistError as e:
+            raise AppointmentError(str(e))
+
+    def leave_waitlist(self, entry_id):
+        """Withdraw a waitlist entry."""
+        if self.waitlist is None or not self.waitlist.remove(entry_id):
+            raise AppointmentError(f"Waitlist entry {entry_id} not found.")
+
+    def _covering_slot(self, doctor_id, appt_date, appt_time):
+        """
+        Return the availability_id of the doctor's slot containing the time,
+        open or not. The slot index is only a cache: when it has no such slot
+        (e.g. another process added it), the server is asked.
+        """
+        if self.slot_index:
+            availability_id = self.slot_index.find(doctor_id, appt_date, appt_time, available_only=False)
+            if availability_id is not None:
+                return availability_id
+        # Only the slots of that doctor on that day can contain the appointment
+        day = yield self._day(doctor_id, appt_date)
+        slot = self._covering(day, appt_time)
+        if slot is None:
+            return None
+        self._notify("add", slot.as_dict())
+        return slot.availability_id
+
+    def _release_slot(self, availability_id):
+        yield self.availability_dao.release_slot(availability_id)
+        self._notify("set_available", availability_id, True)
+
+    def list_appointments(self, limit=None):
+        """List all appointments, or at most `limit` of them."""
+        return self.appointment_dao.list_appointments(limit)
+
+    def with_names(self, appointments):
+        """
+        Add patient_name, doctor_name and specialization to appointment rows.
+        Costs one batched fetch per table however many rows there are.
+        """
+        return self._run(self._with_names(appointments))
+
+    def _with_names(self, appointments):
+        appointments = list(appointments)
+        # Requested together: the async service awaits both at once
+        patients, doctors = yield (
+            self.patient_dao.get_many((a["patient_id"] for a in appointments), "full_name"),
+            self.doctor_dao.get_many((a["doctor_id"] for a in appointments), "full_name,specialization"),
         )
+        return join_names(appointments, patients, doctors)
 
-        availability = self.availability_dao.list_availability(appointment['doctor_id'])
-        for slot in availability:
-            slot_date = datetime.strptime(slot['available_date'], "%Y-%m-%d").date()
-            slot_start = parse_time_str(slot['start_time'])
-            slot_end = parse_time_str(slot['end_time'])
-            slot_start_dt = datetime.combine(slot_date, slot_start)
-            slot_end_dt = datetime.combine(slot_date, slot_end)
-
-            if (
-                slot['doctor_id'] == appointment['doctor_id'] and
-                appointment_dt >= slot_start_dt and
-                appointment_dt < slot_end_dt
-            ):
-                self.availability_dao.update_availability(slot['availability_id'], is_available=True)
-                break
-        
-        self.appointment_dao.delete_appointment(appointment_id)
+    def list_appointments_detailed(self, limit=None):
+        """Like list_appointments, with patient and doctor names."""
+        return self._run(self._list_detailed(limit))
 
-    def list_appointments(self):
-        """List all appointments."""
-        return self.appointment_dao.list_appointments()
+    def _list_detailed(self, limit):
+        appointments = yield self.appointment_dao.list_appointments(limit)
+        return (yield from self._with_names(appointments))
 
-    def update_appointment(self, appointment_id, status=None):
-        """Update an appointment's status with validation."""
+    def iter_appointments(self, page_size=DEFAULT_PAGE_SIZE, columns="*", limit=None):
+        """Stream appointments in ID order with bounded memory."""
+        return self.appointment_dao.iter_appointments(page_size, columns, limit)
+
+    def get_appointment(self, appointment_id):
+        """Fetch a single appointment by ID."""
         if not appointment_id:
             raise AppointmentError("Appointment ID is required.")
-        if status and status not in ["Scheduled", "Completed", "Cancelled"]:
-            raise AppointmentError("Status must be 'Scheduled', 'Completed', or 'Cancelled'.")
-        return self.appointment_dao.update_appointment(appointment_id, status)
\ No newline at end of file
+        return self.appointment_dao.get_by_id(appointment_id)
+
+    def list_patient_appointments(self, patient_id, date_from=None, date_to=None):
+        """List a patient's appointments, optionally within [date_from, date_to)."""
+        if not patient_id:
+            raise AppointmentError("Patient ID is required.")
+        return self.appointment_dao.list_by_patient(patient_id, date_from, date_to)
+
+    def list_doctor_appointments(self, doctor_id, date_from=None, date_to=None):
+        """List a doctor's appointments, optionally within [date_from, date_to)."""
+        if not doctor_id:
+            raise AppointmentError("Doctor ID is required.")
+        return self.appointment_dao.list_by_doctor(doctor_id, date_from, date_to)
+
+    def update_appointment(self, appointment_id, status=None):
+        """Update an appointment's status with validation; cancelling frees the slot like a delete."""
+        return self._run(self._update_appointment(appointment_id, status))
+
+    def _update_appointment(self, appointment_id, status):
+        self._validate_update(appointment_id, status)
+        if status != "Cancelled":
+            return (yield self.appointment_dao.update_appointment(appointment_id, status))
+
+        previous = yield self.appointment_dao.get_by_id(appointment_id)
+        if not previous:
+            raise AppointmentError(f"Appointment ID {appointment_id} not found.")
+        if previous.get('status') == "Cancelled":
+            return (yield self.appointment_dao.update_appointment(appointment_id, status))
+
+        def cancel():
+            updated = yield self.appointment_dao.update_appointment(appointment_id, status)
+            if not updated:
+                raise AppointmentError(f"Appointment ID {appointment_id} not found.")
+            return updated
+
+        updated, _ = yield from self._vacate(previous, cancel)
+        return updated
+
+    def add_many(self, appointments, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Validate and insert many appointment dicts in chunks.
+
+        Each row must fall inside an open slot; the slots are fetched once per
+        doctor and day rather than once per row (days that only exist as
+        templates are materialized first), and each matching slot is
+        claimed like in add_appointment. Invalid or rejected rows are reported,
+        not raised, and the slots of rejected rows are released again.
+        """
+        return self._run(self._add_many(appointments, chunk_size))
+
+    def _add_many(self, appointments, chunk_size):
+        appointments = list(appointments)
+        parsed = self._parse_rows(appointments)
+        days = list(dict.fromkeys((doctor_id, appt_date) for doctor_id, appt_date, _ in parsed.values()))
+        fetched = yield tuple(self._day(doctor_id, appt_date) for doctor_id, appt_date in days)
+        open_slots = {}
+        for (doctor_id, appt_date), slots in zip(days, fetched):
+            if not slots and self.templates is not None:
+                slots = yield from self._materialize_day(doctor_id, appt_date)
+            open_slots[(doctor_id, appt_date)] = self._open_windows(slots)
+
+        claimed = {}
+        for row in appointments:
+            if id(row) not in parsed:
+                continue
+            doctor_id, appt_date, appt_time = parsed[id(row)]
+            windows = open_slots[(doctor_id, appt_date)]
+            while (availability_id := self._take_window(windows, appt_time)) is not None:
+                claimed_slot = yield self.availability_dao.claim_slot(availability_id)
+                self._notify("set_available", availability_id, False)
+                if claimed_slot:
+                    claimed[id(row)] = availability_id
+                    break
+
+        result = yield from bulk(appointments, self._bulk_validator(claimed), AppointmentError,
+                                 self.appointment_dao.add_many, chunk_size)
+        for failure in result["failed"]:
+            availability_id = claimed.get(id(failure["row"]))
+            if availability_id is not None:
+                yield from self._release_slot(availability_id)
+        if self.slot_bitmap:
+            for appointment in result["succeeded"]:
+                self.slot_bitmap.book(appointment['doctor_id'], appointment['appointment_date'], appointment['appointment_time'])
+        return result
+
+    def _day(self, doctor_id, appt_date):
+        """The request for a doctor's slot models of one day."""
+        return self.availability_dao.list_models({"doctor_id": doctor_id}, appt_date, appt_date + timedelta(days=1))
+
+    def _materialize_day(self, doctor_id, appt_date):
+        """Turn the templates of a day without concrete slots into rows; returns the day's slot models."""
+        for row in self.templates.materialize(doctor_id, appt_date):
+            self._notify("add", row)
+        # Read back rather than use the inserted rows: another caller may have materialized the day first
+        return (yield self._day(doctor_id, appt_date))
+
+    def update_many(self, updates, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Apply many {appointment_id, status} updates in chunks, reporting per-row failures."""
+        return self._run(bulk(
+            updates,
+            lambda u: self._validate_update(u.get("appointment_id"), u.get("status")),
+            AppointmentError, self.appointment_dao.update_many, chunk_size
+        ))
+
+
+class AsyncAppointmentService(AppointmentService):
+    """
+    AppointmentService for asyncio callers, over the async DAOs. The methods
+    are AppointmentService's, with their plans run by the async driver, so
+    each returns an awaitable (iter_appointments an async iterator). Slots
+    are found on the server: the in-memory slot views, templates and the
+    waitlist load through sync DAOs and are not used here.
+    """
+    _run = staticmethod(drive_async)
+
+    def __init__(self, appointment_dao, availability_dao, patient_dao=None, doctor_dao=None):
+        # Used only to resolve names; by default they share the appointment DAO's client
+        super().__init__(appointment_dao, availability_dao,
+                         patient_dao=patient_dao or AsyncPatientDAO(appointment_dao._client),
+                         doctor_dao=doctor_dao or AsyncDoctorDAO(appointment_dao._client))
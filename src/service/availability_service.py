@@ -1,41 +1,421 @@
 from dao.availability_dao import AvailabilityDAO
+from dao.base_dao import DEFAULT_PAGE_SIZE, DEFAULT_CHUNK_SIZE
+from dao.plans import drive, drive_async
+from service.appointment_service import parse_time_str
+from service.bulk import bulk
+import asyncio
+from itertools import count
+import threading
+
+# What a bulk overlap check needs to know about the windows already stored
+WINDOW_COLUMNS = "availability_id,doctor_id,available_date,start_time,end_time"
 
 class AvailabilityError(Exception):
     pass
 
 class AvailabilityService:
-    def __init__(self, availability_dao):
-        self.availability_dao = availability_dao
+    # Calls that make several requests are plans (dao/plans.py) run by _run;
+    # AsyncAvailabilityService runs the same plans with the async driver
+    _run = staticmethod(drive)
 
-    def add_availability(self, doctor_id, available_date, start_time, end_time):
-        """Add a new availability slot with validation."""
+    @staticmethod
+    def _parse_times(start_time, end_time):
+        try:
+            return (parse_time_str(start_time) if start_time else None,
+                    parse_time_str(end_time) if end_time else None)
+        except ValueError:
+            raise AvailabilityError("Invalid time format. Use HH:MM.")
+
+    @staticmethod
+    def _validate_new(doctor_id, available_date, start_time, end_time):
         if not doctor_id or not available_date or not start_time or not end_time:
             raise AvailabilityError("All fields (doctor_id, available_date, start_time, end_time) are required.")
-        if start_time >= end_time:
+        start, end = AvailabilityService._parse_times(start_time, end_time)
+        if start >= end:
             raise AvailabilityError("Start time must be before end time.")
-        return self.availability_dao.add_availability(doctor_id, available_date, start_time, end_time)
+
+    @staticmethod
+    def _validate_update(availability_id, start_time, end_time, available_date):
+        if not availability_id:
+            raise AvailabilityError("Availability ID is required.")
+        start, end = AvailabilityService._parse_times(start_time, end_time)
+        if start and end and start >= end:
+            raise AvailabilityError("Start time must be before end_time.")
+        if available_date:
+            from datetime import datetime
+            try:
+                datetime.strptime(available_date, "%Y-%m-%d")
+            except ValueError:
+                raise AvailabilityError("Invalid date format. Use YYYY-MM-DD.")
+
+    def __init__(self, availability_dao, slot_index=None, slot_bitmap=None, templates=None):
+        self.availability_dao = availability_dao
+        self.slot_index = slot_index
+        self.slot_bitmap = slot_bitmap
+        self.templates = templates
+        # In-memory views of availability that must follow every write
+        self._slot_views = [view for view in (slot_index, slot_bitmap) if view is not None]
+        # Serializes overlap check and write so two local writers cannot both pass the check
+        self._write_lock = threading.Lock()
+
+    def _notify(self, method, *args):
+        for view in self._slot_views:
+            getattr(view, method)(*args)
+
+    def _run_locked(self, plan):
+        """Run a plan that checks overlaps and then writes, holding the write lock throughout."""
+        with self._write_lock:
+            return self._run(plan)
+
+    def _overlapping(self, doctor_id, available_date, start_time, end_time, exclude_id=None):
+        """IDs of the doctor's windows that day overlapping [start_time, end_time), from the slot index if there is one."""
+        start, end = self._parse_times(start_time, end_time)
+        if self.slot_index is not None:
+            return self.slot_index.overlapping(doctor_id, available_date, start, end, exclude_id)
+        slots = yield self.availability_dao.find_overlapping(doctor_id, available_date, start, end, exclude_id)
+        return [slot['availability_id'] for slot in slots]
+
+    @staticmethod
+    def _overlap_error(clashes, doctor_id, available_date):
+        return AvailabilityError(
+            f"Window overlaps availability slot(s) {', '.join(map(str, clashes))} "
+            f"of doctor {doctor_id} on {available_date}."
+        )
+
+    def _check_overlap(self, doctor_id, available_date, start_time, end_time, exclude_id=None):
+        clashes = yield from self._overlapping(doctor_id, available_date, start_time, end_time, exclude_id)
+        if clashes:
+            raise self._overlap_error(clashes, doctor_id, available_date)
+
+    def add_availability(self, doctor_id, available_date, start_time, end_time):
+        """Add a new availability slot with validation; windows overlapping an existing one are rejected."""
+        self._validate_new(doctor_id, available_date, start_time, end_time)
+        # Store times as HH:MM, like appointment times
+        start_time, end_time = (t.strftime("%H:%M") for t in self._parse_times(start_time, end_time))
+        return self._run_locked(self._add_availability(doctor_id, available_date, start_time, end_time))
+
+    def _add_availability(self, doctor_id, available_date, start_time, end_time):
+        yield from self._check_overlap(doctor_id, available_date, start_time, end_time)
+        slot = yield self.availability_dao.add_availability(doctor_id, available_date, start_time, end_time)
+        if slot:
+            self._notify("add", slot)
+        return slot
 
     def delete_availability(self, availability_id):
         """Delete an availability slot with validation."""
+        return self._run(self._delete_availability(availability_id))
+
+    def _delete_availability(self, availability_id):
         if not availability_id:
             raise AvailabilityError("Availability ID is required.")
-        self.availability_dao.delete_availability(availability_id)
+        yield self.availability_dao.delete_availability(availability_id)
+        self._notify("remove", availability_id)
 
-    def list_availability(self, doctor_id=None):
-        """List all availability slots or those for a specific doctor."""
-        return self.availability_dao.list_availability(doctor_id)
-    
-    def update_availability(self, availability_id, is_available=None, start_time=None, end_time=None, available_date=None):
+    def next_free_slots(self, doctor_id, after, n=1):
+        """
+        Return the start datetimes of the next n free bookable units of a
+        doctor at or after `after`, answered from the in-memory slot bitmap.
+        """
+        if not doctor_id:
+            raise AvailabilityError("Doctor ID is required.")
+        if not isinstance(n, int) or n <= 0:
+            raise AvailabilityError("n must be a positive integer.")
+        if self.slot_bitmap is None:
+            raise AvailabilityError("Free slot search needs a slot bitmap.")
+        return self.slot_bitmap.next_free(doctor_id, after, n)
+
+    def list_availability(self, doctor_id=None, limit=None, date_from=None, date_to=None):
+        """
+        List all availability slots or those for a specific doctor, optionally
+        within [date_from, date_to). With templates configured, the concrete
+        rows are merged with the template windows expanded for the range.
+        """
+        return self._run(self._list_availability(doctor_id, limit, date_from, date_to))
+
+    def _list_availability(self, doctor_id, limit, date_from, date_to):
+        if self.templates is None and date_from is None and date_to is None:
+            return (yield self.availability_dao.list_availability(doctor_id, limit))
+        filters = {"doctor_id": doctor_id} if doctor_id else None
+        slots = yield self.availability_dao.list_where(filters, date_from, date_to)
+        if self.templates is not None:
+            slots += self.templates.expand(doctor_id, date_from, date_to)
+            slots.sort(key=lambda s: (s['available_date'], s['start_time'], s['doctor_id']))
+        return slots[:limit] if limit is not None else slots
+
+    def add_template(self, doctor_id, weekday, start_time, end_time, effective_from, effective_to=None):
+        """Add a weekly availability pattern (weekday 0 = Monday) with validation."""
+        if self.templates is None:
+            raise AvailabilityError("Availability templates are not configured.")
+        self._validate_new(doctor_id, effective_from, start_time, end_time)
+        if weekday not in range(7):
+            raise AvailabilityError("Weekday must be between 0 (Monday) and 6 (Sunday).")
+        if effective_to and effective_to <= effective_from:
+            raise AvailabilityError("Effective end date must be after the start date.")
+        template = self.templates.template_dao.add_template(
+            doctor_id, weekday, start_time, end_time, effective_from, effective_to
+        )
+        self._notify("forget", doctor_id)
+        return template
+
+    def delete_template(self, template_id):
+        """Delete a weekly availability pattern."""
+        if self.templates is None:
+            raise AvailabilityError("Availability templates are not configured.")
+        template = self.templates.template_dao.get_by_id(template_id)
+        if not template:
+            raise AvailabilityError(f"Template ID {template_id} not found.")
+        self.templates.template_dao.delete_template(template_id)
+        self._notify("forget", template['doctor_id'])
+
+    def skip_template_date(self, template_id, skipped_date):
+        """Add an exception date on which a weekly pattern does not apply."""
+        if self.templates is None:
+            raise AvailabilityError("Availability templates are not configured.")
+        template = self.templates.template_dao.get_by_id(template_id)
+        if not template:
+            raise AvailabilityError(f"Template ID {template_id} not found.")
+        exceptions = sorted(set(template.get('exceptions') or ()) | {str(skipped_date)})
+        updated = self.templates.template_dao.update_template(template_id, exceptions=exceptions)
+        self._notify("forget", template['doctor_id'])
+        return updated
+
+    def iter_availability(self, doctor_id=None, page_size=DEFAULT_PAGE_SIZE, columns="*", limit=None):
+        """Stream availability slots in ID order with bounded memory."""
+        return self.availability_dao.iter_availability(doctor_id, page_size, columns, limit)
+
+    def get_availability(self, availability_id):
+        """Fetch a single availability slot by ID."""
         if not availability_id:
             raise AvailabilityError("Availability ID is required.")
-        if start_time and end_time and start_time >= end_time:
+        return self.availability_dao.get_by_id(availability_id)
+
+    def list_doctor_availability(self, doctor_id, date_from=None, date_to=None):
+        """List a doctor's availability slots, optionally within [date_from, date_to)."""
+        if not doctor_id:
+            raise AvailabilityError("Doctor ID is required.")
+        return self.availability_dao.list_by_doctor(doctor_id, date_from, date_to)
+    
+    @staticmethod
+    def _window_of(row, availability_id):
+        """(doctor_id, date, start, end) of a fetched slot row; None means the slot does not exist."""
+        if not row:
+            raise AvailabilityError(f"Availability ID {availability_id} not found.")
+        return row['doctor_id'], row['available_date'], row['start_time'], row['end_time']
+
+    def _current_window(self, availability_id):
+        """(doctor_id, date, start, end) of a slot, from the slot index if it has it."""
+        window = self.slot_index.window(availability_id) if self.slot_index is not None else None
+        if window is None:
+            row = yield self.availability_dao.get_by_id(availability_id, WINDOW_COLUMNS)
+            window = self._window_of(row, availability_id)
+        return window
+
+    @staticmethod
+    def _moved_window(current, start_time, end_time, available_date):
+        """The window that a slot now at `current` (doctor_id, date, start, end) would have after an update."""
+        doctor_id, day, start, end = current
+        day, start, end = available_date or day, start_time or start, end_time or end
+        start, end = AvailabilityService._parse_times(start, end)
+        if start >= end:
             raise AvailabilityError("Start time must be before end_time.")
-        if available_date:
-            from datetime import datetime
+        return doctor_id, str(day), start, end
+
+    def update_availability(self, availability_id, is_available=None, start_time=None, end_time=None, available_date=None):
+        """Update a slot with validation; moving it onto another window of the doctor is rejected."""
+        self._validate_update(availability_id, start_time, end_time, available_date)
+        start_time, end_time = (t.strftime("%H:%M") if t else None for t in self._parse_times(start_time, end_time))
+        return self._run_locked(
+            self._update_availability(availability_id, is_available, start_time, end_time, available_date)
+        )
+
+    def _update_availability(self, availability_id, is_available, start_time, end_time, available_date):
+        if start_time or end_time or available_date:
+            current = yield from self._current_window(availability_id)
+            moved = self._moved_window(current, start_time, end_time, available_date)
+            yield from self._check_overlap(*moved, exclude_id=availability_id)
+        slot = yield self.availability_dao.update_availability(
+            availability_id, is_available, start_time, end_time, available_date
+        )
+        if slot:
+            self._notify("update", slot)
+        return slot
+
+    @staticmethod
+    def _place(windows, slot_id, doctor_id, available_date, start, end):
+        """
+        Reject a window that overlaps another one of its day in `windows`
+        (stored, or accepted earlier in the same batch), else record it there.
+        """
+        day = windows.setdefault((doctor_id, str(available_date)), {})
+        clashes = [i for i, (s, e) in day.items() if i != slot_id and s < end and start < e]
+        stored = [i for i in clashes if not isinstance(i, tuple)]
+        if stored:
+            raise AvailabilityService._overlap_error(stored, doctor_id, available_date)
+        if clashes:
+            raise AvailabilityError(f"Window overlaps another window of doctor {doctor_id} on {available_date} in this batch.")
+        day[slot_id] = (start, end)
+
+    @staticmethod
+    def _group_windows(days, rows):
+        """{(doctor_id, date): {availability_id: (start, end)}} of the rows that fall on `days`."""
+        windows = {day: {} for day in days}
+        for row in rows:
+            key = (row['doctor_id'], str(row['available_date']))
+            if key in windows:
+                windows[key][row['availability_id']] = AvailabilityService._parse_times(row['start_time'], row['end_time'])
+        return windows
+
+    @staticmethod
+    def _days_filter(days):
+        """Filters that select every (doctor_id, date) in `days` with one query (and a few rows besides)."""
+        return {"doctor_id": sorted({d for d, _ in days}), "available_date": sorted({day for _, day in days})}
+
+    @staticmethod
+    def _new_days(slots):
+        days = set()
+        for s in slots:
+            if s.get("doctor_id") and s.get("available_date"):
+                days.add((s["doctor_id"], str(s["available_date"])))
+        return days
+
+    @staticmethod
+    def _landing_days(updates, current):
+        """
+        The (doctor_id, date) days that the slots moved by a batch of updates
+        land on. Updates that are invalid or name an unknown slot are left
+        out here; validation reports them.
+        """
+        days = set()
+        for u in updates:
+            window = current.get(u.get("availability_id"))
+            if window is None or not (u.get("start_time") or u.get("end_time") or u.get("available_date")):
+                continue
             try:
-                datetime.strptime(available_date, "%Y-%m-%d")
-            except ValueError:
-                raise AvailabilityError("Invalid date format. Use YYYY-MM-DD.")   
-        return self.availability_dao.update_availability(
-        availability_id, is_available, start_time, end_time, available_date
-    )
+                doctor_id, day, _, _ = AvailabilityService._moved_window(
+                    window, u.get("start_time"), u.get("end_time"), u.get("available_date")
+                )
+            except AvailabilityError:
+                continue
+            days.add((doctor_id, day))
+        return days
+
+    def _windows_on(self, days):
+        """The stored windows of each (doctor_id, date) in `days`: from the slot index, or one paged read for all of them."""
+        if not days:
+            return {}
+        if self.slot_index is not None:
+            return {
+                (doctor_id, day): {i: (start, end) for start, end, i in self.slot_index.slots_on(doctor_id, day)}
+                for doctor_id, day in days
+            }
+        rows = yield self.availability_dao.list_paged(self._days_filter(days), WINDOW_COLUMNS)
+        return self._group_windows(days, rows)
+
+    def _current_windows(self, availability_ids):
+        """{availability_id: (doctor_id, date, start, end)} of existing slots, from the slot index where it has them."""
+        windows, missing = {}, []
+        for availability_id in dict.fromkeys(i for i in availability_ids if i):
+            window = self.slot_index.window(availability_id) if self.slot_index is not None else None
+            if window is None:
+                missing.append(availability_id)
+            else:
+                windows[availability_id] = window
+        rows = (yield self.availability_dao.get_many(missing, WINDOW_COLUMNS)) if missing else {}
+        for availability_id, row in rows.items():
+            windows[availability_id] = self._window_of(row, availability_id)
+        return windows
+
+    @staticmethod
+    def _add_validator(windows):
+        """Validation for add_many: the row's fields, then its window against `windows`."""
+        batch_ids = count()
+
+        def validate(s):
+            doctor_id, available_date = s.get("doctor_id"), s.get("available_date")
+            AvailabilityService._validate_new(doctor_id, available_date, s.get("start_time"), s.get("end_time"))
+            start, end = AvailabilityService._parse_times(s.get("start_time"), s.get("end_time"))
+            AvailabilityService._place(windows, ("batch", next(batch_ids)), doctor_id, available_date, start, end)
+
+        return validate
+
+    @staticmethod
+    def _update_validator(windows, current):
+        """Validation for update_many: the row's fields, then where a moved slot lands against `windows`."""
+        def validate(u):
+            availability_id = u.get("availability_id")
+            start_time, end_time, available_date = u.get("start_time"), u.get("end_time"), u.get("available_date")
+            AvailabilityService._validate_update(availability_id, start_time, end_time, available_date)
+            if not (start_time or end_time or available_date):
+                return
+            if availability_id not in current:
+                raise AvailabilityError(f"Availability ID {availability_id} not found.")
+            doctor_id, old_day, _, _ = current[availability_id]
+            moved = AvailabilityService._moved_window(current[availability_id], start_time, end_time, available_date)
+            AvailabilityService._place(windows, availability_id, *moved)
+            if moved[1] != str(old_day):
+                # The slot no longer takes up its old place
+                windows.get((doctor_id, str(old_day)), {}).pop(availability_id, None)
+
+        return validate
+
+    def add_many(self, slots, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Validate and insert many availability dicts in chunks. Rows overlapping
+        an existing window or an earlier row of the batch are rejected like
+        invalid rows: reported, not raised. The stored windows of every day
+        in the batch are read once, and all rows are checked against them in
+        memory.
+        """
+        return self._run_locked(self._add_many(list(slots), chunk_size))
+
+    def _add_many(self, slots, chunk_size):
+        windows = yield from self._windows_on(self._new_days(slots))
+        result = yield from bulk(slots, self._add_validator(windows), AvailabilityError,
+                                 self.availability_dao.add_many, chunk_size)
+        self._reindex(result["succeeded"])
+        return result
+
+    def update_many(self, updates, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Apply many availability updates (availability_id plus changed fields) in
+        chunks, reporting per-row failures. Updates that would move a slot onto
+        another window, stored or moved there earlier in the batch, are
+        rejected. The slots being moved and the days they land on are each
+        read once for the whole batch.
+        """
+        return self._run_locked(self._update_many(list(updates), chunk_size))
+
+    def _update_many(self, updates, chunk_size):
+        current = yield from self._current_windows(
+            u.get("availability_id") for u in updates
+            if u.get("start_time") or u.get("end_time") or u.get("available_date")
+        )
+        windows = yield from self._windows_on(self._landing_days(updates, current))
+        result = yield from bulk(updates, self._update_validator(windows, current), AvailabilityError,
+                                 self.availability_dao.update_many, chunk_size)
+        self._reindex(result["succeeded"])
+        return result
+
+    def _reindex(self, slots):
+        for slot in slots:
+            self._notify("add", slot)
+
+
+class AsyncAvailabilityService(AvailabilityService):
+    """
+    AvailabilityService for asyncio callers, over the async DAOs. The methods
+    are AvailabilityService's, with their plans run by the async driver, so
+    each returns an awaitable. Overlaps are checked on the server; the
+    in-memory slot views and templates load through sync DAOs and are not
+    used here.
+    """
+    _run = staticmethod(drive_async)
+
+    def __init__(self, availability_dao):
+        super().__init__(availability_dao)
+        # Serializes overlap check and write within this event loop
+        self._write_lock = asyncio.Lock()
+
+    async def _run_locked(self, plan):
+        async with self._write_lock:
+            return await self._run(plan)
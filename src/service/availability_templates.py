@@ -0,0 +1,99 @@
+from datetime import date, timedelta
+
+TEMPLATE_HORIZON_DAYS = 90
+
+
+def _as_date(value):
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+def _days(date_from, date_to):
+    day = date_from
+    while day < date_to:
+        yield day
+        day += timedelta(days=1)
+
+
+class AvailabilityTemplates:
+    """
+    Expands weekly availability templates into slot rows on demand.
+
+    A template produces one window per matching weekday between its
+    effective_from and (exclusive) effective_to, minus its exception dates.
+    Concrete availabilityofdoctors1 rows are overrides: on any day where a
+    doctor has concrete rows, that doctor's templates are ignored for the day.
+    Expanded rows look like availability rows with availability_id None and
+    the template_id they came from.
+    """
+
+    def __init__(self, template_dao, availability_dao):
+        self.template_dao = template_dao
+        self.availability_dao = availability_dao
+
+    def expand(self, doctor_id=None, date_from=None, date_to=None):
+        """
+        Return the template windows of a doctor (or a list of doctors, or all
+        doctors) in [date_from, date_to), skipping overridden days. Open ends
+        default to the template's own range, capped at TEMPLATE_HORIZON_DAYS
+        from today.
+        """
+        templates = self.template_dao.list_templates(doctor_id)
+        if not templates:
+            return []
+        date_from = _as_date(date_from) if date_from else None
+        date_to = _as_date(date_to) if date_to else None
+        horizon = date.today() + timedelta(days=TEMPLATE_HORIZON_DAYS)
+
+        ranges = {}
+        for template in templates:
+            start = _as_date(template['effective_from'])
+            end = _as_date(template['effective_to']) if template.get('effective_to') else horizon
+            ranges[template['template_id']] = (max(start, date_from) if date_from else start,
+                                               min(end, date_to) if date_to else end)
+        first = min(r[0] for r in ranges.values())
+        last = max(r[1] for r in ranges.values())
+        if first >= last:
+            return []
+
+        doctor_ids = sorted({t['doctor_id'] for t in templates})
+        overridden = {
+            (row['doctor_id'], _as_date(row['available_date']))
+            for row in self.availability_dao.iter_rows(
+                {"doctor_id": doctor_ids}, "doctor_id,available_date", date_from=first, date_to=last
+            )
+        }
+
+        rows = []
+        for template in templates:
+            start, end = ranges[template['template_id']]
+            skipped = {_as_date(d) for d in template.get('exceptions') or ()}
+            for day in _days(start, end):
+                if (day.weekday() != template['weekday'] or day in skipped
+                        or (template['doctor_id'], day) in overridden):
+                    continue
+                rows.append({
+                    "availability_id": None,
+                    "template_id": template['template_id'],
+                    "doctor_id": template['doctor_id'],
+                    "available_date": day.isoformat(),
+                    "start_time": template['start_time'],
+                    "end_time": template['end_time'],
+                    "is_available": True
+                })
+        rows.sort(key=lambda r: (r['doctor_id'], r['available_date'], r['start_time']))
+        return rows
+
+    def materialize(self, doctor_id, day):
+        """
+        Turn a doctor's template windows for one day into concrete rows so they
+        can be claimed and booked. All windows of the day are inserted together,
+        because a concrete row overrides the templates for the whole day.
+        Returns the inserted rows (empty if the day had nothing to expand or
+        another caller materialized it first).
+        """
+        day = _as_date(day)
+        rows = self.expand(doctor_id, day, day + timedelta(days=1))
+        if not rows:
+            return []
+        result = self.availability_dao.add_many(rows)
+        return result["succeeded"]
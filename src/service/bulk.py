@@ -0,0 +1,49 @@
+from dao.base_dao import DEFAULT_CHUNK_SIZE
+from dao.plans import drive, drive_async
+
+
+def _validated(rows, validate, error_type):
+    """Split rows into the indexes that pass `validate` and failures for the rest."""
+    valid, failed = [], []
+    for index, row in enumerate(rows):
+        try:
+            validate(row)
+        except error_type as e:
+            failed.append({"index": index, "row": row, "error": str(e)})
+        else:
+            valid.append(index)
+    return valid, failed
+
+
+def _merged(valid, failed, result):
+    for failure in result["failed"]:
+        failure["index"] = valid[failure["index"]]
+    failed.extend(result["failed"])
+    failed.sort(key=lambda f: f["index"])
+    return {"succeeded": result["succeeded"], "failed": failed}
+
+
+def bulk(rows, validate, error_type, send, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Validate each row with `validate`, send the valid ones in one call to
+    `send(rows, chunk_size)` and merge the per-row failures of both steps.
+
+    Rows failing validation are reported with the message of the error_type
+    raised for them; the rest of the batch is still sent. Failure indexes
+    always refer to positions in `rows`. This is the plan (dao/plans.py);
+    run_bulk and run_bulk_async run it.
+    """
+    rows = list(rows)
+    valid, failed = _validated(rows, validate, error_type)
+    result = (yield send([rows[i] for i in valid], chunk_size)) if valid else {"succeeded": [], "failed": []}
+    return _merged(valid, failed, result)
+
+
+def run_bulk(rows, validate, error_type, send, chunk_size=DEFAULT_CHUNK_SIZE):
+    """bulk() for a synchronous `send`, e.g. a DAO's add_many."""
+    return drive(bulk(rows, validate, error_type, send, chunk_size))
+
+
+async def run_bulk_async(rows, validate, error_type, send, chunk_size=DEFAULT_CHUNK_SIZE):
+    """bulk() for a coroutine `send`, e.g. an async DAO's add_many."""
+    return await drive_async(bulk(rows, validate, error_type, send, chunk_size))
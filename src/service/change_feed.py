@@ -0,0 +1,108 @@
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta, timezone
+
+# Every poll re-reads this far behind the cursor: a transaction that took its
+# timestamp before another one but committed after it would otherwise be missed
+DEFAULT_OVERLAP_SECONDS = 5
+DEFAULT_RECENT_CHANGES = 200
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class ChangeFeed:
+    """
+    A local snapshot of one table, kept current from the DAO's change feed.
+
+    The first use reads the table once. After that poll() asks only for rows
+    stamped or tombstoned since the cursor and applies them to the snapshot,
+    so a refresh costs in proportion to what changed, not to the table. The
+    cursor is the newest timestamp seen; it is taken before the initial scan
+    so that nothing written during the scan is lost. Rows re-read inside the
+    overlap window are recognized by their unchanged timestamp and not
+    reported twice.
+    """
+
+    def __init__(self, dao, overlap=DEFAULT_OVERLAP_SECONDS, keep_recent=DEFAULT_RECENT_CHANGES):
+        self.dao = dao
+        self.overlap = timedelta(seconds=overlap)
+        self._rows = {}
+        self._cursor = None
+        self._loaded = False
+        self._polled_at = 0.0
+        self._recent = deque(maxlen=keep_recent)
+        self._lock = threading.RLock()
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            cursor = self.dao.latest_change()
+            self._rows = {row[self.dao.id_column]: row for row in self.dao.iter_rows()}
+            self._cursor = cursor or EPOCH
+            self._polled_at = time.monotonic()
+            self._loaded = True
+
+    def poll(self, min_interval=0):
+        """
+        Apply the changes since the last poll, at most once every min_interval
+        seconds. Returns {"upserted": [rows], "deleted": [ids]} with only the
+        rows that actually changed in the snapshot.
+        """
+        changes = {"upserted": [], "deleted": []}
+        if not self._loaded:
+            self._ensure_loaded()
+            return changes
+        id_column, updated_column = self.dao.id_column, self.dao.updated_column
+        with self._lock:
+            if time.monotonic() - self._polled_at < min_interval:
+                return changes
+            self._polled_at = time.monotonic()
+            since = (self._cursor - self.overlap).isoformat()
+            cursor = self._cursor
+            for row in self.dao.iter_changed_since(since):
+                cursor = max(cursor, datetime.fromisoformat(row[updated_column]))
+                current = self._rows.get(row[id_column])
+                if current is None or current.get(updated_column) != row[updated_column]:
+                    self._rows[row[id_column]] = row
+                    changes["upserted"].append(row)
+                    self._recent.append(("upserted", row))
+            for tombstone in self.dao.iter_deleted_since(since):
+                cursor = max(cursor, datetime.fromisoformat(tombstone["deleted_at"]))
+                row = self._rows.pop(tombstone[id_column], None)
+                if row is not None:
+                    changes["deleted"].append(tombstone[id_column])
+                    self._recent.append(("deleted", row))
+            self._cursor = cursor
+        return changes
+
+    def invalidate(self):
+        """Forget the snapshot; the next use reloads the table."""
+        with self._lock:
+            self._loaded = False
+            self._rows = {}
+            self._recent.clear()
+
+    # -------- snapshot --------
+    def __len__(self):
+        self._ensure_loaded()
+        return len(self._rows)
+
+    def get(self, record_id):
+        """The row as last seen, or None."""
+        self._ensure_loaded()
+        return self._rows.get(record_id)
+
+    def rows(self):
+        """All rows of the snapshot in ID order."""
+        self._ensure_loaded()
+        with self._lock:
+            return [self._rows[k] for k in sorted(self._rows)]
+
+    def recent(self, limit=None):
+        """The latest applied changes as ("upserted" | "deleted", row) pairs, newest first."""
+        with self._lock:
+            recent = list(reversed(self._recent))
+        return recent if limit is None else recent[:limit]
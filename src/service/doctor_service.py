@@ -1,34 +1,158 @@
 from dao.doctor_dao import DoctorDAO
+from dao.base_dao import DEFAULT_PAGE_SIZE, DEFAULT_CHUNK_SIZE
+from service.bulk import run_bulk, run_bulk_async
+from service.name_search import NameIndex
 
 class DoctorError(Exception):
     pass
 
 class DoctorService:
-    def __init__(self, doctor_dao):
-        self.doctor_dao = doctor_dao
-
-    def add_doctor(self, full_name, specialization, email, phone, experience_years):
-        """Add a new doctor with validation."""
+    @staticmethod
+    def _validate_new(full_name, email, experience_years):
         if not full_name or not email:
             raise DoctorError("Full name and email are required.")
         if not isinstance(experience_years, int) or experience_years < 0:
             raise DoctorError("Experience years must be a positive integer.")
-        return self.doctor_dao.add_doctor(full_name, specialization, email, phone, experience_years)
+
+    @staticmethod
+    def _validate_update(doctor_id, phone, specialization):
+        if not doctor_id:
+            raise DoctorError("Doctor ID is required.")
+        if not (phone or specialization):
+            raise DoctorError("At least one field (phone or specialization) must be provided.")
+
+    def __init__(self, doctor_dao, specialization_index=None, name_index: NameIndex = None):
+        self.doctor_dao = doctor_dao
+        self.specialization_index = specialization_index
+        self.name_index = name_index
+
+    def add_doctor(self, full_name, specialization, email, phone, experience_years):
+        """Add a new doctor with validation."""
+        self._validate_new(full_name, email, experience_years)
+        doctor = self.doctor_dao.add_doctor(full_name, specialization, email, phone, experience_years)
+        if doctor:
+            self._reindex([doctor])
+        return doctor
 
     def delete_doctor(self, doctor_id):
         """Delete a doctor with validation."""
         if not doctor_id:
             raise DoctorError("Doctor ID is required.")
         self.doctor_dao.delete_doctor(doctor_id)
+        if self.specialization_index:
+            self.specialization_index.remove(doctor_id)
+        if self.name_index:
+            self.name_index.remove(doctor_id)
+
+    def search_doctors(self, query, limit=10):
+        """
+        Typo-tolerant search by full name, best match first; the last word may
+        be partly typed. Returns dicts with doctor_id, full_name and score.
+        """
+        if not query or not query.strip():
+            raise DoctorError("Search text is required.")
+        if self.name_index is None:
+            raise DoctorError("Name search is not configured.")
+        return [
+            {"doctor_id": doctor_id, "full_name": name, "score": score}
+            for doctor_id, name, score in self.name_index.search(query, limit)
+        ]
 
     def list_doctors(self, limit=100):
-        """List all doctors."""
-        return self.doctor_dao.list_doctors()
+        """List doctors, at most `limit` of them (None for all)."""
+        if limit is not None and limit <= 0:
+            raise DoctorError("Limit must be a positive integer.")
+        return self.doctor_dao.list_doctors(limit)
+
+    def iter_doctors(self, page_size=DEFAULT_PAGE_SIZE, columns="*", limit=None):
+        """Stream doctors in ID order with bounded memory."""
+        return self.doctor_dao.iter_doctors(page_size, columns, limit)
+
+    def get_doctor(self, doctor_id):
+        """Fetch a single doctor by ID."""
+        if not doctor_id:
+            raise DoctorError("Doctor ID is required.")
+        return self.doctor_dao.get_by_id(doctor_id)
 
     def update_doctor(self, doctor_id, phone=None, specialization=None):
         """Update a doctor's phone or specialization with validation."""
+        self._validate_update(doctor_id, phone, specialization)
+        doctor = self.doctor_dao.update_doctor(doctor_id, phone, specialization)
+        if doctor and self.specialization_index:
+            self.specialization_index.update(doctor)
+        return doctor
+
+    def add_many(self, doctors, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Validate and insert many doctor dicts in chunks; invalid or rejected rows are reported, not raised."""
+        result = run_bulk(
+            doctors,
+            lambda d: self._validate_new(d.get("full_name"), d.get("email"), d.get("experience_years")),
+            DoctorError, self.doctor_dao.add_many, chunk_size
+        )
+        self._reindex(result["succeeded"])
+        return result
+
+    def update_many(self, updates, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Apply many {doctor_id, phone, specialization} updates in chunks, reporting per-row failures."""
+        result = run_bulk(
+            updates,
+            lambda u: self._validate_update(u.get("doctor_id"), u.get("phone"), u.get("specialization")),
+            DoctorError, self.doctor_dao.update_many, chunk_size
+        )
+        self._reindex(result["succeeded"])
+        return result
+
+    def _reindex(self, doctors):
+        for doctor in doctors:
+            if self.specialization_index:
+                self.specialization_index.add(doctor)
+            if self.name_index:
+                self.name_index.update(doctor)
+
+
+class AsyncDoctorService:
+    """
+    DoctorService for asyncio callers, over the async DAOs, with the same
+    validation. The in-memory indexes load through sync DAOs and are not
+    kept here.
+    """
+
+    def __init__(self, doctor_dao):
+        self.doctor_dao = doctor_dao
+
+    async def add_doctor(self, full_name, specialization, email, phone, experience_years):
+        DoctorService._validate_new(full_name, email, experience_years)
+        return await self.doctor_dao.add_doctor(full_name, specialization, email, phone, experience_years)
+
+    async def delete_doctor(self, doctor_id):
         if not doctor_id:
             raise DoctorError("Doctor ID is required.")
-        if not (phone or specialization):
-            raise DoctorError("At least one field (phone or specialization) must be provided.")
-        return self.doctor_dao.update_doctor(doctor_id, phone, specialization)
\ No newline at end of file
+        await self.doctor_dao.delete_doctor(doctor_id)
+
+    async def list_doctors(self, limit=100):
+        if limit is not None and limit <= 0:
+            raise DoctorError("Limit must be a positive integer.")
+        return await self.doctor_dao.list_doctors(limit)
+
+    async def get_doctor(self, doctor_id):
+        if not doctor_id:
+            raise DoctorError("Doctor ID is required.")
+        return await self.doctor_dao.get_by_id(doctor_id)
+
+    async def update_doctor(self, doctor_id, phone=None, specialization=None):
+        DoctorService._validate_update(doctor_id, phone, specialization)
+        return await self.doctor_dao.update_doctor(doctor_id, phone, specialization)
+
+    async def add_many(self, doctors, chunk_size=DEFAULT_CHUNK_SIZE):
+        return await run_bulk_async(
+            doctors,
+            lambda d: DoctorService._validate_new(d.get("full_name"), d.get("email"), d.get("experience_years")),
+            DoctorError, self.doctor_dao.add_many, chunk_size
+        )
+
+    async def update_many(self, updates, chunk_size=DEFAULT_CHUNK_SIZE):
+        return await run_bulk_async(
+            updates,
+            lambda u: DoctorService._validate_update(u.get("doctor_id"), u.get("phone"), u.get("specialization")),
+            DoctorError, self.doctor_dao.update_many, chunk_size
+        )
@@ -0,0 +1,11 @@
+def hash_join(rows, key, lookup, columns):
+    """
+    Return copies of `rows` with columns of the row lookup[row[key]] added,
+    given as {new_name: source_column}. Rows whose key is missing from
+    lookup get None for every added column.
+    """
+    joined = []
+    for row in rows:
+        other = lookup.get(row.get(key)) or {}
+        joined.append(dict(row, **{name: other.get(column) for name, column in columns.items()}))
+    return joined
@@ -1,17 +1,52 @@
 from dao.medical_record_dao import MedicalRecordDAO
+from dao.appointment_dao import AppointmentDAO, AsyncAppointmentDAO
+from dao.patient_dao import PatientDAO, AsyncPatientDAO
+from dao.doctor_dao import DoctorDAO, AsyncDoctorDAO
+from dao.base_dao import DEFAULT_PAGE_SIZE, DEFAULT_CHUNK_SIZE
+from service.bulk import run_bulk, run_bulk_async
+from service.joins import hash_join
+from dao.plans import drive, drive_async
 from datetime import datetime
 
+APPOINTMENT_DETAIL_COLUMNS = "appointment_date,appointment_time"
+
+
 class MedicalRecordError(Exception):
     pass
 
+
+def join_details(records, patients, doctors, appointments):
+    """Hash-join fetched {id: row} maps onto medical record rows (see MedicalRecordService.with_details)."""
+    records = hash_join(records, "patient_id", patients, {"patient_name": "full_name"})
+    records = hash_join(records, "doctor_id", doctors,
+                        {"doctor_name": "full_name", "specialization": "specialization"})
+    return hash_join(records, "appointment_id", appointments,
+                     {"appointment_date": "appointment_date", "appointment_time": "appointment_time"})
+
 class MedicalRecordService:
-    def __init__(self, medical_record_dao: MedicalRecordDAO):
+    @staticmethod
+    def _validate_new(patient_id, doctor_id, appointment_id, diagnosis, prescription):
+        if not all([patient_id, doctor_id, appointment_id, diagnosis, prescription]):
+            raise MedicalRecordError("All fields (patient_id, doctor_id, appointment_id, diagnosis, prescription) are required.")
+
+    @staticmethod
+    def _validate_update(record_id, diagnosis, prescription):
+        if not record_id:
+            raise MedicalRecordError("Record ID is required.")
+        if not any([diagnosis, prescription]):
+            raise MedicalRecordError("At least one field (diagnosis or prescription) must be provided to update.")
+
+    def __init__(self, medical_record_dao: MedicalRecordDAO, appointment_dao: AppointmentDAO = None,
+                 patient_dao: PatientDAO = None, doctor_dao: DoctorDAO = None):
         self.medical_record_dao = medical_record_dao
+        # Used only for the detailed lists; by default they share the record DAO's client
+        self.appointment_dao = appointment_dao or AppointmentDAO(medical_record_dao._client)
+        self.patient_dao = patient_dao or PatientDAO(medical_record_dao._client)
+        self.doctor_dao = doctor_dao or DoctorDAO(medical_record_dao._client)
 
     def add_medical_record(self, patient_id, doctor_id, appointment_id, diagnosis, prescription):
         """Add a new medical record with validation."""
-        if not all([patient_id, doctor_id, appointment_id, diagnosis, prescription]):
-            raise MedicalRecordError("All fields (patient_id, doctor_id, appointment_id, diagnosis, prescription) are required.")
+        self._validate_new(patient_id, doctor_id, appointment_id, diagnosis, prescription)
         return self.medical_record_dao.add_medical_record(patient_id, doctor_id, appointment_id, diagnosis, prescription)
 
     def delete_medical_record(self, record_id):
@@ -20,14 +55,133 @@ class MedicalRecordService:
             raise MedicalRecordError("Record ID is required.")
         self.medical_record_dao.delete_medical_record(record_id)
 
-    def list_medical_records(self):
-        """List all medical records."""
-        return self.medical_record_dao.list_medical_records()
+    def list_medical_records(self, limit=None):
+        """List all medical records, or at most `limit` of them."""
+        return self.medical_record_dao.list_medical_records(limit)
+
+    def with_details(self, records):
+        """
+        Add the patient and doctor names and the appointment's date and time
+        to medical record rows, with one batched fetch per table.
+        """
+        return drive(self._with_details(list(records)))
+
+    def _with_details(self, records):
+        patients, doctors, appointments = yield (
+            self.patient_dao.get_many((r["patient_id"] for r in records), "full_name"),
+            self.doctor_dao.get_many((r["doctor_id"] for r in records), "full_name,specialization"),
+            self.appointment_dao.get_many((r["appointment_id"] for r in records), APPOINTMENT_DETAIL_COLUMNS),
+        )
+        return join_details(records, patients, doctors, appointments)
+
+    def list_medical_records_detailed(self, limit=None):
+        """Like list_medical_records, with names and appointment details."""
+        return self.with_details(self.list_medical_records(limit))
+
+    def iter_medical_records(self, page_size=DEFAULT_PAGE_SIZE, columns="*", limit=None):
+        """Stream medical records in ID order with bounded memory."""
+        return self.medical_record_dao.iter_medical_records(page_size, columns, limit)
+
+    def get_medical_record(self, record_id):
+        """Fetch a single medical record by ID."""
+        if not record_id:
+            raise MedicalRecordError("Record ID is required.")
+        return self.medical_record_dao.get_by_id(record_id)
+
+    def list_patient_records(self, patient_id):
+        """List all medical records of a patient."""
+        if not patient_id:
+            raise MedicalRecordError("Patient ID is required.")
+        return self.medical_record_dao.list_by_patient(patient_id)
+
+    def list_doctor_records(self, doctor_id):
+        """List all medical records written by a doctor."""
+        if not doctor_id:
+            raise MedicalRecordError("Doctor ID is required.")
+        return self.medical_record_dao.list_by_doctor(doctor_id)
 
     def update_medical_record(self, record_id, diagnosis=None, prescription=None):
         """Update a medical record's diagnosis or prescription with validation."""
+        self._validate_update(record_id, diagnosis, prescription)
+        return self.medical_record_dao.update_medical_record(record_id, diagnosis, prescription)
+
+    def add_many(self, records, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Validate and insert many medical record dicts in chunks; invalid or rejected rows are reported, not raised."""
+        return run_bulk(
+            records,
+            lambda r: self._validate_new(r.get("patient_id"), r.get("doctor_id"), r.get("appointment_id"),
+                                         r.get("diagnosis"), r.get("prescription")),
+            MedicalRecordError, self.medical_record_dao.add_many, chunk_size
+        )
+
+    def update_many(self, updates, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Apply many {record_id, diagnosis, prescription} updates in chunks, reporting per-row failures."""
+        return run_bulk(
+            updates,
+            lambda u: self._validate_update(u.get("record_id"), u.get("diagnosis"), u.get("prescription")),
+            MedicalRecordError, self.medical_record_dao.update_many, chunk_size
+        )
+
+
+class AsyncMedicalRecordService:
+    """MedicalRecordService for asyncio callers, over the async DAOs, with the same validation."""
+
+    def __init__(self, medical_record_dao, appointment_dao=None, patient_dao=None, doctor_dao=None):
+        self.medical_record_dao = medical_record_dao
+        # Used only for the detailed lists; by default they share the record DAO's client
+        self.appointment_dao = appointment_dao or AsyncAppointmentDAO(medical_record_dao._client)
+        self.patient_dao = patient_dao or AsyncPatientDAO(medical_record_dao._client)
+        self.doctor_dao = doctor_dao or AsyncDoctorDAO(medical_record_dao._client)
+
+    async def add_medical_record(self, patient_id, doctor_id, appointment_id, diagnosis, prescription):
+        MedicalRecordService._validate_new(patient_id, doctor_id, appointment_id, diagnosis, prescription)
+        return await self.medical_record_dao.add_medical_record(patient_id, doctor_id, appointment_id, diagnosis, prescription)
+
+    async def delete_medical_record(self, record_id):
         if not record_id:
             raise MedicalRecordError("Record ID is required.")
-        if not any([diagnosis, prescription]):
-            raise MedicalRecordError("At least one field (diagnosis or prescription) must be provided to update.")
-        return self.medical_record_dao.update_medical_record(record_id, diagnosis, prescription)
\ No newline at end of file
+        await self.medical_record_dao.delete_medical_record(record_id)
+
+    async def list_medical_records(self, limit=None):
+        return await self.medical_record_dao.list_medical_records(limit)
+
+    async def get_medical_record(self, record_id):
+        if not record_id:
+            raise MedicalRecordError("Record ID is required.")
+        return await self.medical_record_dao.get_by_id(record_id)
+
+    async def list_patient_records(self, patient_id):
+        if not patient_id:
+            raise MedicalRecordError("Patient ID is required.")
+        return await self.medical_record_dao.list_by_patient(patient_id)
+
+    async def list_doctor_records(self, doctor_id):
+        if not doctor_id:
+            raise MedicalRecordError("Doctor ID is required.")
+        return await self.medical_record_dao.list_by_doctor(doctor_id)
+
+    async def update_medical_record(self, record_id, diagnosis=None, prescription=None):
+        MedicalRecordService._validate_update(record_id, diagnosis, prescription)
+        return await self.medical_record_dao.update_medical_record(record_id, diagnosis, prescription)
+
+    async def with_details(self, records):
+        """MedicalRecordService.with_details with the three fetches awaited together."""
+        return await drive_async(MedicalRecordService._with_details(self, list(records)))
+
+    async def list_medical_records_detailed(self, limit=None):
+        return await self.with_details(await self.list_medical_records(limit))
+
+    async def add_many(self, records, chunk_size=DEFAULT_CHUNK_SIZE):
+        return await run_bulk_async(
+            records,
+            lambda r: MedicalRecordService._validate_new(r.get("patient_id"), r.get("doctor_id"), r.get("appointment_id"),
+                                                         r.get("diagnosis"), r.get("prescription")),
+            MedicalRecordError, self.medical_record_dao.add_many, chunk_size
+        )
+
+    async def update_many(self, updates, chunk_size=DEFAULT_CHUNK_SIZE):
+        return await run_bulk_async(
+            updates,
+            lambda u: MedicalRecordService._validate_update(u.get("record_id"), u.get("diagnosis"), u.get("prescription")),
+            MedicalRecordError, self.medical_record_dao.update_many, chunk_size
+        )
@@ -0,0 +1,212 @@
+from array import array
+import math
+import threading
+import time
+import unicodedata
+
+DEFAULT_MIN_SCORE = 0.5
+
+
+def normalize(text):
+    """Lower-case, strip accents and collapse whitespace."""
+    text = text or ""
+    if not text.isascii():
+        text = "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+    return " ".join(text.lower().split())
+
+
+def trigrams(text, prefix=False):
+    """
+    The set of trigrams of a normalized text, pg_trgm style: every word is
+    padded with two spaces in front and one behind. With prefix=True the last
+    word is not padded behind, so a partly typed word matches longer names.
+    """
+    words = text.split()
+    grams = set()
+    for i, word in enumerate(words):
+        padded = "  " + word + ("" if prefix and i == len(words) - 1 else " ")
+        grams.update(padded[j:j + 3] for j in range(len(padded) - 2))
+    return grams
+
+
+class NameIndex:
+    """
+    Typo-tolerant, ranked name search over one table.
+
+    Names are indexed by trigram in an inverted index whose posting lists
+    are int32 arrays of row positions. A query counts, for every row, how
+    many of its trigrams the row shares with one bincount over the posting
+    lists of those trigrams, so the cost depends on the lists touched, not
+    on string comparisons. Rows are ranked by the share of the query's
+    trigrams they contain, ties going to the closer name (trigram Jaccard
+    similarity). Deleted rows are masked out and their positions reclaimed
+    when more than half are dead.
+
+    The index is built from one projected scan of the table on first use and
+    then kept current through add/update/remove by the owning service; rows
+    inserted by other processes are picked up by refresh(). It doubles as the
+    table's id -> name map for pickers and local foreign key checks.
+    """
+
+    def __init__(self, dao, name_column="full_name"):
+        self.dao = dao
+        self.name_column = name_column
+        self._loaded = False
+        self._refreshed_at = 0.0
+        self._lock = threading.RLock()
+        self._clear()
+
+    def _clear(self):
+        self._ids = []                 # position -> record id
+        self._names = []               # position -> name as stored
+        self._sizes = array("H")       # position -> number of trigrams
+        self._alive = bytearray()      # position -> 1 unless deleted
+        self._position = {}            # record id -> position
+        self._postings = {}            # trigram -> array("i") of positions
+        self._dead = 0
+        self._max_id = None            # highest record id loaded from the table
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        rows = list(self.dao.iter_rows(columns=f"{self.dao.id_column},{self.name_column}"))
+        with self._lock:
+            if not self._loaded:
+                self._load(rows)
+                self._loaded = True
+                self._refreshed_at = time.monotonic()
+
+    def _load(self, rows):
+        for row in rows:
+            record_id = row[self.dao.id_column]
+            self._add(record_id, row.get(self.name_column))
+            if self._max_id is None or record_id > self._max_id:
+                self._max_id = record_id
+
+    def _add(self, record_id, name):
+        if record_id in self._position:
+            if self._names[self._position[record_id]] == name:
+                return
+            self._remove(record_id)
+        position = len(self._ids)
+        grams = trigrams(normalize(name))
+        self._ids.append(record_id)
+        self._names.append(name)
+        self._sizes.append(len(grams))
+        self._alive.append(1)
+        self._position[record_id] = position
+        for gram in grams:
+            postings = self._postings.get(gram)
+            if postings is None:
+                postings = self._postings[gram] = array("i")
+            postings.append(position)
+
+    def _remove(self, record_id):
+        position = self._position.pop(record_id, None)
+        if position is None:
+            return
+        self._alive[position] = 0
+        self._dead += 1
+        if self._dead * 2 > len(self._ids):
+            self._compact()
+
+    def _compact(self):
+        live = [(self._ids[p], self._names[p]) for p in range(len(self._ids)) if self._alive[p]]
+        max_id = self._max_id
+        self._clear()
+        self._max_id = max_id
+        for record_id, name in live:
+            self._add(record_id, name)
+
+    # -------- changes --------
+    def add(self, row):
+        """Index a new row (or re-index a changed one)."""
+        with self._lock:
+            if self._loaded:
+                self._add(row[self.dao.id_column], row.get(self.name_column))
+
+    def update(self, row):
+        """Re-index a row after an update that returned the name."""
+        if self.name_column in row:
+            self.add(row)
+
+    def remove(self, record_id):
+        """Drop a deleted row."""
+        with self._lock:
+            if self._loaded:
+                self._remove(record_id)
+
+    def refresh(self, min_interval=0):
+        """
+        Load rows inserted since the last load (by primary key), at most once
+        every min_interval seconds. Returns the number of rows added.
+        """
+        if not self._loaded:
+            self._ensure_loaded()
+            return 0
+        with self._lock:
+            if time.monotonic() - self._refreshed_at < min_interval:
+                return 0
+            self._refreshed_at = time.monotonic()
+            after = self._max_id
+        rows = list(self.dao.iter_rows(columns=f"{self.dao.id_column},{self.name_column}", after=after))
+        with self._lock:
+            self._load(rows)
+        return len(rows)
+
+    def invalidate(self):
+        """Forget everything; the next search reloads the table."""
+        with self._lock:
+            self._loaded = False
+            self._clear()
+
+    # -------- queries --------
+    def __contains__(self, record_id):
+        self._ensure_loaded()
+        return record_id in self._position
+
+    def name_of(self, record_id):
+        """The name of a record, or None if the index does not know it."""
+        self._ensure_loaded()
+        with self._lock:
+            position = self._position.get(record_id)
+            return None if position is None else self._names[position]
+
+    def search(self, query, limit=10, prefix=True, min_score=DEFAULT_MIN_SCORE):
+        """
+        Return up to `limit` (record_id, name, score) tuples, best first.
+        score is the share of the query's trigrams found in the name (1.0 for
+        an exact or, with prefix=True, a prefix match); rows scoring below
+        min_score are left out.
+        """
+        grams = trigrams(normalize(query), prefix)
+        if not grams or limit <= 0:
+            return []
+        # Imported here rather than at module level to keep CLI startup fast
+        import numpy as np
+
+        self._ensure_loaded()
+        with self._lock:
+            lists = [self._postings[g] for g in grams if g in self._postings]
+            # A row needs at least this many of the query's trigrams to score min_score
+            need = max(1, math.ceil(min_score * len(grams)))
+            if len(lists) < need:
+                return []
+            hits = np.bincount(
+                np.concatenate([np.frombuffer(p, dtype=np.int32) for p in lists]), minlength=len(self._ids)
+            )
+            candidates = np.flatnonzero(hits >= need)
+            candidates = candidates[np.frombuffer(self._alive, dtype=np.uint8)[candidates] == 1]
+            shared = hits[candidates]
+            cover = shared / len(grams)
+            sizes = np.frombuffer(self._sizes, dtype=np.uint16)[candidates]
+            rank = cover + 1e-3 * shared / (len(grams) + sizes - shared)
+            if len(rank) > limit:
+                top = np.argpartition(-rank, limit - 1)[:limit]
+            else:
+                top = np.arange(len(rank))
+            top = top[np.argsort(-rank[top], kind="stable")]
+            return [
+                (self._ids[p], self._names[p], round(float(cover[i]), 3))
+                for i, p in zip(top, candidates[top])
+            ]
@@ -1,34 +1,226 @@
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import threading
+
 from dao.patient_dao import PatientDAO
+from dao.appointment_dao import AppointmentDAO, AsyncAppointmentDAO
+from dao.medical_record_dao import MedicalRecordDAO, AsyncMedicalRecordDAO
+from dao.payment_dao import PaymentDAO, AsyncPaymentDAO
+from dao.base_dao import DEFAULT_PAGE_SIZE, DEFAULT_CHUNK_SIZE
+from service.bulk import run_bulk, run_bulk_async
+from service.name_search import NameIndex
+
+# Order of the entries of one appointment in a timeline
+TIMELINE_KINDS = ("appointment", "medical_record", "payment")
 
 class PatientError(Exception):
     pass
 
-class PatientService:
-    def __init__(self, patient_dao):
-        self.patient_dao = patient_dao
 
-    def add_patient(self, full_name, email, phone, age, gender, address):
-        """Add a new patient with validation."""
+def merge_timeline(rows):
+    """
+    Merge {kind: rows} of one patient into timeline entries, oldest first.
+    Records and payments take the date and time of their appointment.
+    """
+    appointments = {a["appointment_id"]: a for a in rows["appointment"]}
+    entries = []
+    for kind in TIMELINE_KINDS:
+        for row in rows[kind]:
+            appointment = appointments.get(row["appointment_id"], {})
+            entries.append({
+                "kind": kind,
+                "date": appointment.get("appointment_date"),
+                "time": appointment.get("appointment_time"),
+                "appointment_id": row["appointment_id"],
+                "row": row,
+            })
+    # Entries whose appointment is gone sort last
+    entries.sort(key=lambda e: (e["date"] is None, str(e["date"]), str(e["time"]),
+                                e["appointment_id"] or 0, TIMELINE_KINDS.index(e["kind"])))
+    return entries
+
+class PatientService:
+    @staticmethod
+    def _validate_new(full_name, email, age):
         if not full_name or not email:
             raise PatientError("Full name and email are required.")
         if not isinstance(age, int) or age < 0:
             raise PatientError("Age must be a positive integer.")
-        return self.patient_dao.add_patient(full_name, email, phone, age, gender, address)
+
+    @staticmethod
+    def _validate_update(patient_id, phone, address):
+        if not patient_id:
+            raise PatientError("Patient ID is required.")
+        if not (phone or address):
+            raise PatientError("At least one field (phone or address) must be provided.")
+
+    def __init__(self, patient_dao, name_index: NameIndex = None, appointment_dao: AppointmentDAO = None,
+                 medical_record_dao: MedicalRecordDAO = None, payment_dao: PaymentDAO = None):
+        self.patient_dao = patient_dao
+        self.name_index = name_index
+        # Read by timeline(); by default they share the patient DAO's client
+        self.appointment_dao = appointment_dao or AppointmentDAO(patient_dao._client)
+        self.medical_record_dao = medical_record_dao or MedicalRecordDAO(patient_dao._client)
+        self.payment_dao = payment_dao or PaymentDAO(patient_dao._client)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def _pool(self):
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=len(TIMELINE_KINDS), thread_name_prefix="timeline")
+            return self._executor
+
+    def add_patient(self, full_name, email, phone, age, gender, address):
+        """Add a new patient with validation."""
+        self._validate_new(full_name, email, age)
+        patient = self.patient_dao.add_patient(full_name, email, phone, age, gender, address)
+        if patient and self.name_index:
+            self.name_index.add(patient)
+        return patient
 
     def delete_patient(self, patient_id):
         """Delete a patient with validation."""
         if not patient_id:
             raise PatientError("Patient ID is required.")
         self.patient_dao.delete_patient(patient_id)
+        if self.name_index:
+            self.name_index.remove(patient_id)
+
+    def search_patients(self, query, limit=10):
+        """
+        Typo-tolerant search by full name, best match first; the last word may
+        be partly typed. Returns dicts with patient_id, full_name and score.
+        """
+        if not query or not query.strip():
+            raise PatientError("Search text is required.")
+        if self.name_index is None:
+            raise PatientError("Name search is not configured.")
+        return [
+            {"patient_id": patient_id, "full_name": name, "score": score}
+            for patient_id, name, score in self.name_index.search(query, limit)
+        ]
+
+    def timeline(self, patient_id):
+        """
+        A patient's appointments, medical records and payments as one list,
+        oldest first. Entries are {"kind", "date", "time", "appointment_id",
+        "row"}; records and payments take the date and time of their
+        appointment and follow it.
+
+        The three filtered queries run concurrently, so the call takes about
+        as long as the slowest of them rather than their sum.
+        """
+        if not patient_id:
+            raise PatientError("Patient ID is required.")
+        pool = self._pool()
+        futures = {
+            "appointment": pool.submit(self.appointment_dao.list_by_patient, patient_id),
+            "medical_record": pool.submit(self.medical_record_dao.list_by_patient, patient_id),
+            "payment": pool.submit(self.payment_dao.list_by_patient, patient_id),
+        }
+        return merge_timeline({kind: future.result() for kind, future in futures.items()})
 
     def list_patients(self, limit=100):
-        """List all patients."""
-        return self.patient_dao.list_patients()
+        """List patients, at most `limit` of them (None for all)."""
+        if limit is not None and limit <= 0:
+            raise PatientError("Limit must be a positive integer.")
+        return self.patient_dao.list_patients(limit)
+
+    def iter_patients(self, page_size=DEFAULT_PAGE_SIZE, columns="*", limit=None):
+        """Stream patients in ID order with bounded memory."""
+        return self.patient_dao.iter_patients(page_size, columns, limit)
+
+    def get_patient(self, patient_id):
+        """Fetch a single patient by ID."""
+        if not patient_id:
+            raise PatientError("Patient ID is required.")
+        return self.patient_dao.get_by_id(patient_id)
 
     def update_patient(self, patient_id, phone=None, address=None):
         """Update a patient's phone or address with validation."""
+        self._validate_update(patient_id, phone, address)
+        return self.patient_dao.update_patient(patient_id, phone, address)
+
+    def add_many(self, patients, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Validate and insert many patient dicts in chunks; invalid or rejected rows are reported, not raised."""
+        result = run_bulk(
+            patients,
+            lambda p: self._validate_new(p.get("full_name"), p.get("email"), p.get("age")),
+            PatientError, self.patient_dao.add_many, chunk_size
+        )
+        if self.name_index:
+            for patient in result["succeeded"]:
+                self.name_index.add(patient)
+        return result
+
+    def update_many(self, updates, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Apply many {patient_id, phone, address} updates in chunks, reporting per-row failures."""
+        return run_bulk(
+            updates,
+            lambda u: self._validate_update(u.get("patient_id"), u.get("phone"), u.get("address")),
+            PatientError, self.patient_dao.update_many, chunk_size
+        )
+
+
+class AsyncPatientService:
+    """
+    PatientService for asyncio callers, over the async DAOs, with the same
+    validation. The in-memory name index loads through a sync DAO and is
+    not kept here.
+    """
+
+    def __init__(self, patient_dao, appointment_dao=None, medical_record_dao=None, payment_dao=None):
+        self.patient_dao = patient_dao
+        # Read by timeline(); by default they share the patient DAO's client
+        self.appointment_dao = appointment_dao or AsyncAppointmentDAO(patient_dao._client)
+        self.medical_record_dao = medical_record_dao or AsyncMedicalRecordDAO(patient_dao._client)
+        self.payment_dao = payment_dao or AsyncPaymentDAO(patient_dao._client)
+
+    async def add_patient(self, full_name, email, phone, age, gender, address):
+        PatientService._validate_new(full_name, email, age)
+        return await self.patient_dao.add_patient(full_name, email, phone, age, gender, address)
+
+    async def delete_patient(self, patient_id):
         if not patient_id:
             raise PatientError("Patient ID is required.")
-        if not (phone or address):
-            raise PatientError("At least one field (phone or address) must be provided.")
-        return self.patient_dao.update_patient(patient_id, phone, address)
\ No newline at end of file
+        await self.patient_dao.delete_patient(patient_id)
+
+    async def list_patients(self, limit=100):
+        if limit is not None and limit <= 0:
+            raise PatientError("Limit must be a positive integer.")
+        return await self.patient_dao.list_patients(limit)
+
+    async def get_patient(self, patient_id):
+        if not patient_id:
+            raise PatientError("Patient ID is required.")
+        return await self.patient_dao.get_by_id(patient_id)
+
+    async def update_patient(self, patient_id, phone=None, address=None):
+        PatientService._validate_update(patient_id, phone, address)
+        return await self.patient_dao.update_patient(patient_id, phone, address)
+
+    async def timeline(self, patient_id):
+        """PatientService.timeline with the three queries awaited together."""
+        if not patient_id:
+            raise PatientError("Patient ID is required.")
+        rows = await asyncio.gather(
+            self.appointment_dao.list_by_patient(patient_id),
+            self.medical_record_dao.list_by_patient(patient_id),
+            self.payment_dao.list_by_patient(patient_id),
+        )
+        return merge_timeline(dict(zip(TIMELINE_KINDS, rows)))
+
+    async def add_many(self, patients, chunk_size=DEFAULT_CHUNK_SIZE):
+        return await run_bulk_async(
+            patients,
+            lambda p: PatientService._validate_new(p.get("full_name"), p.get("email"), p.get("age")),
+            PatientError, self.patient_dao.add_many, chunk_size
+        )
+
+    async def update_many(self, updates, chunk_size=DEFAULT_CHUNK_SIZE):
+        return await run_bulk_async(
+            updates,
+            lambda u: PatientService._validate_update(u.get("patient_id"), u.get("phone"), u.get("address")),
+            PatientError, self.patient_dao.update_many, chunk_size
+        )
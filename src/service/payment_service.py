@@ -1,19 +1,55 @@
 from dao.payment_dao import PaymentDAO
+from dao.appointment_dao import AppointmentDAO, AsyncAppointmentDAO
+from dao.patient_dao import PatientDAO, AsyncPatientDAO
+from dao.doctor_dao import DoctorDAO, AsyncDoctorDAO
+from dao.base_dao import DEFAULT_PAGE_SIZE, DEFAULT_CHUNK_SIZE
+from service.bulk import run_bulk, run_bulk_async
+from service.joins import hash_join
+from dao.plans import drive, drive_async
 from datetime import datetime
 
+APPOINTMENT_DETAIL_COLUMNS = "doctor_id,appointment_date,appointment_time,status"
+
+
 class PaymentError(Exception):
     pass
 
-class PaymentService:
-    def __init__(self, payment_dao: PaymentDAO):
-        self.payment_dao = payment_dao
 
-    def add_payment(self, appointment_id, patient_id, amount, transaction_id=None):
-        """Add a new payment with validation."""
+def join_details(payments, appointments, patients, doctors):
+    """Hash-join fetched {id: row} maps onto payment rows (see PaymentService.with_details)."""
+    payments = hash_join(payments, "appointment_id", appointments, {
+        "appointment_date": "appointment_date", "appointment_time": "appointment_time",
+        "appointment_status": "status", "doctor_id": "doctor_id",
+    })
+    payments = hash_join(payments, "patient_id", patients, {"patient_name": "full_name"})
+    return hash_join(payments, "doctor_id", doctors, {"doctor_name": "full_name"})
+
+class PaymentService:
+    @staticmethod
+    def _validate_new(appointment_id, patient_id, amount):
         if not all([appointment_id, patient_id, amount]):
             raise PaymentError("appointment_id, patient_id, and amount are required.")
         if not isinstance(amount, (int, float)) or amount <= 0:
             raise PaymentError("Amount must be a positive number.")
+
+    @staticmethod
+    def _validate_update(payment_id, payment_status):
+        if not payment_id:
+            raise PaymentError("Payment ID is required.")
+        if payment_status and payment_status not in ["Pending", "Completed", "Failed"]:
+            raise PaymentError("Status must be 'Pending', 'Completed', or 'Failed'.")
+
+    def __init__(self, payment_dao: PaymentDAO, appointment_dao: AppointmentDAO = None,
+                 patient_dao: PatientDAO = None, doctor_dao: DoctorDAO = None):
+        self.payment_dao = payment_dao
+        # Used only for the detailed lists; by default they share the payment DAO's client
+        self.appointment_dao = appointment_dao or AppointmentDAO(payment_dao._client)
+        self.patient_dao = patient_dao or PatientDAO(payment_dao._client)
+        self.doctor_dao = doctor_dao or DoctorDAO(payment_dao._client)
+
+    def add_payment(self, appointment_id, patient_id, amount, transaction_id=None):
+        """Add a new payment with validation."""
+        self._validate_new(appointment_id, patient_id, amount)
         return self.payment_dao.add_payment(appointment_id, patient_id, amount, transaction_id)
 
     def delete_payment(self, payment_id):
@@ -22,14 +58,131 @@ class PaymentService:
             raise PaymentError("Payment ID is required.")
         self.payment_dao.delete_payment(payment_id)
 
-    def list_payments(self):
-        """List all payments."""
-        return self.payment_dao.list_payments()
+    def list_payments(self, limit=None):
+        """List all payments, or at most `limit` of them."""
+        return self.payment_dao.list_payments(limit)
+
+    def with_details(self, payments):
+        """
+        Add the appointment's date, time, status and doctor plus the patient
+        and doctor names to payment rows, with one batched fetch per table.
+        """
+        return drive(self._with_details(list(payments)))
+
+    def _with_details(self, payments):
+        appointments, patients = yield (
+            self.appointment_dao.get_many((p["appointment_id"] for p in payments), APPOINTMENT_DETAIL_COLUMNS),
+            self.patient_dao.get_many((p["patient_id"] for p in payments), "full_name"),
+        )
+        doctors = yield self.doctor_dao.get_many((a["doctor_id"] for a in appointments.values()), "full_name")
+        return join_details(payments, appointments, patients, doctors)
+
+    def list_payments_detailed(self, limit=None):
+        """Like list_payments, with appointment details and names."""
+        return self.with_details(self.list_payments(limit))
+
+    def iter_payments(self, page_size=DEFAULT_PAGE_SIZE, columns="*", limit=None):
+        """Stream payments in ID order with bounded memory."""
+        return self.payment_dao.iter_payments(page_size, columns, limit)
+
+    def get_payment(self, payment_id):
+        """Fetch a single payment by ID."""
+        if not payment_id:
+            raise PaymentError("Payment ID is required.")
+        return self.payment_dao.get_by_id(payment_id)
+
+    def list_patient_payments(self, patient_id):
+        """List all payments made by a patient."""
+        if not patient_id:
+            raise PaymentError("Patient ID is required.")
+        return self.payment_dao.list_by_patient(patient_id)
+
+    def list_appointment_payments(self, appointment_id):
+        """List all payments for an appointment."""
+        if not appointment_id:
+            raise PaymentError("Appointment ID is required.")
+        return self.payment_dao.list_by_appointment(appointment_id)
 
     def update_payment(self, payment_id, payment_status=None):
         """Update a payment's status with validation."""
+        self._validate_update(payment_id, payment_status)
+        return self.payment_dao.update_payment(payment_id, payment_status)
+
+    def add_many(self, payments, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Validate and insert many payment dicts in chunks; invalid or rejected rows are reported, not raised."""
+        return run_bulk(
+            payments,
+            lambda p: self._validate_new(p.get("appointment_id"), p.get("patient_id"), p.get("amount")),
+            PaymentError, self.payment_dao.add_many, chunk_size
+        )
+
+    def update_many(self, updates, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Apply many {payment_id, payment_status} updates in chunks, reporting per-row failures."""
+        return run_bulk(
+            updates,
+            lambda u: self._validate_update(u.get("payment_id"), u.get("payment_status")),
+            PaymentError, self.payment_dao.update_many, chunk_size
+        )
+
+
+class AsyncPaymentService:
+    """PaymentService for asyncio callers, over the async DAOs, with the same validation."""
+
+    def __init__(self, payment_dao, appointment_dao=None, patient_dao=None, doctor_dao=None):
+        self.payment_dao = payment_dao
+        # Used only for the detailed lists; by default they share the payment DAO's client
+        self.appointment_dao = appointment_dao or AsyncAppointmentDAO(payment_dao._client)
+        self.patient_dao = patient_dao or AsyncPatientDAO(payment_dao._client)
+        self.doctor_dao = doctor_dao or AsyncDoctorDAO(payment_dao._client)
+
+    async def add_payment(self, appointment_id, patient_id, amount, transaction_id=None):
+        PaymentService._validate_new(appointment_id, patient_id, amount)
+        return await self.payment_dao.add_payment(appointment_id, patient_id, amount, transaction_id)
+
+    async def delete_payment(self, payment_id):
         if not payment_id:
             raise PaymentError("Payment ID is required.")
-        if payment_status and payment_status not in ["Pending", "Completed", "Failed"]:
-            raise PaymentError("Status must be 'Pending', 'Completed', or 'Failed'.")
-        return self.payment_dao.update_payment(payment_id, payment_status)
\ No newline at end of file
+        await self.payment_dao.delete_payment(payment_id)
+
+    async def list_payments(self, limit=None):
+        return await self.payment_dao.list_payments(limit)
+
+    async def get_payment(self, payment_id):
+        if not payment_id:
+            raise PaymentError("Payment ID is required.")
+        return await self.payment_dao.get_by_id(payment_id)
+
+    async def list_patient_payments(self, patient_id):
+        if not patient_id:
+            raise PaymentError("Patient ID is required.")
+        return await self.payment_dao.list_by_patient(patient_id)
+
+    async def list_appointment_payments(self, appointment_id):
+        if not appointment_id:
+            raise PaymentError("Appointment ID is required.")
+        return await self.payment_dao.list_by_appointment(appointment_id)
+
+    async def update_payment(self, payment_id, payment_status=None):
+        PaymentService._validate_update(payment_id, payment_status)
+        return await self.payment_dao.update_payment(payment_id, payment_status)
+
+    async def with_details(self, payments):
+        """PaymentService.with_details; the appointment and patient fetches run together."""
+        return await drive_async(PaymentService._with_details(self, list(payments)))
+
+    async def list_payments_detailed(self, limit=None):
+        return await self.with_details(await self.list_payments(limit))
+
+    async def add_many(self, payments, chunk_size=DEFAULT_CHUNK_SIZE):
+        return await run_bulk_async(
+            payments,
+            lambda p: PaymentService._validate_new(p.get("appointment_id"), p.get("patient_id"), p.get("amount")),
+            PaymentError, self.payment_dao.add_many, chunk_size
+        )
+
+    async def update_many(self, updates, chunk_size=DEFAULT_CHUNK_SIZE):
+        return await run_bulk_async(
+            updates,
+            lambda u: PaymentService._validate_update(u.get("payment_id"), u.get("payment_status")),
+            PaymentError, self.payment_dao.update_many, chunk_size
+        )
@@ -0,0 +1,184 @@
+from dao.base_dao import DEFAULT_PAGE_SIZE
+
+# pandas and numpy are imported where they are used: importing them takes
+# longer than starting the rest of the CLI, and most sessions never audit
+
+AVAILABILITY_COLUMNS = ["availability_id", "doctor_id", "available_date", "start_time", "end_time"]
+APPOINTMENT_COLUMNS = ["appointment_id", "patient_id", "doctor_id", "appointment_date", "appointment_time", "status"]
+OVERLAP_COLUMNS = [
+    "doctor_id", "available_date", "availability_id", "start_time", "end_time",
+    "overlaps_availability_id", "overlaps_start_time", "overlaps_end_time",
+]
+DOUBLE_BOOKING_COLUMNS = ["doctor_id", "appointment_date", "appointment_time", "count", "appointment_ids"]
+
+
+# A schedule has few distinct dates and times, so both are parsed once per
+# distinct value and spread back over the rows by their factorized codes
+
+def _minutes(times):
+    """Minutes after midnight of a column of HH:MM or HH:MM:SS strings."""
+    import numpy as np
+    import pandas as pd
+
+    codes, values = pd.factorize(times)
+    parsed = np.array([int(v[:v.index(":")]) * 60 + int(v[v.index(":") + 1:][:2]) for v in map(str, values)], dtype=np.int64)
+    return parsed[codes]
+
+
+def _days(dates):
+    """Days since the epoch of a column of YYYY-MM-DD strings."""
+    import numpy as np
+    import pandas as pd
+
+    codes, values = pd.factorize(dates)
+    parsed = pd.to_datetime(pd.Index(values).astype(str), format="%Y-%m-%d").to_numpy().astype("datetime64[D]").astype(np.int64)
+    return parsed[codes]
+
+
+def find_overlaps(slots):
+    """
+    Return the availability windows that overlap an earlier window of the same doctor.
+
+    Windows are turned into absolute minutes and sorted by doctor and start. A
+    window overlaps an earlier one exactly when it starts before the latest
+    end seen so far for its doctor, so a single running maximum over the
+    sorted arrays finds them all. Each doctor's times are shifted past the
+    previous doctor's so that the running maximum never crosses doctors.
+    Every window that overlaps another appears once, paired with the
+    earlier window that reaches furthest.
+    """
+    import numpy as np
+    import pandas as pd
+
+    if slots.empty:
+        return pd.DataFrame(columns=OVERLAP_COLUMNS)
+    day = _days(slots["available_date"]) * 1440
+    start = day + _minutes(slots["start_time"])
+    end = day + _minutes(slots["end_time"])
+    doctor = pd.factorize(slots["doctor_id"])[0]
+
+    order = np.lexsort((end, start, doctor))
+    base = start.min()
+    span = max(end.max(), start.max()) - base + 1
+    offset = doctor[order] * span - base
+    start_sorted = start[order] + offset
+    end_sorted = end[order] + offset
+
+    reach = np.maximum.accumulate(end_sorted)
+    positions = np.arange(len(order))
+    # Position of the window that set the running maximum
+    holder = np.maximum.accumulate(np.where(end_sorted == reach, positions, 0))
+    hit = np.zeros(len(order), dtype=bool)
+    hit[1:] = start_sorted[1:] < reach[:-1]
+    rows = positions[hit]
+
+    window = slots.iloc[order[rows]].reset_index(drop=True)
+    other = slots.iloc[order[holder[rows - 1]]].reset_index(drop=True)
+    return pd.DataFrame({
+        "doctor_id": window["doctor_id"],
+        "available_date": window["available_date"],
+        "availability_id": window["availability_id"],
+        "start_time": window["start_time"],
+        "end_time": window["end_time"],
+        "overlaps_availability_id": other["availability_id"],
+        "overlaps_start_time": other["start_time"],
+        "overlaps_end_time": other["end_time"],
+    }, columns=OVERLAP_COLUMNS)
+
+
+def find_double_bookings(appointments):
+    """
+    Return every doctor/date/time with more than one appointment that is not
+    cancelled, with the IDs involved. Times are compared to the minute.
+
+    Doctor, date and minute are packed into one integer key; after sorting
+    the keys, runs of equal keys are the double bookings.
+    """
+    import numpy as np
+    import pandas as pd
+
+    active = appointments[appointments["status"] != "Cancelled"]
+    if active.empty:
+        return pd.DataFrame(columns=DOUBLE_BOOKING_COLUMNS)
+    doctor_codes, doctors = pd.factorize(active["doctor_id"])
+    date_codes, dates = pd.factorize(active["appointment_date"])
+    minutes = _minutes(active["appointment_time"])
+    key = (doctor_codes.astype(np.int64) * len(dates) + date_codes) * 1440 + minutes
+
+    order = np.argsort(key, kind="stable")
+    key = key[order]
+    starts = np.flatnonzero(np.r_[True, key[1:] != key[:-1]])
+    counts = np.diff(np.r_[starts, len(key)])
+    clashing = counts > 1
+    starts, counts = starts[clashing], counts[clashing]
+
+    ids = active["appointment_id"].to_numpy()[order]
+    first = order[starts]
+    report = pd.DataFrame({
+        "doctor_id": np.asarray(doctors)[doctor_codes[first]],
+        "appointment_date": np.asarray(dates)[date_codes[first]],
+        "appointment_time": [f"{m // 60:02d}:{m % 60:02d}" for m in minutes[first]],
+        "count": counts,
+        "appointment_ids": [sorted(ids[s:s + c].tolist()) for s, c in zip(starts, counts)],
+    }, columns=DOUBLE_BOOKING_COLUMNS)
+    return report.sort_values(["doctor_id", "appointment_date", "appointment_time"], ignore_index=True)
+
+
+def format_report(result, max_lines=50):
+    """Render an audit result as text, listing at most max_lines conflicts per kind."""
+    overlaps, double_bookings = result["availability_overlaps"], result["double_bookings"]
+    lines = [f"Overlapping availability windows: {len(overlaps)}"]
+    for row in overlaps.head(max_lines).itertuples(index=False):
+        lines.append(
+            f"  doctor {row.doctor_id} on {row.available_date}: slot {row.availability_id} "
+            f"({row.start_time}-{row.end_time}) overlaps slot {row.overlaps_availability_id} "
+            f"({row.overlaps_start_time}-{row.overlaps_end_time})"
+        )
+    if len(overlaps) > max_lines:
+        lines.append(f"  ... and {len(overlaps) - max_lines} more")
+    lines.append(f"Double bookings: {len(double_bookings)}")
+    for row in double_bookings.head(max_lines).itertuples(index=False):
+        ids = ", ".join(str(i) for i in row.appointment_ids)
+        lines.append(
+            f"  doctor {row.doctor_id} on {row.appointment_date} at {row.appointment_time}: "
+            f"{row.count} appointments ({ids})"
+        )
+    if len(double_bookings) > max_lines:
+        lines.append(f"  ... and {len(double_bookings) - max_lines} more")
+    return "\n".join(lines)
+
+
+class ScheduleAudit:
+    """
+    Finds overlapping availability windows and double-booked appointments.
+
+    Rows written straight to the tables (e.g. from the dashboard) bypass the
+    checks in the services, so this reads both tables in full and checks
+    them with vectorized sort-and-sweep passes instead of pairwise loops.
+    """
+
+    def __init__(self, availability_dao, appointment_dao):
+        self.availability_dao = availability_dao
+        self.appointment_dao = appointment_dao
+
+    def load(self, page_size=DEFAULT_PAGE_SIZE):
+        """Read the columns the audit needs from both tables into DataFrames."""
+        import pandas as pd
+
+        slots = pd.DataFrame.from_records(
+            self.availability_dao.iter_rows(columns=",".join(AVAILABILITY_COLUMNS), page_size=page_size),
+            columns=AVAILABILITY_COLUMNS
+        )
+        appointments = pd.DataFrame.from_records(
+            self.appointment_dao.iter_rows(columns=",".join(APPOINTMENT_COLUMNS), page_size=page_size),
+            columns=APPOINTMENT_COLUMNS
+        )
+        return slots, appointments
+
+    def run(self, page_size=DEFAULT_PAGE_SIZE):
+        """Audit both tables; returns {"availability_overlaps": DataFrame, "double_bookings": DataFrame}."""
+        slots, appointments = self.load(page_size)
+        return {
+            "availability_overlaps": find_overlaps(slots),
+            "double_bookings": find_double_bookings(appointments),
+        }
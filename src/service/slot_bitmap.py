@@ -0,0 +1,238 @@
+from datetime import date, datetime, time, timedelta
+from itertools import islice
+import threading
+
+SLOT_MINUTES = 15
+SEARCH_DAYS = 90
+
+AVAILABILITY_COLUMNS = "availability_id,doctor_id,available_date,start_time,end_time,is_available"
+APPOINTMENT_COLUMNS = "appointment_id,doctor_id,appointment_date,appointment_time,status"
+
+
+def _as_date(value):
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+def _minutes(value):
+    if not isinstance(value, time):
+        value = time.fromisoformat(value)
+    return value.hour * 60 + value.minute
+
+
+class SlotBitmap:
+    """
+    Per doctor and day bitmap of fixed-length bookable units.
+
+    Bit i of a day stands for the unit starting i * unit_minutes after
+    midnight. A unit is free when it lies entirely inside an open
+    availability window that holds no appointment: like claim_slot, one
+    booking takes its whole window, so the units are the start times on offer,
+    not separately bookable pieces of it. Windows and bookings
+    are kept as separate masks so that either side can change incrementally;
+    the free mask is recomputed only for the day that changed. Windows
+    expanded from availability templates (for the next SEARCH_DAYS days) are
+    included until a concrete row for that day replaces them.
+
+    A doctor's state covers the SEARCH_DAYS days from the day it was loaded;
+    rows outside that range are neither read nor kept.
+    """
+
+    def __init__(self, availability_dao, appointment_dao, unit_minutes=SLOT_MINUTES, templates=None):
+        if 1440 % unit_minutes:
+            raise ValueError("unit_minutes must divide a day evenly")
+        self.availability_dao = availability_dao
+        self.appointment_dao = appointment_dao
+        self.templates = templates
+        self.unit_minutes = unit_minutes
+        self._windows = {}    # (doctor_id, date) -> {availability_id: (start_minute, end_minute, is_available)}
+        self._window_day = {} # availability_id -> (doctor_id, date)
+        self._booked = {}     # (doctor_id, date) -> {minute: number of appointments}
+        self._free = {}       # (doctor_id, date) -> int bitmask of free units
+        self._days = {}       # doctor_id -> set of dates with a free mask
+        self._loaded = {}     # doctor_id -> (first date, end date) of the days held
+        self._lock = threading.RLock()
+
+    def _ensure_loaded(self, doctor_id):
+        if doctor_id not in self._loaded:
+            self.preload([doctor_id])
+
+    def preload(self, doctor_ids):
+        """
+        Load the windows and appointments of several doctors for the next
+        SEARCH_DAYS days. Each table is read page by page for all of them at
+        once, so the server's max-rows cap cannot cut the load short.
+        """
+        doctor_ids = [d for d in doctor_ids if d not in self._loaded]
+        if not doctor_ids:
+            return
+        today = date.today()
+        days = (today, today + timedelta(days=SEARCH_DAYS))
+        slots = list(self.availability_dao.iter_rows(
+            {"doctor_id": doctor_ids}, AVAILABILITY_COLUMNS, date_from=days[0], date_to=days[1]
+        ))
+        if self.templates is not None:
+            for row in self.templates.expand(doctor_ids, *days):
+                # Template windows have no row yet; key them by template and day
+                slots.append(dict(row, availability_id=("template", row['template_id'], row['available_date'])))
+        appointments = self.appointment_dao.iter_rows(
+            {"doctor_id": doctor_ids}, APPOINTMENT_COLUMNS, date_from=days[0], date_to=days[1]
+        )
+        appointments = [a for a in appointments if a.get('status') != "Cancelled"]
+        with self._lock:
+            fresh = {d for d in doctor_ids if d not in self._loaded}
+            self._loaded.update(dict.fromkeys(fresh, days))
+            for slot in slots:
+                if slot['doctor_id'] in fresh:
+                    self._add_window(slot)
+            for appointment in appointments:
+                if appointment['doctor_id'] in fresh:
+                    self._book(appointment['doctor_id'], appointment['appointment_date'], appointment['appointment_time'])
+
+    def _holds(self, key):
+        first, end = self._loaded[key[0]]
+        return first <= key[1] < end
+
+    def _refresh(self, key):
+        mask = 0
+        booked = self._booked.get(key, {})
+        for start, end, is_available in self._windows.get(key, {}).values():
+            if not is_available or any(start <= minute < end for minute in booked):
+                continue
+            # Only whole units inside the window are bookable
+            first, last = -(-start // self.unit_minutes), end // self.unit_minutes
+            if last > first:
+                mask |= ((1 << (last - first)) - 1) << first
+        if mask:
+            self._free[key] = mask
+            self._days.setdefault(key[0], set()).add(key[1])
+        else:
+            self._free.pop(key, None)
+            self._days.get(key[0], set()).discard(key[1])
+
+    def _add_window(self, row):
+        availability_id = row['availability_id']
+        if availability_id in self._window_day:
+            self._remove_window(availability_id)
+        key = (row['doctor_id'], _as_date(row['available_date']))
+        if not self._holds(key):
+            return
+        if not isinstance(availability_id, tuple):
+            # A concrete row overrides the template windows of its day
+            for other in [i for i in self._windows.get(key, {}) if isinstance(i, tuple)]:
+                del self._windows[key][other]
+                del self._window_day[other]
+        window = (_minutes(row['start_time']), _minutes(row['end_time']), row.get('is_available', True))
+        self._windows.setdefault(key, {})[availability_id] = window
+        self._window_day[availability_id] = key
+        self._refresh(key)
+
+    def _remove_window(self, availability_id):
+        key = self._window_day.pop(availability_id)
+        del self._windows[key][availability_id]
+        self._refresh(key)
+
+    def _book(self, doctor_id, appointment_date, appointment_time, delta=1):
+        key = (doctor_id, _as_date(appointment_date))
+        if not self._holds(key):
+            return
+        minute = _minutes(appointment_time)
+        booked = self._booked.setdefault(key, {})
+        booked[minute] = booked.get(minute, 0) + delta
+        if booked[minute] <= 0:
+            del booked[minute]
+        self._refresh(key)
+
+    # -------- availability changes (same interface as SlotIndex) --------
+    def add(self, row):
+        """Take a new or changed availability window into account."""
+        with self._lock:
+            if row['doctor_id'] in self._loaded:
+                self._add_window(row)
+
+    def update(self, row):
+        """Re-apply an availability row after an update; partial rows only toggle availability."""
+        with self._lock:
+            if row['availability_id'] not in self._window_day:
+                return
+            if {'doctor_id', 'available_date', 'start_time', 'end_time'} <= row.keys():
+                self._add_window(row)
+            elif 'is_available' in row:
+                self.set_available(row['availability_id'], row['is_available'])
+
+    def remove(self, availability_id):
+        """Forget a deleted availability window."""
+        with self._lock:
+            if availability_id in self._window_day:
+                self._remove_window(availability_id)
+
+    def set_available(self, availability_id, is_available):
+        """Open or close a whole availability window."""
+        with self._lock:
+            key = self._window_day.get(availability_id)
+            if key is None:
+                return
+            start, end, _ = self._windows[key][availability_id]
+            self._windows[key][availability_id] = (start, end, is_available)
+            self._refresh(key)
+
+    def forget(self, doctor_id):
+        """Drop a doctor's state; it is reloaded on the next query for that doctor."""
+        with self._lock:
+            for key in [k for k in self._windows if k[0] == doctor_id]:
+                for availability_id in self._windows.pop(key):
+                    del self._window_day[availability_id]
+            for key in [k for k in self._booked if k[0] == doctor_id]:
+                del self._booked[key]
+            for day in self._days.pop(doctor_id, ()):
+                self._free.pop((doctor_id, day), None)
+            self._loaded.pop(doctor_id, None)
+
+    # -------- appointment changes --------
+    def book(self, doctor_id, appointment_date, appointment_time):
+        """Mark the window of a new appointment as taken."""
+        with self._lock:
+            if doctor_id in self._loaded:
+                self._book(doctor_id, appointment_date, appointment_time)
+
+    def cancel(self, doctor_id, appointment_date, appointment_time):
+        """Free the window of a cancelled or deleted appointment."""
+        with self._lock:
+            if doctor_id in self._loaded:
+                self._book(doctor_id, appointment_date, appointment_time, delta=-1)
+
+    # -------- queries --------
+    def iter_free(self, doctor_id, after, units=1, days=SEARCH_DAYS):
+        """
+        Yield, in time order, the datetimes at or after `after` where `units`
+        consecutive free units start, looking at most `days` days ahead.
+        """
+        self._ensure_loaded(doctor_id)
+        if not isinstance(after, datetime):
+            after = datetime.combine(_as_date(after), time())
+        with self._lock:
+            days_with_room = sorted(
+                d for d in self._days.get(doctor_id, ())
+                if after.date() <= d < after.date() + timedelta(days=days)
+            )
+        for day in days_with_room:
+            with self._lock:
+                mask = self._free.get((doctor_id, day), 0)
+            # Keep only the bits that start a run of `units` free bits
+            runs = mask
+            for shift in range(1, units):
+                runs &= mask >> shift
+            if day == after.date():
+                first = -(-(after.hour * 60 + after.minute + (after.second > 0)) // self.unit_minutes)
+                runs &= ~((1 << first) - 1)
+            midnight = datetime.combine(day, time())
+            while runs:
+                low = runs & -runs
+                yield midnight + timedelta(minutes=(low.bit_length() - 1) * self.unit_minutes)
+                runs ^= low
+
+    def next_free(self, doctor_id, after, n=1, days=SEARCH_DAYS):
+        """
+        Return up to n datetimes of free units starting at or after `after`,
+        looking at most `days` days ahead.
+        """
+        return list(islice(self.iter_free(doctor_id, after, days=days), n))
@@ -0,0 +1,185 @@
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, time
+from operator import itemgetter
+import threading
+
+_start = itemgetter(0)
+
+
+def _as_date(value):
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+def _seconds(value):
+    """Seconds since midnight of a time or an HH:MM[:SS] string."""
+    if not isinstance(value, time):
+        value = time.fromisoformat(value)
+    return value.hour * 3600 + value.minute * 60 + value.second
+
+
+def _as_time(seconds):
+    return time(seconds // 3600, seconds // 60 % 60, seconds % 60)
+
+
+class SlotIndex:
+    """
+    In-memory index of availability windows per doctor and day.
+
+    Each day holds its windows as (start, end, availability_id) tuples sorted
+    by start time (in seconds since midnight), so "which slot covers time t"
+    is a bisect instead of a scan over every slot the doctor has. A doctor's
+    rows are loaded from the AvailabilityDAO the first time that doctor is
+    queried and are then kept up to date through add/update/remove.
+    """
+
+    def __init__(self, availability_dao):
+        self.availability_dao = availability_dao
+        self._days = {}       # (doctor_id, date) -> sorted [(start, end, availability_id)]
+        self._slots = {}      # availability_id -> (doctor_id, date, start, end)
+        self._open = set()    # availability_ids with is_available = true
+        self._loaded = set()  # doctor_ids whose rows have been loaded
+        self._longest = {}    # (doctor_id, date) -> longest window seen, in seconds
+        self._lock = threading.RLock()
+
+    def _ensure_loaded(self, doctor_id):
+        if doctor_id in self._loaded:
+            return
+        # Paged so that a doctor with more rows than the server's max-rows is read in full
+        rows = list(self.availability_dao.iter_rows({"doctor_id": doctor_id}))
+        with self._lock:
+            if doctor_id not in self._loaded:
+                for row in rows:
+                    self._add(row)
+                self._loaded.add(doctor_id)
+
+    def _add(self, row):
+        availability_id = row['availability_id']
+        if availability_id in self._slots:
+            self._remove(availability_id)
+        key = (row['doctor_id'], _as_date(row['available_date']))
+        start, end = _seconds(row['start_time']), _seconds(row['end_time'])
+        insort(self._days.setdefault(key, []), (start, end, availability_id), key=_start)
+        self._longest[key] = max(self._longest.get(key, 0), end - start)
+        self._slots[availability_id] = (key[0], key[1], start, end)
+        if row.get('is_available', True):
+            self._open.add(availability_id)
+
+    def _remove(self, availability_id):
+        doctor_id, day, start, end = self._slots.pop(availability_id)
+        self._open.discard(availability_id)
+        entries = self._days[(doctor_id, day)]
+        entries.remove((start, end, availability_id))
+        if not entries:
+            del self._days[(doctor_id, day)]
+            del self._longest[(doctor_id, day)]
+
+    def add(self, row):
+        """Index a new (or changed) availability row."""
+        with self._lock:
+            if row['doctor_id'] in self._loaded:
+                self._add(row)
+
+    def update(self, row):
+        """Re-index an availability row after an update; partial rows only toggle availability."""
+        with self._lock:
+            availability_id = row['availability_id']
+            if availability_id not in self._slots:
+                return
+            if {'doctor_id', 'available_date', 'start_time', 'end_time'} <= row.keys():
+                self._add(row)
+            elif 'is_available' in row:
+                self.set_available(availability_id, row['is_available'])
+
+    def remove(self, availability_id):
+        """Drop a deleted availability slot from the index."""
+        with self._lock:
+            if availability_id in self._slots:
+                self._remove(availability_id)
+
+    def forget(self, doctor_id):
+        """Drop a doctor's slots; they are reloaded on the next query for that doctor."""
+        with self._lock:
+            for availability_id in [i for i, slot in self._slots.items() if slot[0] == doctor_id]:
+                self._remove(availability_id)
+            self._loaded.discard(doctor_id)
+
+    def set_available(self, availability_id, is_available):
+        """Flip the open/taken state of an indexed slot."""
+        with self._lock:
+            if availability_id not in self._slots:
+                return
+            if is_available:
+                self._open.add(availability_id)
+            else:
+                self._open.discard(availability_id)
+
+    def find(self, doctor_id, day, at_time, available_only=True):
+        """
+        Return the availability_id of the slot with start <= at_time < end on
+        that day, or None. O(log n) in the number of slots that day when the
+        windows do not overlap.
+        """
+        self._ensure_loaded(doctor_id)
+        key, at = (doctor_id, _as_date(day)), _seconds(at_time)
+        with self._lock:
+            entries = self._days.get(key)
+            if not entries:
+                return None
+            # Walk back from the last window starting at or before at_time. A
+            # window starting more than the longest window length earlier has
+            # already ended, so only overlapping windows add extra steps.
+            earliest = at - self._longest[key]
+            for i in range(bisect_right(entries, at, key=_start) - 1, -1, -1):
+                start, end, availability_id = entries[i]
+                if start < earliest:
+                    break
+                if at < end and (not available_only or availability_id in self._open):
+                    return availability_id
+            return None
+
+    def overlapping(self, doctor_id, day, start_time, end_time, exclude=None):
+        """
+        Return the availability_ids of the doctor's windows on that day that
+        overlap [start_time, end_time), open or not, leaving out `exclude`.
+        Only windows starting before end_time and less than the longest window
+        length before start_time are looked at.
+        """
+        self._ensure_loaded(doctor_id)
+        key = (doctor_id, _as_date(day))
+        start, end = _seconds(start_time), _seconds(end_time)
+        with self._lock:
+            entries = self._days.get(key)
+            if not entries:
+                return []
+            earliest = start - self._longest[key]
+            found = []
+            for i in range(bisect_left(entries, end, key=_start) - 1, -1, -1):
+                other_start, other_end, availability_id = entries[i]
+                if other_start < earliest:
+                    break
+                if other_end > start and availability_id != exclude:
+                    found.append(availability_id)
+            found.reverse()
+            return found
+
+    def window(self, availability_id):
+        """Return (doctor_id, date, start, end) of an indexed slot, or None if it is not indexed."""
+        with self._lock:
+            slot = self._slots.get(availability_id)
+        if slot is None:
+            return None
+        doctor_id, day, start, end = slot
+        return doctor_id, day, _as_time(start), _as_time(end)
+
+    def slots_on(self, doctor_id, day):
+        """Return the (start, end, availability_id) windows of a doctor on a day, sorted by start."""
+        self._ensure_loaded(doctor_id)
+        with self._lock:
+            return [
+                (_as_time(start), _as_time(end), availability_id)
+                for start, end, availability_id in self._days.get((doctor_id, _as_date(day)), ())
+            ]
+
+    def is_open(self, availability_id):
+        """Whether an indexed slot is currently open for booking."""
+        return availability_id in self._open
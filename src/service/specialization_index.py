@@ -0,0 +1,77 @@
+import threading
+
+
+def _key(specialization):
+    return (specialization or "").strip().lower()
+
+
+class SpecializationIndex:
+    """
+    Cached specialization -> doctor_ids map.
+
+    Built from one projected scan of the doctors table on first use and then
+    kept current by DoctorService through add/update/remove, so finding the
+    doctors of a specialization costs no query.
+    """
+
+    def __init__(self, doctor_dao):
+        self.doctor_dao = doctor_dao
+        self._doctors = None   # specialization key -> set of doctor_ids
+        self._by_id = {}       # doctor_id -> specialization key
+        self._lock = threading.RLock()
+
+    def _ensure_loaded(self):
+        if self._doctors is not None:
+            return
+        rows = list(self.doctor_dao.iter_doctors(columns="doctor_id,specialization"))
+        with self._lock:
+            if self._doctors is None:
+                self._doctors = {}
+                for row in rows:
+                    self._add(row)
+
+    def _add(self, row):
+        self._remove(row['doctor_id'])
+        key = _key(row.get('specialization'))
+        self._doctors.setdefault(key, set()).add(row['doctor_id'])
+        self._by_id[row['doctor_id']] = key
+
+    def _remove(self, doctor_id):
+        key = self._by_id.pop(doctor_id, None)
+        if key is not None:
+            self._doctors[key].discard(doctor_id)
+
+    def doctor_ids(self, specialization):
+        """Return the IDs of the doctors with this specialization (case-insensitive)."""
+        self._ensure_loaded()
+        with self._lock:
+            return sorted(self._doctors.get(_key(specialization), ()))
+
+    def specialization_of(self, doctor_id):
+        """Return the (lower-cased) specialization of a doctor, or None if unknown."""
+        self._ensure_loaded()
+        with self._lock:
+            return self._by_id.get(doctor_id)
+
+    def add(self, row):
+        """Index a new doctor row."""
+        with self._lock:
+            if self._doctors is not None:
+                self._add(row)
+
+    def update(self, row):
+        """Re-index a doctor after an update that returned the full row."""
+        if 'specialization' in row:
+            self.add(row)
+
+    def remove(self, doctor_id):
+        """Drop a deleted doctor."""
+        with self._lock:
+            if self._doctors is not None:
+                self._remove(doctor_id)
+
+    def invalidate(self):
+        """Forget everything; the next lookup reloads the doctors table."""
+        with self._lock:
+            self._doctors = None
+            self._by_id = {}
@@ -0,0 +1,152 @@
+from datetime import datetime, timedelta
+from heapq import heappush, heappop
+from itertools import count
+import threading
+
+WAITLIST_UNIT_MINUTES = 15
+MAX_WINDOW_DAYS = 14
+
+
+class WaitlistError(Exception):
+    pass
+
+
+class WaitlistEntry:
+    __slots__ = ("entry_id", "patient_id", "doctor_id", "specialization", "window_start", "window_end", "target", "active")
+
+    def __init__(self, entry_id, patient_id, doctor_id, specialization, window_start, window_end, target):
+        self.entry_id = entry_id
+        self.patient_id = patient_id
+        self.doctor_id = doctor_id
+        self.specialization = specialization
+        self.window_start = window_start
+        self.window_end = window_end
+        self.target = target
+        self.active = True
+
+    def as_dict(self):
+        return {
+            "entry_id": self.entry_id,
+            "patient_id": self.patient_id,
+            "doctor_id": self.doctor_id,
+            "specialization": self.specialization,
+            "window_start": self.window_start,
+            "window_end": self.window_end,
+        }
+
+
+def _spec_key(specialization):
+    return (specialization or "").strip().lower()
+
+
+class Waitlist:
+    """
+    Patients waiting for a doctor or a specialization within a time window.
+
+    Windows are widened to whole time units, and every entry is pushed onto
+    one heap per (target, date, unit) that its window covers, ordered by
+    registration. A freed slot therefore only looks at the heap of its doctor
+    and the heap of that doctor's specialization for its unit, and pops the
+    first still-active entry: O(log n) per match, no scan of the waitlist. Entries that were matched or withdrawn are skipped
+    lazily when they surface.
+    """
+
+    def __init__(self, unit_minutes=WAITLIST_UNIT_MINUTES):
+        self.unit_minutes = unit_minutes
+        self._entries = {}
+        self._heaps = {}   # (("doctor", id) | ("spec", key), date, unit) -> heap of entry_ids
+        self._popped = {}  # entries handed out by pop_match and not yet settled
+        self._seq = count(1)
+        self._lock = threading.Lock()
+
+    def _unit(self, at):
+        return (at.hour * 60 + at.minute) // self.unit_minutes
+
+    def _push(self, entry):
+        step = timedelta(minutes=self.unit_minutes)
+        at = entry.window_start.replace(minute=0, second=0, microsecond=0) + step * (
+            entry.window_start.minute // self.unit_minutes
+        )
+        while at < entry.window_end:
+            heappush(self._heaps.setdefault((entry.target, at.date(), self._unit(at)), []), entry.entry_id)
+            at += step
+
+    def add(self, patient_id, window_start, window_end, doctor_id=None, specialization=None):
+        """Register a patient; returns the new entry as a dict."""
+        if not patient_id:
+            raise WaitlistError("Patient ID is required.")
+        if not doctor_id and not specialization:
+            raise WaitlistError("Either a doctor ID or a specialization is required.")
+        if not isinstance(window_start, datetime) or not isinstance(window_end, datetime):
+            raise WaitlistError("Window start and end must be datetimes.")
+        if window_start >= window_end:
+            raise WaitlistError("Window start must be before window end.")
+        if window_end - window_start > timedelta(days=MAX_WINDOW_DAYS):
+            raise WaitlistError(f"Window may not be longer than {MAX_WINDOW_DAYS} days.")
+
+        target = ("doctor", doctor_id) if doctor_id else ("spec", _spec_key(specialization))
+        with self._lock:
+            entry = WaitlistEntry(next(self._seq), patient_id, doctor_id, specialization, window_start, window_end, target)
+            self._entries[entry.entry_id] = entry
+            self._push(entry)
+        return entry.as_dict()
+
+    def remove(self, entry_id):
+        """Withdraw an entry. Returns False if it was not waiting."""
+        with self._lock:
+            entry = self._entries.pop(entry_id, None)
+            if entry is None:
+                return False
+            entry.active = False
+            return True
+
+    def _peek(self, bucket):
+        heap = self._heaps.get(bucket)
+        while heap:
+            entry = self._entries.get(heap[0])
+            if entry is not None and entry.active:
+                return entry
+            heappop(heap)
+        if heap is not None:
+            del self._heaps[bucket]
+        return None
+
+    def pop_match(self, doctor_id, specialization, at):
+        """
+        Take the longest-waiting active entry that wants this doctor (or its
+        specialization) at datetime `at`, or None. The entry leaves the list.
+        """
+        unit = self._unit(at)
+        with self._lock:
+            candidates = [self._peek((("doctor", doctor_id), at.date(), unit))]
+            if specialization:
+                candidates.append(self._peek((("spec", _spec_key(specialization)), at.date(), unit)))
+            candidates = [c for c in candidates if c is not None]
+            if not candidates:
+                return None
+            entry = min(candidates, key=lambda e: e.entry_id)
+            entry.active = False
+            del self._entries[entry.entry_id]
+            self._popped[entry.entry_id] = entry
+            return entry.as_dict()
+
+    def restore(self, entry_id):
+        """Put a popped entry back in its original place, e.g. when booking it failed."""
+        with self._lock:
+            entry = self._popped.pop(entry_id, None)
+            if entry is None:
+                return
+            entry.active = True
+            self._entries[entry_id] = entry
+            # Its heap items may have been discarded while it was out
+            self._push(entry)
+
+    def done(self, entry_id):
+        """Forget a popped entry whose booking went through."""
+        with self._lock:
+            self._popped.pop(entry_id, None)
+
+    def entries(self):
+        """All waiting entries, oldest first."""
+        with self._lock:
+            return [e.as_dict() for e in sorted(self._entries.values(), key=lambda e: e.entry_id)]
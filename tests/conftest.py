@@ -0,0 +1,182 @@
+import os
+import sys
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src")))
+
+# PostgREST's default db-max-rows: no select returns more rows than this
+MAX_ROWS = 1000
+
+PRIMARY_KEYS = {
+    "patients1": "patient_id",
+    "doctors1": "doctor_id",
+    "availabilityofdoctors1": "availability_id",
+    "appointments1": "appointment_id",
+    "payments1": "payment_id",
+    "medical_records1": "record_id",
+    "availability_templates1": "template_id",
+}
+
+
+class FakeQuery:
+    """The subset of the postgrest query builder the DAOs use, run against FakeClient's tables."""
+
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.operation = "select"
+        self.columns = "*"
+        self.count = None
+        self.payload = None
+        self.filters = []
+        self.ordering = []
+        self.max_rows = None
+        self.offsets = None
+
+    def select(self, columns="*", count=None):
+        self.operation, self.columns, self.count = "select", columns, count
+        return self
+
+    def insert(self, payload):
+        self.operation, self.payload = "insert", payload
+        return self
+
+    def update(self, payload):
+        self.operation, self.payload = "update", payload
+        return self
+
+    def delete(self):
+        self.operation = "delete"
+        return self
+
+    def _where(self, test):
+        self.filters.append(test)
+        return self
+
+    def eq(self, column, value):
+        return self._where(lambda row: row.get(column) == value)
+
+    def neq(self, column, value):
+        return self._where(lambda row: row.get(column) != value)
+
+    def gt(self, column, value):
+        return self._where(lambda row: row.get(column) is not None and row[column] > value)
+
+    def gte(self, column, value):
+        return self._where(lambda row: row.get(column) is not None and row[column] >= value)
+
+    def lt(self, column, value):
+        return self._where(lambda row: row.get(column) is not None and row[column] < value)
+
+    def lte(self, column, value):
+        return self._where(lambda row: row.get(column) is not None and row[column] <= value)
+
+    def in_(self, column, values):
+        values = set(values)
+        return self._where(lambda row: row.get(column) in values)
+
+    def ilike(self, column, pattern):
+        needle = pattern.strip("%").lower()
+        return self._where(lambda row: needle in str(row.get(column, "")).lower())
+
+    def order(self, column, desc=False):
+        self.ordering.append((column, desc))
+        return self
+
+    def limit(self, size):
+        self.max_rows = size
+        return self
+
+    def range(self, start, end):
+        self.offsets = (start, end)
+        return self
+
+    def execute(self):
+        return self.client.run(self)
+
+
+class FakeClient:
+    """
+    In-memory stand-in for the supabase client. Selects are capped at
+    max_rows like PostgREST's, and every request is counted in `requests`.
+    """
+
+    def __init__(self, max_rows=MAX_ROWS):
+        self.max_rows = max_rows
+        self.tables = {}
+        self.requests = 0
+        self._ids = {}
+        self._lock = threading.Lock()
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+    def rows(self, table):
+        return self.tables.setdefault(table, [])
+
+    def seed(self, table, rows):
+        """Insert rows directly, assigning primary keys where they are missing."""
+        return [self._insert(table, row) for row in rows]
+
+    def _insert(self, table, row):
+        key = PRIMARY_KEYS[table]
+        row = dict(row)
+        if row.get(key) is None:
+            row[key] = self._ids[table] = self._ids.get(table, 0) + 1
+        else:
+            self._ids[table] = max(self._ids.get(table, 0), row[key])
+        self.rows(table).append(row)
+        return dict(row)
+
+    def run(self, query):
+        with self._lock:
+            self.requests += 1
+            rows = self.rows(query.table)
+            if query.operation == "insert":
+                payload = query.payload if isinstance(query.payload, list) else [query.payload]
+                return SimpleNamespace(data=[self._insert(query.table, row) for row in payload], count=None)
+            matched = [row for row in rows if all(test(row) for test in query.filters)]
+            if query.operation == "update":
+                for row in matched:
+                    row.update(query.payload)
+                return SimpleNamespace(data=[dict(row) for row in matched], count=None)
+            if query.operation == "delete":
+                self.tables[query.table] = [row for row in rows if row not in matched]
+                return SimpleNamespace(data=[dict(row) for row in matched], count=None)
+            total = len(matched)
+            for column, desc in reversed(query.ordering):
+                matched.sort(key=lambda row: row.get(column), reverse=desc)
+            if query.offsets is not None:
+                matched = matched[query.offsets[0]:query.offsets[1] + 1]
+            if query.max_rows is not None:
+                matched = matched[:query.max_rows]
+            matched = matched[:self.max_rows]
+            if query.columns != "*":
+                names = [c.strip() for c in query.columns.split(",")]
+                matched = [{c: row.get(c) for c in names} for row in matched]
+            return SimpleNamespace(data=[dict(row) for row in matched], count=total if query.count else None)
+
+
+class AsyncFakeQuery(FakeQuery):
+    async def execute(self):
+        return self.client.run(self)
+
+
+class AsyncFakeClient(FakeClient):
+    """FakeClient for the async DAOs: execute() is a coroutine."""
+
+    def table(self, name):
+        return AsyncFakeQuery(self, name)
+
+
+@pytest.fixture
+def client():
+    return FakeClient()
+
+
+@pytest.fixture
+def async_client():
+    return AsyncFakeClient()
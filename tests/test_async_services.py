@@ -0,0 +1,137 @@
+import asyncio
+
+import pytest
+
+from dao.appointment_dao import AsyncAppointmentDAO
+from dao.availability_dao import AsyncAvailabilityDAO
+from dao.medical_record_dao import AsyncMedicalRecordDAO
+from dao.patient_dao import AsyncPatientDAO
+from dao.payment_dao import AsyncPaymentDAO
+from service.appointment_service import AsyncAppointmentService
+from service.availability_service import AsyncAvailabilityService
+from service.medical_record_service import AsyncMedicalRecordService
+from service.patient_service import AsyncPatientService
+from service.payment_service import AsyncPaymentService
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+@pytest.fixture
+def seeded(async_client):
+    async_client.seed("patients1", [{"full_name": "Ann"}, {"full_name": "Bob"}])
+    async_client.seed("doctors1", [{"full_name": "Dr Cole", "specialization": "Cardiology"}])
+    async_client.seed("availabilityofdoctors1", [
+        {"doctor_id": 1, "available_date": "2026-11-02", "start_time": "09:00:00", "end_time": "10:00:00",
+         "is_available": False},
+        {"doctor_id": 1, "available_date": "2026-11-02", "start_time": "10:00:00", "end_time": "11:00:00",
+         "is_available": True},
+        {"doctor_id": 1, "available_date": "2026-11-03", "start_time": "09:00:00", "end_time": "10:00:00",
+         "is_available": True},
+    ])
+    async_client.seed("appointments1", [{"patient_id": 1, "doctor_id": 1, "appointment_date": "2026-11-02",
+                                         "appointment_time": "09:00", "status": "Scheduled"}])
+    async_client.seed("medical_records1", [{"patient_id": 1, "doctor_id": 1, "appointment_id": 1,
+                                            "diagnosis": "Flu", "prescription": "Rest"}])
+    async_client.seed("payments1", [{"appointment_id": 1, "patient_id": 1, "amount": 50,
+                                     "payment_status": "Paid"}])
+    return async_client
+
+
+def test_services_default_their_lookup_daos_to_the_async_client(seeded):
+    appointments = AsyncAppointmentService(AsyncAppointmentDAO(seeded), AsyncAvailabilityDAO(seeded))
+    detailed = run(appointments.list_appointments_detailed())
+    assert (detailed[0]["patient_name"], detailed[0]["doctor_name"]) == ("Ann", "Dr Cole")
+
+    timeline = run(AsyncPatientService(AsyncPatientDAO(seeded)).timeline(1))
+    assert [entry["kind"] for entry in timeline] == ["appointment", "medical_record", "payment"]
+
+    payments = run(AsyncPaymentService(AsyncPaymentDAO(seeded)).list_payments_detailed())
+    assert payments[0]["patient_name"] == "Ann"
+    records = run(AsyncMedicalRecordService(AsyncMedicalRecordDAO(seeded)).list_medical_records_detailed())
+    assert records[0]["doctor_name"] == "Dr Cole"
+
+
+def test_appointment_add_many_claims_slots(seeded):
+    service = AsyncAppointmentService(AsyncAppointmentDAO(seeded), AsyncAvailabilityDAO(seeded))
+
+    result = run(service.add_many([
+        {"patient_id": 2, "doctor_id": 1, "appointment_date": "2026-11-02", "appointment_time": "10:30"},
+        {"patient_id": 1, "doctor_id": 1, "appointment_date": "2026-11-02", "appointment_time": "10:15"},
+        {"patient_id": 1, "doctor_id": 1, "appointment_date": "2026-11-03", "appointment_time": "09:00"},
+        {"patient_id": 1, "doctor_id": 1, "appointment_date": "not a date", "appointment_time": "09:00"},
+    ]))
+
+    assert [f["index"] for f in result["failed"]] == [1, 3]
+    assert "No available slot" in result["failed"][0]["error"]
+    assert len(result["succeeded"]) == 2
+    assert [slot["is_available"] for slot in seeded.rows("availabilityofdoctors1")] == [False, False, False]
+
+
+def test_availability_bulk_writes_check_overlaps(seeded):
+    service = AsyncAvailabilityService(AsyncAvailabilityDAO(seeded))
+
+    added = run(service.add_many([
+        {"doctor_id": 1, "available_date": "2026-11-02", "start_time": "10:30", "end_time": "11:30"},
+        {"doctor_id": 1, "available_date": "2026-11-02", "start_time": "11:00", "end_time": "12:00"},
+        {"doctor_id": 1, "available_date": "2026-11-04", "start_time": "09:00", "end_time": "10:00"},
+        {"doctor_id": 1, "available_date": "2026-11-04", "start_time": "09:30", "end_time": "10:30"},
+    ]))
+    assert [f["index"] for f in added["failed"]] == [0, 3]
+    assert "slot(s) 2 " in added["failed"][0]["error"]
+    assert "in this batch" in added["failed"][1]["error"]
+
+    updated = run(service.update_many([
+        {"availability_id": 3, "available_date": "2026-11-02", "start_time": "10:30", "end_time": "11:30"},
+        {"availability_id": 1, "start_time": "08:00"},
+    ]))
+    assert [f["index"] for f in updated["failed"]] == [0]
+    assert "slot(s) 2, 4 " in updated["failed"][0]["error"]
+    assert updated["succeeded"][0]["start_time"] == "08:00"
+
+
+def test_availability_update_rejects_overlap_and_unknown_slot(seeded):
+    service = AsyncAvailabilityService(AsyncAvailabilityDAO(seeded))
+    with pytest.raises(Exception, match="slot\\(s\\) 1 "):
+        run(service.update_availability(2, start_time="09:30"))
+    with pytest.raises(Exception, match="not found"):
+        run(service.update_availability(99, start_time="09:30"))
+
+
+def test_failed_delete_takes_the_slot_back(seeded, monkeypatch):
+    dao = AsyncAppointmentDAO(seeded)
+    service = AsyncAppointmentService(dao, AsyncAvailabilityDAO(seeded))
+
+    async def unreachable(*args):
+        raise ConnectionError("backend unreachable")
+
+    monkeypatch.setattr(dao, "delete_appointment", unreachable)
+    with pytest.raises(ConnectionError):
+        run(service.delete_appointment(1))
+
+    assert len(seeded.rows("appointments1")) == 1
+    assert not seeded.rows("availabilityofdoctors1")[0]["is_available"]
+
+    monkeypatch.undo()
+    run(service.delete_appointment(1))
+    assert not seeded.rows("appointments1")
+    assert seeded.rows("availabilityofdoctors1")[0]["is_available"]
+
+
+def test_add_many_falls_back_to_single_rows_when_a_chunk_is_rejected(seeded, monkeypatch):
+    run_query = seeded.run
+
+    def reject_bad_rows(query):
+        payload = query.payload if isinstance(query.payload, list) else [query.payload]
+        if query.operation == "insert" and any(row.get("full_name") == "bad" for row in payload):
+            raise ValueError("rejected by the backend")
+        return run_query(query)
+
+    monkeypatch.setattr(seeded, "run", reject_bad_rows)
+    rows = [{"full_name": "Cy"}, {"full_name": "bad"}, {"full_name": "Di"}]
+    result = run(AsyncPatientDAO(seeded).add_many(rows, chunk_size=2))
+
+    assert [row["full_name"] for row in result["succeeded"]] == ["Cy", "Di"]
+    assert [(f["index"], f["error"]) for f in result["failed"]] == [(1, "rejected by the backend")]
+    assert [row["full_name"] for row in seeded.rows("patients1")] == ["Ann", "Bob", "Cy", "Di"]
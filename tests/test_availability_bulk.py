@@ -0,0 +1,64 @@
+import pytest
+
+from dao.availability_dao import AvailabilityDAO
+from service.availability_service import AvailabilityService
+from service.slot_index import SlotIndex
+
+
+def slot(doctor_id, day, start, end):
+    return {"doctor_id": doctor_id, "available_date": day, "start_time": start, "end_time": end}
+
+
+@pytest.fixture(params=["server", "slot index"])
+def service(request, client):
+    dao = AvailabilityDAO(client)
+    return AvailabilityService(dao, slot_index=SlotIndex(dao) if request.param == "slot index" else None)
+
+
+def test_add_many_checks_stored_and_batch_windows(client, service):
+    client.seed("availabilityofdoctors1", [dict(slot(1, "2026-11-02", "09:00:00", "10:00:00"), is_available=True)])
+
+    result = service.add_many([
+        slot(1, "2026-11-02", "09:30", "10:30"),   # overlaps the stored window
+        slot(1, "2026-11-02", "10:00", "11:00"),
+        slot(1, "2026-11-02", "10:30", "11:30"),   # overlaps the row above
+        slot(2, "2026-11-02", "09:30", "10:30"),
+        slot(1, "2026-11-03", "09:30", "10:30"),
+    ])
+
+    assert [f["index"] for f in result["failed"]] == [0, 2]
+    assert "slot(s) 1 " in result["failed"][0]["error"]
+    assert "in this batch" in result["failed"][1]["error"]
+    assert len(result["succeeded"]) == 3
+
+
+def test_add_many_reads_stored_windows_once(client):
+    service = AvailabilityService(AvailabilityDAO(client))
+    rows = [slot(doctor_id, f"2026-11-{day:02d}", "09:00", "10:00") for doctor_id in range(1, 6) for day in range(1, 21)]
+
+    client.requests = 0
+    result = service.add_many(rows)
+
+    assert not result["failed"]
+    # One read of the stored windows, one insert
+    assert client.requests == 2
+
+
+def test_update_many_checks_moves_against_each_other(client, service):
+    client.seed("availabilityofdoctors1", [
+        dict(slot(1, "2026-11-02", "09:00:00", "10:00:00"), is_available=True),
+        dict(slot(1, "2026-11-02", "11:00:00", "12:00:00"), is_available=True),
+        dict(slot(1, "2026-11-03", "09:00:00", "10:00:00"), is_available=True),
+    ])
+
+    result = service.update_many([
+        {"availability_id": 3, "available_date": "2026-11-02", "start_time": "10:00", "end_time": "11:00"},
+        {"availability_id": 1, "start_time": "09:30", "end_time": "10:30"},   # onto slot 3's new place
+        {"availability_id": 2, "available_date": "2026-11-03"},              # into the day slot 3 left
+        {"availability_id": 99, "start_time": "08:00"},
+    ])
+
+    assert [f["index"] for f in result["failed"]] == [1, 3]
+    assert "slot(s) 3 " in result["failed"][0]["error"]
+    assert "not found" in result["failed"][1]["error"]
+    assert sorted(row["availability_id"] for row in result["succeeded"]) == [2, 3]
@@ -0,0 +1,52 @@
+from datetime import date, timedelta
+
+from conftest import MAX_ROWS
+from dao.appointment_dao import AppointmentDAO
+from dao.availability_dao import AvailabilityDAO
+from dao.availability_template_dao import AvailabilityTemplateDAO
+from service.appointment_service import AppointmentService
+from service.availability_templates import AvailabilityTemplates
+
+
+def test_expand_skips_overridden_days_past_the_max_rows_cap(client):
+    monday = date.today() + timedelta(days=7 - date.today().weekday())
+    client.seed("availability_templates1", [{
+        "doctor_id": 1, "weekday": 0, "start_time": "09:00:00", "end_time": "12:00:00",
+        "effective_from": monday.isoformat(), "effective_to": (monday + timedelta(days=28)).isoformat(),
+    }])
+    # Fill the cap with concrete rows first, then override the first two Mondays
+    client.seed("availabilityofdoctors1", [
+        {"doctor_id": 1, "available_date": (monday + timedelta(days=1)).isoformat(),
+         "start_time": "09:00:00", "end_time": "09:15:00", "is_available": True}
+        for _ in range(MAX_ROWS)
+    ] + [
+        {"doctor_id": 1, "available_date": (monday + timedelta(days=7 * week)).isoformat(),
+         "start_time": "14:00:00", "end_time": "15:00:00", "is_available": True}
+        for week in range(2)
+    ])
+    templates = AvailabilityTemplates(AvailabilityTemplateDAO(client), AvailabilityDAO(client))
+
+    days = [row["available_date"] for row in templates.expand(1)]
+
+    assert days == [(monday + timedelta(days=7 * week)).isoformat() for week in (2, 3)]
+
+
+def test_add_many_books_days_that_only_exist_as_templates(client):
+    monday = date.today() + timedelta(days=7 - date.today().weekday())
+    client.seed("availability_templates1", [{
+        "doctor_id": 1, "weekday": 0, "start_time": start, "end_time": end, "effective_from": monday.isoformat(),
+    } for start, end in (("09:00:00", "09:30:00"), ("09:30:00", "10:00:00"))])
+    availability_dao = AvailabilityDAO(client)
+    service = AppointmentService(AppointmentDAO(client), availability_dao,
+                                 templates=AvailabilityTemplates(AvailabilityTemplateDAO(client), availability_dao))
+
+    result = service.add_many([
+        {"patient_id": patient_id, "doctor_id": 1, "appointment_date": monday.isoformat(), "appointment_time": at}
+        for patient_id, at in ((1, "09:00"), (2, "09:45"), (3, "09:15"))
+    ])
+
+    assert [f["index"] for f in result["failed"]] == [2]
+    assert [row["patient_id"] for row in result["succeeded"]] == [1, 2]
+    assert [(row["start_time"], row["is_available"]) for row in client.rows("availabilityofdoctors1")] == [
+        ("09:00:00", False), ("09:30:00", False)
+    ]
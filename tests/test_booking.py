@@ -0,0 +1,52 @@
+import threading
+import time as clock
+
+from dao.appointment_dao import AppointmentDAO
+from dao.availability_dao import AvailabilityDAO
+from service.appointment_service import AppointmentError, AppointmentService
+
+SLOTS = 20
+THREADS = 16
+
+
+def test_concurrent_bookings_never_double_book(client):
+    client.seed("availabilityofdoctors1", [
+        {"doctor_id": 1, "available_date": "2026-11-02", "start_time": f"{8 + i // 4:02d}:{i % 4 * 15:02d}:00",
+         "end_time": f"{8 + (i + 1) // 4:02d}:{(i + 1) % 4 * 15:02d}:00", "is_available": True}
+        for i in range(SLOTS)
+    ])
+    times = [row["start_time"][:5] for row in client.rows("availabilityofdoctors1")]
+    run = client.run
+
+    def slow(query):
+        # Give other threads a chance to run between the lookup and the claim
+        clock.sleep(0.001)
+        return run(query)
+
+    client.run = slow
+    service = AppointmentService(AppointmentDAO(client), AvailabilityDAO(client))
+    booked, rejected = [], []
+    start = threading.Barrier(THREADS)
+
+    def receptionist(patient_id):
+        start.wait()
+        for at in times:
+            try:
+                booked.append(service.add_appointment(patient_id, 1, "2026-11-02", at))
+            except AppointmentError:
+                rejected.append(at)
+
+    threads = [threading.Thread(target=receptionist, args=(n + 1,)) for n in range(THREADS)]
+    began = clock.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = clock.perf_counter() - began
+
+    stored = client.rows("appointments1")
+    assert len(booked) == len(stored) == SLOTS
+    assert sorted(row["appointment_time"] for row in stored) == sorted(times)
+    assert len(rejected) == SLOTS * (THREADS - 1)
+    assert not any(row["is_available"] for row in client.rows("availabilityofdoctors1"))
+    print(f"{THREADS} threads, {SLOTS} slots: {len(booked) / elapsed:.0f} bookings/sec")
@@ -0,0 +1,27 @@
+from conftest import MAX_ROWS
+from dao.cached_dao import RowCache
+from dao.doctor_dao import CachedDoctorDAO
+
+
+def doctors(count):
+    return [{"full_name": f"Dr {i}", "specialization": "Cardiology"} for i in range(count)]
+
+
+def test_list_loads_tables_past_the_max_rows_cap(client):
+    client.seed("doctors1", doctors(MAX_ROWS + 500))
+    dao = CachedDoctorDAO(client, RowCache(max_entries=5000, ttl=60))
+
+    assert len(dao.list_doctors()) == MAX_ROWS + 500
+    client.requests = 0
+    assert [row["doctor_id"] for row in dao.list_doctors()] == list(range(1, MAX_ROWS + 501))
+    assert client.requests == 0
+
+
+def test_list_is_not_cached_when_the_table_does_not_fit(client):
+    client.seed("doctors1", doctors(MAX_ROWS + 1))
+    dao = CachedDoctorDAO(client, RowCache(max_entries=MAX_ROWS, ttl=60))
+
+    dao.list_doctors()
+
+    assert dao.cache.all_rows() is None
+    assert not dao.cache.may_hold_all()
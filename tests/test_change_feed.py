@@ -0,0 +1,38 @@
+from dao.appointment_dao import AppointmentDAO
+from service.change_feed import ChangeFeed
+
+T1 = "2026-10-18T09:00:00+00:00"
+T2 = "2026-10-18T09:00:01+00:00"
+
+
+def appointment(appointment_id, updated_at):
+    return {"appointment_id": appointment_id, "patient_id": 1, "doctor_id": 1, "appointment_date": "2026-11-02",
+            "appointment_time": "09:00", "status": "Scheduled", "updated_at": updated_at}
+
+
+def test_changed_since_pages_through_equal_timestamps(client):
+    # Three pages' worth of rows share one timestamp; IDs are out of order in storage
+    ids = list(range(1, 26))
+    client.seed("appointments1", [appointment(i, T2 if i % 5 == 0 else T1) for i in reversed(ids)])
+
+    rows = list(AppointmentDAO(client).iter_changed_since(T1, page_size=7))
+
+    assert [(row["updated_at"], row["appointment_id"]) for row in rows] == sorted(
+        (T2 if i % 5 == 0 else T1, i) for i in ids
+    )
+
+
+def test_feed_applies_updates_and_deletes(client):
+    client.seed("appointments1", [appointment(i, T1) for i in range(1, 4)])
+    feed = ChangeFeed(AppointmentDAO(client))
+    assert len(feed) == 3
+
+    client.rows("appointments1")[0].update(status="Completed", updated_at=T2)
+    client.tables["appointments1"] = client.rows("appointments1")[:2]
+    client.rows("appointments1_deleted").append({"appointment_id": 3, "deleted_at": T2})
+
+    changes = feed.poll()
+
+    assert [row["appointment_id"] for row in changes["upserted"]] == [1]
+    assert changes["deleted"] == [3]
+    assert feed.get(1)["status"] == "Completed"
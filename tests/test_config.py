@@ -0,0 +1,56 @@
+import httpx
+
+import config
+from dao.instrumentation import METRICS, count_response_bytes, instrumented
+
+
+def test_shared_client_uses_one_bounded_keepalive_pool(monkeypatch):
+    built = []
+
+    class RecordingClient(httpx.Client):
+        def __init__(self, **kwargs):
+            built.append(kwargs)
+            super().__init__(**kwargs)
+
+    monkeypatch.setattr(httpx, "Client", RecordingClient)
+    monkeypatch.setattr(config, "SUPABASE_URL", "http://localhost:54321")
+    monkeypatch.setattr(config, "SUPABASE_KEY", "test-key")
+    monkeypatch.setattr(config, "SUPABASE_MAX_CONNECTIONS", 7)
+    monkeypatch.setattr(config, "SUPABASE_MAX_KEEPALIVE", 3)
+
+    client = config._create_client()
+
+    (kwargs,) = [k for k in built if "limits" in k]
+    limits = kwargs["limits"]
+    assert (limits.max_connections, limits.max_keepalive_connections) == (7, 3)
+    assert limits.keepalive_expiry == config.SUPABASE_KEEPALIVE_EXPIRY
+    assert kwargs["event_hooks"]["response"] == [count_response_bytes]
+    assert isinstance(client.postgrest.session, RecordingClient)
+
+
+class Probe:
+    table_name = "probe"
+
+    def __init__(self, http):
+        self.http = http
+
+    @instrumented
+    def fetch(self):
+        return self.http.get("http://backend/rows").json()
+
+
+def test_response_bytes_are_counted_for_the_dao_call(monkeypatch):
+    body = b'[{"patient_id": 1, "full_name": "Ann"}]'
+    http = httpx.Client(transport=httpx.MockTransport(lambda request: httpx.Response(200, content=body)),
+                        event_hooks={"response": [count_response_bytes]})
+    monkeypatch.setattr(config, "DAO_METRICS", True)
+    METRICS.reset()
+    try:
+        Probe(http).fetch()
+        Probe(http).fetch()
+        http.get("http://backend/rows")  # outside a DAO call: not counted
+
+        (series,) = [s for s in METRICS.snapshot() if s["table"] == "probe"]
+        assert (series["calls"], series["bytes"]) == (2, 2 * len(body))
+    finally:
+        METRICS.reset()
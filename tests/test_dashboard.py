@@ -0,0 +1,109 @@
+import os
+
+import pytest
+import streamlit as st
+import supabase
+from streamlit.testing.v1 import AppTest
+
+APP = os.path.join(os.path.dirname(__file__), "..", "app.py")
+
+
+@pytest.fixture
+def dashboard(client, monkeypatch):
+    """The dashboard page of app.py, logged in, talking to the in-memory client."""
+    monkeypatch.setattr(supabase, "create_client", lambda url, key: client)
+    # Cached connections and reads outlive a script run; start every test clean
+    st.cache_resource.clear()
+    st.cache_data.clear()
+    app = AppTest.from_file(APP, default_timeout=30)
+    app.secrets["supabase"] = {"url": "http://localhost", "key": "test"}
+    app.session_state["page"] = "dashboard"
+    return app
+
+
+def seed_appointments(client, count):
+    client.seed("patients1", [{"full_name": f"Patient {i}"} for i in range(1, 11)])
+    client.seed("doctors1", [{"full_name": f"Dr {i}", "specialization": "Cardiology"} for i in range(1, 4)])
+    client.seed("appointments1", [
+        {"patient_id": i % 10 + 1, "doctor_id": i % 3 + 1, "appointment_date": "2026-11-02",
+         "appointment_time": f"{8 + i % 10:02d}:00", "status": "Scheduled"}
+        for i in range(count)
+    ])
+
+
+def shown(app):
+    return app.dataframe[0].value
+
+
+def test_table_view_pages_through_the_table(client, dashboard):
+    seed_appointments(client, 120)
+    dashboard.run()
+    dashboard.selectbox[0].select("⏰ Appointments").run()
+
+    first = shown(dashboard)
+    assert list(first["appointment_id"]) == list(range(1, 26))
+    assert "Page 1 of 5 · about 120 records" in dashboard.caption[0].value
+
+    dashboard.number_input[0].set_value(5).run()
+
+    last = shown(dashboard)
+    assert list(last["appointment_id"]) == list(range(101, 121))
+    assert not dashboard.error
+
+
+def test_table_view_sorts_and_names_the_page(client, dashboard):
+    seed_appointments(client, 60)
+    dashboard.run()
+    dashboard.selectbox[0].select("⏰ Appointments").run()
+    dashboard.selectbox(key="sort_appointments1").select("patient_id").run()
+    dashboard.radio(key="order_appointments1").set_value("Descending").run()
+
+    page = shown(dashboard)
+    assert list(page["patient_id"]) == sorted(page["patient_id"], reverse=True)
+    assert (page["patient_name"] == page["patient_id"].map(lambda i: f"Patient {i}")).all()
+    assert (page["doctor_name"] == page["doctor_id"].map(lambda i: f"Dr {i}")).all()
+
+
+def test_names_are_fetched_for_the_page_only(client, dashboard):
+    seed_appointments(client, 30)
+    # Many more patients than appear on the first page
+    client.seed("patients1", [{"full_name": f"Other {i}"} for i in range(5000)])
+    dashboard.run()
+
+    lookups = []
+    run = client.run
+
+    def recording(query):
+        if query.table == "patients1":
+            lookups.append(query)
+        return run(query)
+
+    client.run = recording
+    dashboard.selectbox[0].select("⏰ Appointments").run()
+
+    assert shown(dashboard)["patient_name"].notna().all()
+    assert len(lookups) == 1
+
+
+def test_name_search_fetches_the_matches_once(client, dashboard):
+    client.seed("patients1", [{"full_name": name} for name in ("Ann Lee", "Anna Park", "Bob Stone")])
+    dashboard.run()
+    dashboard.radio[0].set_value("Search Records").run()
+    dashboard.selectbox[1].select("full_name").run()
+
+    lookups = []
+    run = client.run
+
+    def recording(query):
+        if query.table == "patients1" and query.operation == "select":
+            lookups.append(query)
+        return run(query)
+
+    client.run = recording
+    dashboard.text_input[0].input("Ann").run()
+    assert set(shown(dashboard)["full_name"]) >= {"Ann Lee", "Anna Park"}
+    assert not dashboard.error
+    fetched = len(lookups)
+
+    dashboard.run()
+    assert len(lookups) == fetched
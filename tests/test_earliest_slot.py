@@ -0,0 +1,61 @@
+from datetime import date, datetime, time, timedelta
+
+from conftest import MAX_ROWS
+from dao.appointment_dao import AppointmentDAO
+from dao.availability_dao import AvailabilityDAO
+from dao.doctor_dao import DoctorDAO
+from service.appointment_service import AppointmentService
+from service.slot_bitmap import SEARCH_DAYS, SlotBitmap
+from service.specialization_index import SpecializationIndex
+
+
+def make_service(client):
+    availability_dao = AvailabilityDAO(client)
+    appointment_dao = AppointmentDAO(client)
+    return AppointmentService(
+        appointment_dao, availability_dao,
+        slot_bitmap=SlotBitmap(availability_dao, appointment_dao),
+        specialization_index=SpecializationIndex(DoctorDAO(client)),
+    )
+
+
+def window(doctor_id, day, start, end, **extra):
+    return {"doctor_id": doctor_id, "available_date": day.isoformat(),
+            "start_time": start.strftime("%H:%M:%S"), "end_time": end.strftime("%H:%M:%S"),
+            "is_available": True, **extra}
+
+
+def test_find_earliest_reads_past_the_max_rows_cap(client):
+    # More windows and bookings than one select returns; only the last window is free
+    client.seed("doctors1", [{"doctor_id": 1, "full_name": "Dr A", "specialization": "Cardiology"}])
+    tomorrow = date.today() + timedelta(days=1)
+    starts = [datetime.combine(tomorrow + timedelta(days=i // 16), time(8)) + timedelta(minutes=15 * (i % 16))
+              for i in range(MAX_ROWS + 100)]
+    client.seed("availabilityofdoctors1", [
+        window(1, start.date(), start.time(), (start + timedelta(minutes=15)).time()) for start in starts
+    ])
+    client.seed("appointments1", [
+        {"patient_id": 1, "doctor_id": 1, "appointment_date": start.date().isoformat(),
+         "appointment_time": start.strftime("%H:%M"), "status": "Scheduled"}
+        for start in starts[:-1]
+    ])
+
+    found = make_service(client).find_earliest("cardiology", datetime.combine(tomorrow, time()))
+
+    assert found == [{"doctor_id": 1, "start": starts[-1]}]
+
+
+def test_find_earliest_only_loads_the_search_window(client):
+    client.seed("doctors1", [{"doctor_id": 1, "full_name": "Dr A", "specialization": "Cardiology"}])
+    today = date.today()
+    client.seed("availabilityofdoctors1", [
+        window(1, today - timedelta(days=3), time(9), time(10)),
+        window(1, today + timedelta(days=SEARCH_DAYS + 1), time(9), time(10)),
+    ])
+    service = make_service(client)
+
+    assert service.find_earliest("Cardiology", datetime.combine(today - timedelta(days=5), time())) == []
+    # A window added later outside the loaded days is not picked up either
+    service.slot_bitmap.add(dict(window(1, today + timedelta(days=SEARCH_DAYS + 2), time(9), time(10)),
+                                 availability_id=99))
+    assert service.find_earliest("Cardiology", datetime.combine(today + timedelta(days=SEARCH_DAYS), time())) == []
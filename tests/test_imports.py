@@ -0,0 +1,16 @@
+import os
+import subprocess
+import sys
+
+SRC = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src"))
+
+# Loaded on first query / first audit / first search, never at startup
+HEAVY = ("supabase", "postgrest", "httpx", "pandas", "numpy")
+
+
+def test_importing_the_cli_does_not_load_the_client_or_the_audit_libraries():
+    loaded = subprocess.run(
+        [sys.executable, "-c", f"import sys, cli.main; print(*[m for m in {HEAVY!r} if m in sys.modules])"],
+        cwd=SRC, capture_output=True, text=True, check=True,
+    ).stdout.split()
+    assert loaded == []
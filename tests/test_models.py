@@ -0,0 +1,12 @@
+import pytest
+
+from dao.models import Appointment
+
+
+def test_rows_compare_by_value_and_are_not_hashable():
+    row = {"appointment_id": 1, "patient_id": 2, "doctor_id": 3, "appointment_date": "2026-11-02",
+           "appointment_time": "09:00:00", "status": "Scheduled"}
+    assert Appointment.from_row(row) == Appointment.from_row(dict(row))
+    assert Appointment.from_row(row) != Appointment.from_row(dict(row, status="Cancelled"))
+    with pytest.raises(TypeError):
+        {Appointment.from_row(row)}
@@ -0,0 +1,142 @@
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from postgrest import APIResponse
+
+from dao.single_flight import AsyncSingleFlight, SingleFlight
+
+CALLERS = 32
+DOCTORS = "doctors1?select=*"
+
+
+def request(method="GET", table="doctors1"):
+    return SimpleNamespace(http_method=method, path=f"/rest/v1/{table}", params="select=*", headers={})
+
+
+class Backend:
+    """Counts requests; reads block until released so callers pile up behind the first."""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = threading.Event()
+        self.error = None
+
+    def query(self, method="GET"):
+        return SimpleNamespace(request=request(method), execute=self.execute)
+
+    def execute(self):
+        self.calls += 1
+        assert self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return APIResponse(data=[{"doctor_id": 1, "full_name": "Dr Cole"}], count=None)
+
+
+def wait_for(condition):
+    deadline = time.monotonic() + 5
+    while not condition():
+        assert time.monotonic() < deadline, "callers never joined the flight"
+        time.sleep(0.001)
+
+
+def merged(flight):
+    return flight.stats().get(DOCTORS, {}).get("merged", 0)
+
+
+def run_callers(flight, backend):
+    results = [None] * CALLERS
+
+    def caller(n):
+        try:
+            results[n] = flight.execute(backend.query())
+        except Exception as e:
+            results[n] = e
+
+    threads = [threading.Thread(target=caller, args=(n,)) for n in range(CALLERS)]
+    for thread in threads:
+        thread.start()
+    wait_for(lambda: merged(flight) == CALLERS - 1)
+    backend.release.set()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_identical_reads_send_one_request():
+    flight, backend = SingleFlight(), Backend()
+
+    results = run_callers(flight, backend)
+
+    assert backend.calls == 1
+    assert flight.stats() == {DOCTORS: {"requests": 1, "merged": CALLERS - 1}}
+    assert all(r.data == [{"doctor_id": 1, "full_name": "Dr Cole"}] for r in results)
+    # Every caller may modify its rows without touching the others'
+    assert len({id(row) for r in results for row in r.data}) == CALLERS
+
+
+def test_error_reaches_every_waiting_caller():
+    flight, backend = SingleFlight(), Backend()
+    backend.error = RuntimeError("backend down")
+
+    results = run_callers(flight, backend)
+
+    assert backend.calls == 1
+    assert all(r is backend.error for r in results)
+
+
+def test_read_after_a_write_does_not_join_an_older_flight():
+    flight, backend = SingleFlight(), Backend()
+    first = threading.Thread(target=flight.execute, args=(backend.query(),))
+    first.start()
+    wait_for(lambda: backend.calls == 1)
+
+    write = SimpleNamespace(request=request("PATCH"), execute=lambda: APIResponse(data=[], count=None))
+    flight.execute(write)
+    second = threading.Thread(target=flight.execute, args=(backend.query(),))
+    second.start()
+    wait_for(lambda: backend.calls == 2)
+    backend.release.set()
+    first.join()
+    second.join()
+
+    assert flight.stats()[DOCTORS] == {"requests": 2, "merged": 0}
+
+
+def test_async_callers_share_one_request():
+    calls = []
+
+    async def main():
+        flight, release = AsyncSingleFlight(), asyncio.Event()
+
+        async def send(query):
+            calls.append(query)
+            await release.wait()
+            return APIResponse(data=[{"doctor_id": 1}], count=None)
+
+        tasks = [asyncio.ensure_future(flight.execute(SimpleNamespace(request=request()), send))
+                 for _ in range(CALLERS)]
+        while merged(flight) < CALLERS - 1:
+            await asyncio.sleep(0)
+        release.set()
+        return flight, await asyncio.gather(*tasks)
+
+    flight, results = asyncio.run(main())
+
+    assert len(calls) == 1
+    assert flight.stats() == {DOCTORS: {"requests": 1, "merged": CALLERS - 1}}
+    assert len({id(row) for r in results for row in r.data}) == CALLERS
+
+
+@pytest.mark.parametrize("method", ["POST", "PATCH", "DELETE"])
+def test_writes_are_never_merged(method):
+    flight, backend = SingleFlight(), Backend()
+    backend.release.set()
+
+    for _ in range(3):
+        flight.execute(backend.query(method))
+
+    assert backend.calls == 3
+    assert flight.stats() == {}
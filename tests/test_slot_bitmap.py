@@ -0,0 +1,60 @@
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+from dao.appointment_dao import AppointmentDAO
+from dao.availability_dao import AvailabilityDAO
+from service.appointment_service import AppointmentError, AppointmentService
+from service.availability_service import AvailabilityService
+from service.slot_bitmap import SlotBitmap
+
+DAY = date.today() + timedelta(days=3)
+MORNING = datetime.combine(DAY, time())
+
+
+def at(hour, minute=0):
+    return datetime.combine(DAY, time(hour, minute))
+
+
+@pytest.fixture
+def services(client):
+    client.seed("availabilityofdoctors1", [
+        {"doctor_id": 1, "available_date": DAY.isoformat(), "start_time": start, "end_time": end, "is_available": True}
+        for start, end in (("09:00:00", "10:00:00"), ("10:00:00", "10:30:00"))
+    ])
+    availability_dao, appointment_dao = AvailabilityDAO(client), AppointmentDAO(client)
+    bitmap = SlotBitmap(availability_dao, appointment_dao)
+    return (AppointmentService(appointment_dao, availability_dao, slot_bitmap=bitmap),
+            AvailabilityService(availability_dao, slot_bitmap=bitmap))
+
+
+def test_a_booking_takes_its_whole_window(services):
+    appointments, availability = services
+    assert availability.next_free_slots(1, MORNING, 10) == [at(9), at(9, 15), at(9, 30), at(9, 45), at(10), at(10, 15)]
+
+    appointments.add_appointment(1, 1, DAY.isoformat(), "09:00")
+
+    assert availability.next_free_slots(1, MORNING, 10) == [at(10), at(10, 15)]
+    with pytest.raises(AppointmentError, match="No available slot"):
+        appointments.add_appointment(2, 1, DAY.isoformat(), "09:15")
+
+
+def test_bitmap_loaded_from_the_server_agrees(client, services):
+    appointments, _ = services
+    appointments.add_appointment(1, 1, DAY.isoformat(), "09:15")
+
+    fresh = SlotBitmap(AvailabilityDAO(client), AppointmentDAO(client))
+    assert fresh.next_free(1, MORNING, 10) == [at(10), at(10, 15)]
+
+    appointments.delete_appointment(1)
+    assert appointments.slot_bitmap.next_free(1, MORNING, 2) == [at(9), at(9, 15)]
+
+
+def test_an_open_window_with_an_appointment_is_not_offered(client):
+    # A window left open by a booking made before slots were claimed
+    client.seed("availabilityofdoctors1", [{"doctor_id": 1, "available_date": DAY.isoformat(),
+                                            "start_time": "09:00:00", "end_time": "10:00:00", "is_available": True}])
+    client.seed("appointments1", [{"patient_id": 1, "doctor_id": 1, "appointment_date": DAY.isoformat(),
+                                   "appointment_time": "09:30", "status": "Scheduled"}])
+
+    assert SlotBitmap(AvailabilityDAO(client), AppointmentDAO(client)).next_free(1, MORNING) == []
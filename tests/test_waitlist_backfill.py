@@ -0,0 +1,103 @@
+from datetime import datetime
+
+import pytest
+
+from dao.appointment_dao import AppointmentDAO
+from dao.availability_dao import AvailabilityDAO
+from dao.doctor_dao import DoctorDAO
+from service.appointment_service import AppointmentService
+from service.specialization_index import SpecializationIndex
+from service.waitlist import Waitlist
+
+
+@pytest.fixture
+def service(client):
+    client.seed("doctors1", [{"full_name": "Dr Cole", "specialization": "Cardiology"}])
+    client.seed("availabilityofdoctors1", [{"doctor_id": 1, "available_date": "2026-11-02", "start_time": "09:00:00",
+                                            "end_time": "09:30:00", "is_available": True}])
+    return AppointmentService(AppointmentDAO(client), AvailabilityDAO(client),
+                              specialization_index=SpecializationIndex(DoctorDAO(client)), waitlist=Waitlist())
+
+
+def window(start, end):
+    return datetime.fromisoformat(f"2026-11-02T{start}"), datetime.fromisoformat(f"2026-11-02T{end}")
+
+
+def test_deleted_appointment_goes_to_the_first_matching_waiter(client, service):
+    booked = service.add_appointment(1, 1, "2026-11-02", "09:00")
+    service.join_waitlist(2, *window("10:00", "11:00"), doctor_id=1)   # wrong time
+    service.join_waitlist(3, *window("08:00", "12:00"), specialization="cardiology")
+    service.join_waitlist(4, *window("08:30", "09:30"), doctor_id=1)
+
+    backfilled = service.delete_appointment(booked["appointment_id"])
+
+    assert backfilled["patient_id"] == 3
+    assert [row["patient_id"] for row in client.rows("appointments1")] == [3]
+    assert not client.rows("availabilityofdoctors1")[0]["is_available"]
+    assert [entry["patient_id"] for entry in service.waitlist.entries()] == [2, 4]
+
+
+def test_cancelled_appointment_is_backfilled(client, service):
+    booked = service.add_appointment(1, 1, "2026-11-02", "09:00")
+    service.join_waitlist(2, *window("08:30", "09:30"), doctor_id=1)
+
+    service.update_appointment(booked["appointment_id"], status="Cancelled")
+
+    assert [(row["patient_id"], row["status"]) for row in client.rows("appointments1")] == [
+        (1, "Cancelled"), (2, "Scheduled")
+    ]
+    assert not service.waitlist.entries()
+
+
+def test_waiter_keeps_their_place_when_the_slot_is_gone(client, service):
+    booked = service.add_appointment(1, 1, "2026-11-02", "09:00")
+    service.join_waitlist(2, *window("08:30", "09:30"), doctor_id=1)
+    client.tables["availabilityofdoctors1"] = []
+
+    assert service.delete_appointment(booked["appointment_id"]) is None
+    assert [entry["patient_id"] for entry in service.waitlist.entries()] == [2]
+
+
+def test_waiter_keeps_their_place_when_the_booking_errors(client, service, monkeypatch):
+    booked = service.add_appointment(1, 1, "2026-11-02", "09:00")
+    service.join_waitlist(2, *window("08:30", "09:30"), doctor_id=1)
+
+    def unreachable(*args):
+        raise ConnectionError("backend unreachable")
+
+    monkeypatch.setattr(service.appointment_dao, "add_appointment", unreachable)
+    with pytest.raises(ConnectionError):
+        service.delete_appointment(booked["appointment_id"])
+
+    assert [entry["patient_id"] for entry in service.waitlist.entries()] == [2]
+    assert client.rows("availabilityofdoctors1")[0]["is_available"]
+
+
+def test_failed_delete_takes_the_slot_back(client, service, monkeypatch):
+    booked = service.add_appointment(1, 1, "2026-11-02", "09:00")
+    service.join_waitlist(2, *window("08:30", "09:30"), doctor_id=1)
+
+    def unreachable(*args):
+        raise ConnectionError("backend unreachable")
+
+    monkeypatch.setattr(service.appointment_dao, "delete_appointment", unreachable)
+    with pytest.raises(ConnectionError):
+        service.delete_appointment(booked["appointment_id"])
+
+    assert [row["patient_id"] for row in client.rows("appointments1")] == [1]
+    assert not client.rows("availabilityofdoctors1")[0]["is_available"]
+    assert [entry["patient_id"] for entry in service.waitlist.entries()] == [2]
+
+
+def test_failed_release_keeps_the_appointment(client, service, monkeypatch):
+    booked = service.add_appointment(1, 1, "2026-11-02", "09:00")
+
+    def unreachable(*args):
+        raise ConnectionError("backend unreachable")
+
+    monkeypatch.setattr(service.availability_dao, "release_slot", unreachable)
+    with pytest.raises(ConnectionError):
+        service.update_appointment(booked["appointment_id"], status="Cancelled")
+
+    assert [row["status"] for row in client.rows("appointments1")] == ["Scheduled"]
+    assert not client.rows("availabilityofdoctors1")[0]["is_available"]